@@ -1,20 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
 from app.models import db_models, schemas
 from app.core.security import (
-    get_password_hash, 
-    verify_password, 
+    aget_password_hash,
+    averify_password,
     create_access_token
 )
 
 router = APIRouter()
 
 @router.post("/register", response_model=schemas.User)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+async def register(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    db_user = db.query(db_models.User).filter(db_models.User.username == user.username).first()
+    db_user = await db.scalar(select(db_models.User).where(db_models.User.username == user.username))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -22,25 +23,25 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
         )
     
     # Hash password and create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await aget_password_hash(user.password)
     new_user = db_models.User(username=user.username, hashed_password=hashed_password)
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return new_user
 
 @router.post("/login", response_model=schemas.Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Find user
-    user = db.query(db_models.User).filter(db_models.User.username == form_data.username).first()
+    user = await db.scalar(select(db_models.User).where(db_models.User.username == form_data.username))
     
-    # Check user and password
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Check user and password (bcrypt runs off the event loop)
+    if not user or not await averify_password(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
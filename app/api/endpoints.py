@@ -1,14 +1,46 @@
+import json
 import uuid
 import shutil
+import hashlib
 from pathlib import Path
 from typing import List, Optional
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import schemas, db_models
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
 from app.core.dependencies import get_current_user
-from app.core.ai import process_files, get_chat_answer, get_insights
+from app.core.ai import (
+    process_files,
+    add_files_to_collection,
+    remove_source_from_collection,
+    get_retrieval_settings,
+    update_retrieval_settings,
+    aget_chat_answer,
+    stream_chat_answer,
+    get_insights,
+    schedule_insights,
+    retry_insights
+)
+from app.core.collection_cache import collection_cache
+from app.core.answer_cache import answer_cache
+from app.core.llm_cache import llm_call_cache
+from app.core.auth_cache import user_cache, token_cache
+from app.core.llm_client import (
+    llm_client,
+    LLMError,
+    LLMRateLimitError,
+    LLMServerError,
+    LLMTimeoutError
+)
+from app.core.jobs import job_manager, IngestionJob, QueueFullError
+from app.core.offload import compute_pool, io_pool, PoolSaturatedError
+from app.core.artifacts import artifact_store
+from app.core.vector_index import INDEX_TYPES
+from app.core.table_store import open_table_store
+from app.core.reranker import reranker
 
 router = APIRouter()
 
@@ -43,22 +75,138 @@ async def get_llm_providers():
     return {"providers": providers}
 
 
-@router.post("/upload", response_model=schemas.UploadResponse)
+@router.get("/metrics")
+async def get_metrics():
+    """
+    In-process cache counters, plus queue wait and service times of the worker pools.
+    """
+    return {
+        "collection_cache": collection_cache.stats(),
+        "answer_cache": answer_cache.stats(),
+        "llm_calls": llm_call_cache.stats(),
+        "llm_client": llm_client.stats(),
+        "auth": {
+            "users": user_cache.stats(),
+            "tokens": token_cache.stats()
+        },
+        "reranker": reranker.stats(),
+        "pools": {
+            "compute": compute_pool.stats(),
+            "io": io_pool.stats()
+        }
+    }
+
+
+def _upload_reference(upload_dir: Path) -> str:
+    """Artifact reference held by an accepted upload until its job ends"""
+    return f"upload:{upload_dir.name}"
+
+
+def _discard_upload(upload_dir: Path, file_hashes: List[str]):
+    """Delete an upload's files and drop its artifact references"""
+    artifact_store.release(_upload_reference(upload_dir), file_hashes)
+    shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+def _save_uploaded_pdfs(files: List[UploadFile], upload_dir: Path):
+    """Hash uploaded PDFs and write the ones with new content to `upload_dir`.
+    
+    Content already in the artifact store is replayed from there, so its upload
+    is never copied; the upload takes a reference on that artifact instead, so it
+    cannot be deleted before the job replays it (release with _discard_upload).
+    Returns (file_paths, file_hashes, filenames); raises HTTPException(400) for
+    non-PDF uploads, for two different files with the same name (a collection
+    identifies its sources by name), or when nothing usable was sent.
+    """
+    file_paths = []
+    file_hashes = []
+    filenames = []
+    hashes_by_name = {}
+    try:
+        for file in files:
+            if not file.filename:
+                continue
+            
+            # Only accept PDF files
+            if not file.filename.lower().endswith('.pdf'):
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Only PDF files are supported. Invalid file: {file.filename}"
+                )
+            
+            file_path = upload_dir / file.filename
+            
+            # Hash the spooled upload first, so repeat uploads can reuse stored artifacts
+            digest = hashlib.sha256()
+            for block in iter(lambda: file.file.read(1024 * 1024), b""):
+                digest.update(block)
+            content_hash = digest.hexdigest()
+            
+            # Checked before writing: a second file of the same name would overwrite the first
+            if file.filename in hashes_by_name:
+                if hashes_by_name[file.filename] == content_hash:
+                    continue
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Two different files named '{file.filename}' were uploaded; rename one of them"
+                )
+            hashes_by_name[file.filename] = content_hash
+            
+            # Parsing needs random access to a file that outlives the request
+            if not artifact_store.acquire_if_exists(_upload_reference(upload_dir), content_hash):
+                file.file.seek(0)
+                with file_path.open("wb") as buffer:
+                    shutil.copyfileobj(file.file, buffer, 1024 * 1024)
+            
+            file_paths.append(file_path)
+            file_hashes.append(content_hash)
+            filenames.append(file.filename)
+        
+        if not file_paths:
+            raise HTTPException(status_code=400, detail="No valid PDF files uploaded")
+    
+    except BaseException:
+        artifact_store.release(_upload_reference(upload_dir), file_hashes)
+        raise
+    
+    return file_paths, file_hashes, filenames
+
+
+def _processing_stats(processing_result: dict) -> dict:
+    return {
+        "chunks_created": processing_result.get("chunks_created", 0),
+        "tables_extracted": processing_result.get("tables_extracted", 0),
+        "images_found": processing_result.get("images_found", 0),
+        "index_type": processing_result.get("index_type"),
+        "files_reused": processing_result.get("files_reused", 0),
+        "extraction_pages_per_second": processing_result.get("extraction_pages_per_second", 0.0),
+        "embedding_cache_hit_rate": processing_result.get("embedding_cache_hit_rate", 0.0),
+        "embed_chunks_per_second": processing_result.get("embed_chunks_per_second", 0.0),
+        "insights_status": processing_result.get("insights_status")
+    }
+
+
+@router.post("/upload", response_model=schemas.JobStatus, status_code=202)
 async def upload_files(
     files: List[UploadFile] = File(...),
     collection_name: str = Form(...),
     llm_provider: str = Form("openai"),
     llm_model: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
+    index_type: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
-    Upload and process multiple PDF files with enhanced features:
+    Upload multiple PDF files and queue them for background processing:
     - Multi-document support with metadata
     - Table extraction
     - Image detection
-    - Proactive insights generation
+    - Proactive insights generation (in the background; poll /insights/{collection_id})
     - LLM selection
+    - Optional FAISS index type (flat, ivf_flat, hnsw, ivf_pq); chosen by size if omitted
+    
+    Returns a job id right away; poll /jobs/{job_id} for progress and the
+    created collection.
     """
     
     # Validate LLM provider
@@ -72,45 +220,83 @@ async def upload_files(
     if not llm_model:
         llm_model = AVAILABLE_LLMS[llm_provider]["default"]
     
+    if index_type and index_type not in INDEX_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid index type. Available: {INDEX_TYPES}"
+        )
+    
     # Generate unique session ID
     vector_store_session_id = str(uuid.uuid4())
     session_upload_dir = UPLOAD_DIR / vector_store_session_id
     session_upload_dir.mkdir(parents=True, exist_ok=True)
+    file_hashes: List[str] = []
     
-    uploaded_filenames = []
-
     try:
-        # Save uploaded files temporarily
-        file_paths = []
-        for file in files:
-            if not file.filename:
-                continue
-            
-            # Only accept PDF files
-            if not file.filename.lower().endswith('.pdf'):
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Only PDF files are supported. Invalid file: {file.filename}"
-                )
-            
-            file_path = session_upload_dir / file.filename
-            uploaded_filenames.append(file.filename)
-            
-            with file_path.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            file_paths.append(file_path)
-        
-        if not file_paths:
-            raise HTTPException(status_code=400, detail="No valid PDF files uploaded")
+        file_paths, file_hashes, uploaded_filenames = await io_pool.run(
+            _save_uploaded_pdfs, files, session_upload_dir
+        )
         
+        job = job_manager.submit(
+            current_user.id,
+            lambda job: _run_ingestion_job(
+                job,
+                file_paths=file_paths,
+                file_hashes=file_hashes,
+                uploaded_filenames=uploaded_filenames,
+                vector_store_session_id=vector_store_session_id,
+                collection_name=collection_name,
+                llm_provider=llm_provider,
+                llm_model=llm_model,
+                owner_id=current_user.id,
+                index_type=index_type
+            )
+        )
+        return job.to_dict()
+
+    except QueueFullError as e:
+        _discard_upload(session_upload_dir, file_hashes)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    
+    except (HTTPException, PoolSaturatedError):
+        _discard_upload(session_upload_dir, file_hashes)
+        raise
+    
+    except Exception as e:
+        _discard_upload(session_upload_dir, file_hashes)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"File upload failed: {str(e)}"
+        )
+
+
+def _run_ingestion_job(
+    job: IngestionJob,
+    file_paths: List[Path],
+    file_hashes: List[str],
+    uploaded_filenames: List[str],
+    vector_store_session_id: str,
+    collection_name: str,
+    llm_provider: str,
+    llm_model: str,
+    owner_id: int,
+    index_type: Optional[str] = None
+) -> dict:
+    """Worker-side half of /upload: process files, then commit the collection"""
+    session_upload_dir = UPLOAD_DIR / vector_store_session_id
+    vector_store_path = VECTOR_STORE_DIR / vector_store_session_id
+    db = SessionLocal()
+    
+    try:
         # Process files with AI logic
-        vector_store_path = VECTOR_STORE_DIR / vector_store_session_id
         processing_result = process_files(
             file_paths=file_paths,
             vector_store_path=vector_store_path,
             llm_provider=llm_provider,
-            llm_model=llm_model
+            llm_model=llm_model,
+            progress_callback=job.update,
+            file_hashes=file_hashes,
+            index_type=index_type
         )
         
         # Create new DocumentCollection in database
@@ -119,49 +305,206 @@ async def upload_files(
             vector_store_session_id=vector_store_session_id,
             llm_provider=llm_provider,
             llm_model=llm_model,
-            owner_id=current_user.id
+            owner_id=owner_id
         )
         db.add(new_collection)
         db.commit()
         db.refresh(new_collection)
         
-        # Prepare insights for response
-        insights = None
-        if "insights" in processing_result:
-            insights = schemas.DocumentInsights(**processing_result["insights"])
+        # The collection is queryable now; insights follow in the background
+        schedule_insights(vector_store_path, file_hashes, llm_provider, llm_model)
         
-        # Return response
         return schemas.UploadResponse(
             collection=new_collection,
             uploaded_files=uploaded_filenames,
-            processing_stats={
-                "chunks_created": processing_result.get("chunks_created", 0),
-                "tables_extracted": processing_result.get("tables_extracted", 0),
-                "images_found": processing_result.get("images_found", 0)
-            },
-            insights=insights
-        )
-
-    except Exception as e:
+            processing_stats=_processing_stats(processing_result)
+        ).model_dump()
+    
+    except Exception:
         # Clean up on failure
-        shutil.rmtree(session_upload_dir, ignore_errors=True)
-        vector_store_cleanup = VECTOR_STORE_DIR / vector_store_session_id
-        shutil.rmtree(vector_store_cleanup, ignore_errors=True)
+        db.rollback()
+        artifact_store.release_collection(vector_store_path)
+        shutil.rmtree(vector_store_path, ignore_errors=True)
+        collection_cache.invalidate(vector_store_session_id)
+        answer_cache.invalidate(vector_store_session_id)
+        raise
+    
+    finally:
+        db.close()
+        # Clean up temporary uploaded files; the collection holds its own artifact references now
+        _discard_upload(session_upload_dir, file_hashes)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.JobStatus)
+async def get_job_status(
+    job_id: str,
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Poll a background upload job for per-stage progress and its result.
+    """
+    job = job_manager.get(job_id)
+    
+    # Jobs of other users are reported as missing
+    if not job or job.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job.to_dict()
+
+
+@router.post(
+    "/collections/{collection_id}/documents",
+    response_model=schemas.JobStatus,
+    status_code=202
+)
+async def add_documents(
+    collection_id: int,
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Append PDFs to an existing collection. Only the new files are parsed and
+    embedded; poll /jobs/{job_id} for progress.
+    """
+    # Find collection
+    collection = await db.get(db_models.DocumentCollection, collection_id)
+
+    # Verify ownership
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if collection.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to modify this collection"
+        )
+    
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    if not vector_store_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail="Vector store not found. Collection may be corrupted."
+        )
+    
+    upload_dir = UPLOAD_DIR / str(uuid.uuid4())
+    upload_dir.mkdir(parents=True, exist_ok=True)
+    collection_info = schemas.DocumentCollection.model_validate(collection)
+    file_hashes: List[str] = []
+    
+    try:
+        file_paths, file_hashes, uploaded_filenames = await io_pool.run(
+            _save_uploaded_pdfs, files, upload_dir
+        )
         
+        job = job_manager.submit(
+            current_user.id,
+            lambda job: _run_add_documents_job(
+                job,
+                file_paths=file_paths,
+                file_hashes=file_hashes,
+                uploaded_filenames=uploaded_filenames,
+                upload_dir=upload_dir,
+                collection=collection_info
+            )
+        )
+        return job.to_dict()
+    
+    except QueueFullError as e:
+        _discard_upload(upload_dir, file_hashes)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    
+    except (HTTPException, PoolSaturatedError):
+        _discard_upload(upload_dir, file_hashes)
+        raise
+    
+    except Exception as e:
+        _discard_upload(upload_dir, file_hashes)
         raise HTTPException(
-            status_code=500, 
-            detail=f"File processing failed: {str(e)}"
+            status_code=500,
+            detail=f"File upload failed: {str(e)}"
         )
+
+
+def _run_add_documents_job(
+    job: IngestionJob,
+    file_paths: List[Path],
+    file_hashes: List[str],
+    uploaded_filenames: List[str],
+    upload_dir: Path,
+    collection: schemas.DocumentCollection
+) -> dict:
+    """Worker-side half of adding documents to a collection"""
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    try:
+        processing_result = add_files_to_collection(
+            file_paths=file_paths,
+            vector_store_path=vector_store_path,
+            llm_provider=collection.llm_provider,
+            llm_model=collection.llm_model,
+            progress_callback=job.update,
+            file_hashes=file_hashes
+        )
+        
+        if processing_result.get("documents_processed"):
+            schedule_insights(vector_store_path, file_hashes, collection.llm_provider, collection.llm_model)
+        
+        return schemas.UploadResponse(
+            collection=collection,
+            uploaded_files=uploaded_filenames,
+            processing_stats=_processing_stats(processing_result)
+        ).model_dump()
     
     finally:
-        # Clean up temporary uploaded files
-        shutil.rmtree(session_upload_dir, ignore_errors=True)
+        _discard_upload(upload_dir, file_hashes)
+
+
+@router.delete("/collections/{collection_id}/documents/{source}")
+async def remove_document(
+    collection_id: int,
+    source: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Remove one source PDF (by file name) from a collection.
+    """
+    # Find collection
+    collection = await db.get(db_models.DocumentCollection, collection_id)
+
+    # Verify ownership
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if collection.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to modify this collection"
+        )
+    
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    
+    try:
+        result = await compute_pool.run(
+            remove_source_from_collection,
+            vector_store_path,
+            source,
+            llm_provider=collection.llm_provider,
+            llm_model=collection.llm_model
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Source '{source}' not found in this collection")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "message": f"Removed {source} from collection",
+        "chunks_removed": result["chunks_removed"]
+    }
 
 
 @router.post("/chat", response_model=schemas.ChatResponse)
 async def chat_with_collection(
     request: schemas.ChatRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
@@ -173,9 +516,7 @@ async def chat_with_collection(
     """
     
     # Find collection
-    collection = db.query(db_models.DocumentCollection).filter(
-        db_models.DocumentCollection.id == request.collection_id
-    ).first()
+    collection = await db.get(db_models.DocumentCollection, request.collection_id)
 
     # Verify ownership
     if not collection:
@@ -201,7 +542,7 @@ async def chat_with_collection(
     
     try:
         # Get answer with sources
-        result = get_chat_answer(
+        result = await aget_chat_answer(
             question=request.question,
             vector_store_path=vector_store_path,
             llm_provider=llm_provider,
@@ -220,9 +561,14 @@ async def chat_with_collection(
             answer=result["answer"],
             type=result.get("type", "document_query"),
             sources=sources,
-            context_used=result.get("context_used")
+            context_used=result.get("context_used"),
+            prompt_tokens=result.get("prompt_tokens")
         )
     
+    except (HTTPException, PoolSaturatedError):
+        raise
+    except LLMError as e:
+        raise _llm_http_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -230,10 +576,101 @@ async def chat_with_collection(
         )
 
 
+def _llm_http_error(error: LLMError) -> HTTPException:
+    """HTTP error for an LLM failure that survived the client's retries"""
+    if isinstance(error, LLMRateLimitError):
+        headers = {"Retry-After": str(int(error.retry_after or 1))}
+        return HTTPException(status_code=503, detail="LLM provider is rate limiting, try again shortly", headers=headers)
+    if isinstance(error, LLMTimeoutError):
+        return HTTPException(status_code=504, detail=str(error))
+    if isinstance(error, LLMServerError):
+        return HTTPException(status_code=502, detail=str(error))
+    return HTTPException(status_code=502, detail=f"LLM request failed: {error}")
+
+
+@router.post("/chat/stream")
+async def chat_with_collection_stream(
+    request: schemas.ChatRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Streaming chat as server-sent events:
+    - `sources`: retrieved sources, sent as soon as retrieval finishes
+    - `token`: answer text as the LLM generates it
+    - `done`: context_used, prompt_tokens and timing (retrieval, time-to-first-token, total)
+    - `error`: sent instead of the remaining events if processing fails
+    """
+    
+    # Find collection
+    collection = await db.get(db_models.DocumentCollection, request.collection_id)
+
+    # Verify ownership
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if collection.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403, 
+            detail="Not authorized to access this collection"
+        )
+
+    # Determine LLM to use (request override or collection default)
+    llm_provider = request.llm_provider or collection.llm_provider
+    llm_model = request.llm_model or collection.llm_model
+    
+    # Get vector store path
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    
+    if not vector_store_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail="Vector store not found. Collection may be corrupted."
+        )
+    
+    events = stream_chat_answer(
+        question=request.question,
+        vector_store_path=vector_store_path,
+        llm_provider=llm_provider,
+        llm_model=llm_model
+    )
+    
+    # Loading and retrieval (up to the first event) run on the compute pool, so a
+    # saturated pool is still reported as a 503 before the stream starts
+    first_error = None
+    try:
+        first_event = await compute_pool.run(next, events, None)
+    except PoolSaturatedError:
+        events.close()
+        raise
+    except Exception as e:
+        first_event, first_error = None, e
+    
+    def event_stream():
+        # Sync generator: Starlette iterates it in a worker thread, off the event loop
+        try:
+            if first_error is not None:
+                raise first_error
+            if first_event is None:
+                return
+            event, payload = first_event
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+            for event, payload in events:
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        except Exception as e:
+            payload = {"error": f"Chat processing failed: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(payload)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/insights/{collection_id}", response_model=schemas.InsightsResponse)
 async def get_collection_insights(
     collection_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
@@ -245,9 +682,7 @@ async def get_collection_insights(
     """
     
     # Find collection
-    collection = db.query(db_models.DocumentCollection).filter(
-        db_models.DocumentCollection.id == collection_id
-    ).first()
+    collection = await db.get(db_models.DocumentCollection, collection_id)
 
     # Verify ownership
     if not collection:
@@ -260,28 +695,76 @@ async def get_collection_insights(
     
     # Get insights
     vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
-    insights_data = get_insights(vector_store_path)
+    insights_data = await io_pool.run(get_insights, vector_store_path)
     
     if "error" in insights_data:
         raise HTTPException(status_code=404, detail=insights_data["error"])
     
+    # Pending or failed insights may still carry the previous ones
+    status = insights_data.pop("status", "ready")
+    insights = None
+    if "document_stats" in insights_data:
+        insights = schemas.DocumentInsights(**insights_data)
+    
     return schemas.InsightsResponse(
         collection_id=collection_id,
-        insights=schemas.DocumentInsights(**insights_data)
+        status=status,
+        insights=insights
+    )
+
+
+@router.post("/insights/{collection_id}/retry", response_model=schemas.InsightsResponse, status_code=202)
+async def retry_collection_insights(
+    collection_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Generate insights again after they failed (e.g. the LLM provider was down).
+    Poll /insights/{collection_id} until the status leaves "pending".
+    """
+    
+    # Find collection
+    collection = await db.get(db_models.DocumentCollection, collection_id)
+
+    # Verify ownership
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if collection.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to modify this collection"
+        )
+    
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    if not vector_store_path.exists():
+        raise HTTPException(status_code=404, detail="Vector store not found. Collection may be corrupted.")
+    
+    retried = await io_pool.run(
+        retry_insights,
+        vector_store_path,
+        collection.llm_provider,
+        collection.llm_model
     )
+    if not retried:
+        raise HTTPException(status_code=409, detail="Insights have not failed; nothing to retry")
+    
+    return await get_collection_insights(collection_id, db, current_user)
 
 
 @router.get("/collections", response_model=List[schemas.DocumentCollection])
 async def list_collections(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
     List all collections for the current user.
     """
-    collections = db.query(db_models.DocumentCollection).filter(
-        db_models.DocumentCollection.owner_id == current_user.id
-    ).all()
+    collections = (await db.scalars(
+        select(db_models.DocumentCollection).where(
+            db_models.DocumentCollection.owner_id == current_user.id
+        )
+    )).all()
     
     return collections
 
@@ -289,16 +772,14 @@ async def list_collections(
 @router.delete("/collections/{collection_id}")
 async def delete_collection(
     collection_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
     Delete a collection and its associated vector store.
     """
     # Find collection
-    collection = db.query(db_models.DocumentCollection).filter(
-        db_models.DocumentCollection.id == collection_id
-    ).first()
+    collection = await db.get(db_models.DocumentCollection, collection_id)
 
     # Verify ownership
     if not collection:
@@ -310,27 +791,28 @@ async def delete_collection(
         )
     
     # Delete vector store files
-    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
-    shutil.rmtree(vector_store_path, ignore_errors=True)
+    await io_pool.run(_delete_collection_files, collection.vector_store_session_id)
     
     # Delete from database
-    db.delete(collection)
-    db.commit()
+    await db.delete(collection)
+    await db.commit()
     
     return {"message": "Collection deleted successfully"}
 
 @router.delete("/collections")
 async def delete_all_collections(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
     Delete ALL collections for the current user (bulk delete).
     """
     # Get all collections for user
-    collections = db.query(db_models.DocumentCollection).filter(
-        db_models.DocumentCollection.owner_id == current_user.id
-    ).all()
+    collections = (await db.scalars(
+        select(db_models.DocumentCollection).where(
+            db_models.DocumentCollection.owner_id == current_user.id
+        )
+    )).all()
     
     if not collections:
         return {"message": "No collections found", "deleted_count": 0}
@@ -342,17 +824,16 @@ async def delete_all_collections(
     for collection in collections:
         try:
             # Delete vector store files
-            vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
-            shutil.rmtree(vector_store_path, ignore_errors=True)
+            await io_pool.run(_delete_collection_files, collection.vector_store_session_id)
             
             # Delete from database
-            db.delete(collection)
+            await db.delete(collection)
             deleted_count += 1
         except Exception as e:
             errors.append(f"Failed to delete collection {collection.id}: {str(e)}")
     
     # Commit all deletions
-    db.commit()
+    await db.commit()
     
     response = {
         "message": f"Successfully deleted {deleted_count} collection(s)",
@@ -364,19 +845,25 @@ async def delete_all_collections(
     
     return response
 
+def _delete_collection_files(vector_store_session_id: str):
+    vector_store_path = VECTOR_STORE_DIR / vector_store_session_id
+    artifact_store.release_collection(vector_store_path)
+    shutil.rmtree(vector_store_path, ignore_errors=True)
+    collection_cache.invalidate(vector_store_session_id)
+    answer_cache.invalidate(vector_store_session_id)
+
+
 @router.get("/collections/{collection_id}/tables", response_model=schemas.TablesListResponse)
 async def list_tables(
     collection_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: db_models.User = Depends(get_current_user)
 ):
     """
     List all extracted tables from a collection.
     """
     # Find collection
-    collection = db.query(db_models.DocumentCollection).filter(
-        db_models.DocumentCollection.id == collection_id
-    ).first()
+    collection = await db.get(db_models.DocumentCollection, collection_id)
 
     # Verify ownership
     if not collection:
@@ -387,26 +874,84 @@ async def list_tables(
             detail="Not authorized to access this collection"
         )
     
-    # Load tables data
-    import json
+    # Read the table catalog (schemas and row counts, not the rows themselves)
     vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
-    tables_path = vector_store_path / "tables.json"
-    
-    if not tables_path.exists():
+    if not vector_store_path.exists():
         return schemas.TablesListResponse(collection_id=collection_id, tables=[])
     
-    with open(tables_path, "r") as f:
-        tables_data = json.load(f)
-    
     # Convert to response format
     tables = [
         schemas.TableInfo(
             table_index=t["table_index"],
             source=t["source"],
             columns=t["columns"],
-            row_count=len(t["data"])
+            row_count=t["row_count"]
         )
-        for t in tables_data
+        for t in await io_pool.run(lambda: open_table_store(vector_store_path).catalog())
     ]
     
-    return schemas.TablesListResponse(collection_id=collection_id, tables=tables)
\ No newline at end of file
+    return schemas.TablesListResponse(collection_id=collection_id, tables=tables)
+
+
+@router.get("/collections/{collection_id}/retrieval", response_model=schemas.RetrievalSettings)
+async def read_retrieval_settings(
+    collection_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Retrieval settings of a collection (cross-encoder reranking).
+    """
+    # Find collection
+    collection = await db.get(db_models.DocumentCollection, collection_id)
+
+    # Verify ownership
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if collection.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to access this collection"
+        )
+    
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    if not vector_store_path.exists():
+        raise HTTPException(status_code=404, detail="Vector store not found. Collection may be corrupted.")
+    
+    settings = await io_pool.run(get_retrieval_settings, vector_store_path)
+    return schemas.RetrievalSettings(collection_id=collection_id, **settings)
+
+
+@router.put("/collections/{collection_id}/retrieval", response_model=schemas.RetrievalSettings)
+async def write_retrieval_settings(
+    collection_id: int,
+    request: schemas.RetrievalSettingsUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: db_models.User = Depends(get_current_user)
+):
+    """
+    Change retrieval settings of a collection.
+    
+    With `rerank` on, the top `rerank_candidates` retrieved chunks are scored by a
+    cross-encoder and only the best `rerank_top_n` go to the LLM. Reranking is
+    skipped for a question when scoring is expected to take longer than
+    `rerank_budget_ms` (and while the model is first loading).
+    """
+    # Find collection
+    collection = await db.get(db_models.DocumentCollection, collection_id)
+
+    # Verify ownership
+    if not collection:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    if collection.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Not authorized to modify this collection"
+        )
+    
+    vector_store_path = VECTOR_STORE_DIR / collection.vector_store_session_id
+    if not vector_store_path.exists():
+        raise HTTPException(status_code=404, detail="Vector store not found. Collection may be corrupted.")
+    
+    settings = await io_pool.run(update_retrieval_settings, vector_store_path, request.model_dump())
+    return schemas.RetrievalSettings(collection_id=collection_id, **settings)
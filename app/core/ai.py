@@ -1,20 +1,163 @@
 import os
+import sys
+import re
 import json
+import bisect
+import sqlite3
+import time
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple, Iterator
 import fitz  # PyMuPDF
-import tabula
+import numpy as np
 import pandas as pd
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
 from langchain.docstore.document import Document
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from app.core.registry import model_registry, EMBEDDING_MODEL_NAME
+from app.core.embedding_cache import embedding_cache, CachedEmbedder
+from app.core.artifacts import artifact_store, file_sha256, write_manifest, read_manifest
+from app.core.vector_index import (
+    FAISS_MMAP,
+    empty_vector_store,
+    finalize_vector_store,
+    load_vector_store,
+    save_vector_store,
+    delete_from_vector_store,
+    reconstruct_vectors,
+    write_index_config,
+    read_index_config
+)
+from app.core.collection_cache import collection_cache, collection_size_bytes, LoadedCollection
+from app.core.answer_cache import answer_cache
+from app.core.llm_cache import llm_call_cache, prompt_key
+from app.core.llm_client import llm_client
+from app.core.offload import compute_pool
+from app.core.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from app.core.context_assembly import (
+    CONTEXT_CANDIDATES,
+    assemble_context,
+    context_token_budget,
+    count_tokens,
+    mmr_order,
+    rank_relevance
+)
+from app.core.reranker import reranker, retrieval_settings
+from app.core.table_store import TableStore, open_table_store
+from app.core.table_extraction import TABLE_BACKEND, number_tables, extract_tables_tabula
+from app.core.pdf_pages import parse_page_range
 
 load_dotenv()
 
 
+# Process-pool PDF extraction: 0 or 1 worker keeps the serial path
+EXTRACT_WORKERS = int(os.getenv("EXTRACT_WORKERS", "0"))
+EXTRACT_PAGES_PER_TASK = int(os.getenv("EXTRACT_PAGES_PER_TASK", "32"))
+
+# Streaming ingestion: parsed page ranges (of EXTRACT_PAGES_PER_TASK pages) that may
+# wait for the chunk/embed stage; chunks are embedded and indexed one embedder batch at a time
+INGEST_PREFETCH_RANGES = int(os.getenv("INGEST_PREFETCH_RANGES", "4"))
+
+# "hybrid" fuses BM25 and FAISS rankings with reciprocal-rank fusion; "vector" is FAISS only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# Tables whose schemas are offered to the LLM when writing a query for a table question
+TABLE_QUERY_MAX_TABLES = int(os.getenv("TABLE_QUERY_MAX_TABLES", "3"))
+
+# Insights are generated after ingestion, on their own small pool
+INSIGHTS_WORKERS = int(os.getenv("INSIGHTS_WORKERS", "2"))
+_insights_pool = ThreadPoolExecutor(max_workers=INSIGHTS_WORKERS, thread_name_prefix="insights")
+
+_extract_pool: Optional[ProcessPoolExecutor] = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool(workers: int) -> ProcessPoolExecutor:
+    """Shared extraction pool, created on first use"""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            # spawn: never fork a parent that already holds torch/FAISS threads. Workers
+            # run pdf_pages.parse_page_range, so they import PyMuPDF only.
+            _extract_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _extract_pool
+
+
+class _Prefetch:
+    """Iterates `items` on a background thread, at most `maxsize` items ahead of the consumer.
+    
+    Producer exceptions are raised in the consumer; a consumer that stops early
+    stops the producer. `busy_seconds` is the time spent producing, not waiting.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, items: Iterator, maxsize: int, name: str = "prefetch"):
+        self._items = items
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+        self.busy_seconds = 0.0
+        self._thread = threading.Thread(target=self._produce, name=name, daemon=True)
+    
+    def _put(self, entry) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _produce(self):
+        outcome = (self._DONE, None)
+        try:
+            iterator = iter(self._items)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    self.busy_seconds += time.perf_counter() - start
+                if not self._put((item, None)):
+                    return
+        except BaseException as e:
+            outcome = (self._DONE, e)
+        self._put(outcome)
+    
+    def __iter__(self) -> Iterator:
+        self._thread.start()
+        try:
+            while True:
+                item, error = self._queue.get()
+                if item is self._DONE:
+                    if error is not None:
+                        raise error
+                    return
+                yield item
+        finally:
+            self._stop.set()
+
+
+def _with_documents(
+    parsed: Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]
+) -> Tuple[List[Document], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """A parse_page_range result with its page dicts made into Documents"""
+    pages, images_info, tables = parsed
+    documents = [Document(page_content=page["page_content"], metadata=page["metadata"]) for page in pages]
+    return documents, images_info, tables
+
+
 class DocumentProcessor:
     """Handles PDF processing including text, tables, and metadata extraction"""
     
@@ -23,115 +166,154 @@ class DocumentProcessor:
             chunk_size=1000,
             chunk_overlap=200,
             length_function=len,
+            add_start_index=True,
         )
     
+    def parse_pdf(
+        self,
+        pdf_path: Path,
+        with_tables: bool = False
+    ) -> Tuple[List[Document], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Open the PDF once: page Documents, image records and (with `with_tables`) PyMuPDF table records"""
+        documents, images, tables = _with_documents(parse_page_range(str(pdf_path), 0, sys.maxsize, with_tables))
+        return documents, images, number_tables(tables)
+    
     def extract_text_with_metadata(self, pdf_path: Path) -> List[Document]:
         """Extract text from PDF with page numbers and source metadata"""
-        documents = []
-        pdf_document = fitz.open(pdf_path)
+        return self.parse_pdf(pdf_path)[0]
+    
+    def parse_pdfs_parallel(
+        self,
+        pdf_paths: List[Path],
+        workers: int = EXTRACT_WORKERS,
+        pages_per_task: int = EXTRACT_PAGES_PER_TASK,
+        with_tables: bool = False
+    ) -> List[Tuple[List[Document], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Parse several PDFs on a process pool, split by file and page range.
         
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            text = page.get_text()
-            
-            if text.strip():
-                # Extract text coordinates for highlighting (bounding boxes)
-                blocks = page.get_text("blocks")
-                text_blocks = []
-                
-                for block in blocks:
-                    if block[6] == 0:  # Text block
-                        text_blocks.append({
-                            "text": block[4],
-                            "bbox": list(block[:4])  # x0, y0, x1, y1
-                        })
-                
-                # Create document with rich metadata
-                doc = Document(
-                    page_content=text,
-                    metadata={
-                        "source": pdf_path.name,
-                        "page": page_num + 1,
-                        "total_pages": len(pdf_document),
-                        "file_path": str(pdf_path),
-                        "text_blocks": json.dumps(text_blocks)  # For highlighting
-                    }
-                )
-                documents.append(doc)
+        Returns one (documents, images_info, tables) triple per input file, in input
+        and page order, identical to calling parse_pdf on each file.
+        """
+        tasks = []
+        for file_idx, pdf_path in enumerate(pdf_paths):
+            with fitz.open(pdf_path) as pdf_document:
+                total_pages = len(pdf_document)
+            for start in range(0, total_pages, pages_per_task):
+                tasks.append((file_idx, start, pdf_path))
+        
+        pool = _get_extract_pool(workers)
+        futures = [
+            pool.submit(parse_page_range, str(pdf_path), start, start + pages_per_task, with_tables)
+            for _, start, pdf_path in tasks
+        ]
+        
+        # Futures are collected in submission order, so page order is deterministic
+        results = [([], [], []) for _ in pdf_paths]
+        for (file_idx, _, _), future in zip(tasks, futures):
+            documents, images_info, tables = _with_documents(future.result())
+            results[file_idx][0].extend(documents)
+            results[file_idx][1].extend(images_info)
+            results[file_idx][2].extend(tables)
         
-        pdf_document.close()
-        return documents
+        for _, _, tables in results:
+            number_tables(tables)
+        return results
     
-    def extract_tables(self, pdf_path: Path) -> List[Dict[str, Any]]:
-        """Extract tables from PDF using tabula"""
-        try:
-            tables = tabula.read_pdf(
-                str(pdf_path),
-                pages='all',
-                multiple_tables=True,
-                silent=True
-            )
-            
-            extracted_tables = []
-            for idx, table in enumerate(tables):
-                if isinstance(table, pd.DataFrame) and not table.empty:
-                    extracted_tables.append({
-                        "table_index": idx,
-                        "source": pdf_path.name,
-                        "data": table.to_dict('records'),
-                        "columns": list(table.columns),
-                        "csv_string": table.to_csv(index=False)
-                    })
-            
-            return extracted_tables
-        except Exception as e:
-            print(f"Table extraction failed for {pdf_path.name}: {str(e)}")
-            print("Note: Table extraction requires Java. Install Java and set JAVA_HOME if needed.")
-            return []
+    def iter_pdf(
+        self,
+        pdf_path: Path,
+        with_tables: bool = False,
+        workers: int = EXTRACT_WORKERS,
+        pages_per_task: int = EXTRACT_PAGES_PER_TASK
+    ) -> Iterator[Tuple[List[Document], List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Parse a PDF range by range: yields (documents, images_info, tables) per
+        `pages_per_task` pages, in page order. Tables are not numbered.
+        
+        With more than one worker, up to 2 * workers ranges are parsed ahead on the
+        process pool; only those are held in memory, not the whole file.
+        """
+        with fitz.open(pdf_path) as pdf_document:
+            total_pages = len(pdf_document)
+        starts = range(0, total_pages, pages_per_task)
+        
+        if workers <= 1:
+            for start in starts:
+                yield _with_documents(parse_page_range(str(pdf_path), start, start + pages_per_task, with_tables))
+            return
+        
+        pool = _get_extract_pool(workers)
+        pending = deque()
+        for start in starts:
+            pending.append(pool.submit(parse_page_range, str(pdf_path), start, start + pages_per_task, with_tables))
+            if len(pending) >= 2 * workers:
+                yield _with_documents(pending.popleft().result())
+        while pending:
+            yield _with_documents(pending.popleft().result())
+    
+    def extract_tables(self, pdf_path: Path, backend: str = TABLE_BACKEND) -> List[Dict[str, Any]]:
+        """Extract tables from PDF with the configured backend.
+        
+        Ingestion with the default "pymupdf" backend gets tables from parse_pdf
+        instead, without opening the file again.
+        """
+        if backend == "tabula":
+            return extract_tables_tabula(pdf_path)
+        return self.parse_pdf(pdf_path, with_tables=True)[2]
     
     def extract_images_info(self, pdf_path: Path) -> List[Dict[str, Any]]:
         """Extract information about images in the PDF"""
-        pdf_document = fitz.open(pdf_path)
-        images_info = []
-        
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            image_list = page.get_images()
-            
-            for img_idx, img in enumerate(image_list):
-                images_info.append({
-                    "source": pdf_path.name,
-                    "page": page_num + 1,
-                    "image_index": img_idx,
-                    "xref": img[0]
-                })
-        
-        pdf_document.close()
-        return images_info
+        return self.parse_pdf(pdf_path)[1]
     
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
-        """Split documents into chunks while preserving metadata"""
+        """Split documents into chunks while preserving metadata.
+        
+        Instead of a copy of the page's text_blocks, each chunk records in
+        `block_range` the first and last text block of its page that it overlaps;
+        the boxes themselves are stored once per page in the collection geometry.
+        """
+        # Character offset where each text block of a page ends
+        block_ends = {}
+        for doc in documents:
+            ends = []
+            offset = 0
+            for block in json.loads(doc.metadata.get("text_blocks", "[]")):
+                offset += len(block["text"])
+                ends.append(offset)
+            block_ends[(doc.metadata["source"], doc.metadata["page"])] = ends
+        
         chunks = self.text_splitter.split_documents(documents)
+        for chunk in chunks:
+            chunk.metadata.pop("text_blocks", None)
+            ends = block_ends.get((chunk.metadata["source"], chunk.metadata["page"]))
+            start = chunk.metadata.get("start_index", -1)
+            if not ends or start < 0:
+                continue
+            first = bisect.bisect_right(ends, start)
+            last = bisect.bisect_left(ends, start + len(chunk.page_content))
+            chunk.metadata["block_range"] = [min(first, len(ends) - 1), min(last, len(ends) - 1)]
+        
         return chunks
 
 
+# generate_response returns failures as text starting with this
+LLM_ERROR_PREFIX = "Error generating response"
+
+
 class LLMManager:
     """Manages OpenAI LLM provider"""
     
     def __init__(self, llm_provider: str = "openai", llm_model: Optional[str] = None):
         self.llm_provider = llm_provider.lower()
         self.llm_model = llm_model
+        self.temperature = 0.3
+        self.api_model_name = None
         self.llm = self._initialize_llm()
     
     def _initialize_llm(self):
-        """Initialize OpenAI LLM"""
+        """Fetch the shared OpenAI client from the model registry"""
         if self.llm_provider != "openai":
             raise ValueError(f"Only OpenAI provider is supported. Got: {self.llm_provider}")
         
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables")
-        
         # OpenAI model mapping
         OPENAI_MODEL_MAP = {
             "gpt-3.5-turbo": "gpt-3.5-turbo",
@@ -149,36 +331,84 @@ class LLMManager:
         if model_name not in OPENAI_MODEL_MAP:
             print(f"Warning: Unknown OpenAI model '{model_name}'. Defaulting to '{default_model}'.")
         
-        print(f"Initializing ChatOpenAI with model: {api_model_name}")
-        
+        self.api_model_name = api_model_name
         try:
-            return ChatOpenAI(
-                model=api_model_name,
-                openai_api_key=api_key,
-                temperature=0.3
-            )
+            return model_registry.get_llm(self.llm_provider, api_model_name, temperature=self.temperature)
         except Exception as e:
             print(f"Error initializing OpenAI: {str(e)}")
             raise
     
+    def _prompt_key(self, prompt: str) -> str:
+        return prompt_key(f"{self.llm_provider}:{self.api_model_name}", self.temperature, prompt)
+    
+    def _invoke(self, prompt: str) -> str:
+        response = self.llm.invoke(prompt)
+        # ChatOpenAI returns a message object with .content
+        return response.content if hasattr(response, 'content') else str(response)
+    
     def generate_response(self, prompt: str) -> str:
-        """Generate a response from the LLM"""
+        """Generate a response from the LLM.
+        
+        Identical concurrent prompts share one upstream call, and recent responses
+        are served from the exact-prompt cache (see llm_call_cache).
+        """
         try:
-            response = self.llm.invoke(prompt)
-            # ChatOpenAI returns a message object with .content
-            return response.content if hasattr(response, 'content') else str(response)
+            return llm_call_cache.call(self._prompt_key(prompt), lambda: self._invoke(prompt))
         except Exception as e:
-            error_msg = f"Error generating response: {str(e)}"
+            error_msg = f"{LLM_ERROR_PREFIX}: {str(e)}"
             print(error_msg)
             return error_msg
 
 
+    async def agenerate_response(self, prompt: str) -> str:
+        """Async generation through the shared pooled client.
+        
+        Coalesced with identical in-flight prompts and served from the exact-prompt
+        cache like generate_response; failures raise llm_client.LLMError
+        subclasses instead of returning error text.
+        """
+        return await llm_call_cache.acall(
+            self._prompt_key(prompt),
+            lambda: llm_client.generate(self.api_model_name, prompt, self.temperature)
+        )
+    
+    def stream_response(self, prompt: str) -> Iterator[str]:
+        """Stream the response from the LLM as text chunks; errors propagate to the caller.
+        
+        A cached response is yielded as one chunk; completed streams are cached.
+        Streams are not coalesced.
+        """
+        key = self._prompt_key(prompt)
+        cached = llm_call_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        for chunk in self.llm.stream(prompt):
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                chunks.append(text)
+                yield text
+        if chunks:
+            llm_call_cache.put(key, "".join(chunks))
+
+
 class ProactiveInsights:
     """Generate proactive insights from documents"""
     
     def __init__(self, llm_manager: LLMManager):
         self.llm_manager = llm_manager
     
+    def _generate(self, prompt: str) -> str:
+        """LLM response text; raises instead of returning error text or an empty reply"""
+        response = self.llm_manager.generate_response(prompt)
+        if response.startswith(LLM_ERROR_PREFIX):
+            raise RuntimeError(response)
+        if not response.strip():
+            raise RuntimeError("The LLM returned an empty response")
+        return response
+    
     def generate_summary(self, text: str, max_length: int = 500) -> str:
         """Generate a TL;DR summary"""
         prompt = f"""Provide a concise summary (max {max_length} characters) of the following text. 
@@ -188,7 +418,7 @@ Focus on the main points and key takeaways:
 
 Summary:"""
         
-        return self.llm_manager.generate_response(prompt)
+        return self._generate(prompt).strip()
     
     def extract_key_concepts(self, text: str) -> List[str]:
         """Extract main topics and key concepts"""
@@ -199,7 +429,7 @@ Return them as a simple bulleted list:
 
 Key Concepts:"""
         
-        response = self.llm_manager.generate_response(prompt)
+        response = self._generate(prompt)
         # Parse the response into a list
         concepts = [line.strip('- •*').strip() for line in response.split('\n') if line.strip()]
         return concepts[:7]
@@ -213,208 +443,982 @@ that a reader might want to ask. Make them specific and actionable.
 
 Questions (one per line):"""
         
-        response = self.llm_manager.generate_response(prompt)
+        response = self._generate(prompt)
         questions = [q.strip('1234567890. ').strip() for q in response.split('\n') if q.strip()]
         return questions[:num_questions]
     
+    def generate_structured(self, text: str) -> Optional[Dict[str, Any]]:
+        """Summary, key concepts and suggested questions from one JSON-answering LLM call.
+        
+        Returns None when the reply is not usable JSON; raises when the LLM call fails.
+        """
+        prompt = f"""Analyze the following text and respond with a JSON object with exactly these keys:
+"summary": a concise summary (max 500 characters) focused on the main points and key takeaways,
+"key_concepts": a list of the top 5-7 key concepts, topics, or themes,
+"suggested_questions": a list of 5 interesting, specific and actionable questions a reader might want to ask.
+Return only the JSON object.
+
+{text[:4000]}
+
+JSON:"""
+        
+        response = self._generate(prompt)
+        
+        match = re.search(r"\{.*\}", response, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+        if not isinstance(data, dict) or not isinstance(data.get("summary"), str) or not data["summary"].strip():
+            return None
+        
+        return {
+            "summary": data["summary"].strip(),
+            "key_concepts": [str(c).strip() for c in data.get("key_concepts", []) if str(c).strip()][:7],
+            "suggested_questions": [str(q).strip() for q in data.get("suggested_questions", []) if str(q).strip()][:5],
+        }
+    
     def analyze_document(self, documents: List[Document]) -> Dict[str, Any]:
-        """Perform comprehensive analysis of uploaded documents"""
+        """Perform comprehensive analysis of uploaded documents.
+        
+        Raises when the LLM fails or answers with nothing, so the caller can
+        record the insights as failed instead of storing error text.
+        """
         # Combine first few pages for analysis
         combined_text = "\n\n".join([doc.page_content for doc in documents[:5]])
         
-        try:
-            insights = {
-                "summary": self.generate_summary(combined_text),
-                "key_concepts": self.extract_key_concepts(combined_text),
-                "suggested_questions": self.generate_suggested_questions(combined_text),
-                "document_stats": {
-                    "total_documents": len(set([doc.metadata.get("source") for doc in documents])),
-                    "total_pages": sum([1 for doc in documents]),
+        generated = self.generate_structured(combined_text)
+        if generated is None:
+            # No usable JSON: fall back to the three separate prompts, run concurrently
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                summary = pool.submit(self.generate_summary, combined_text)
+                concepts = pool.submit(self.extract_key_concepts, combined_text)
+                questions = pool.submit(self.generate_suggested_questions, combined_text)
+                generated = {
+                    "summary": summary.result(),
+                    "key_concepts": concepts.result(),
+                    "suggested_questions": questions.result(),
                 }
-            }
-        except Exception as e:
-            print(f"Error generating insights: {str(e)}")
-            # Return basic stats if LLM fails
-            insights = {
-                "summary": "Unable to generate summary due to API error",
-                "key_concepts": [],
-                "suggested_questions": [],
-                "document_stats": {
-                    "total_documents": len(set([doc.metadata.get("source") for doc in documents])),
-                    "total_pages": sum([1 for doc in documents]),
-                }
-            }
         
-        return insights
+        return {
+            **generated,
+            "document_stats": {
+                "total_documents": len(set([doc.metadata.get("source") for doc in documents])),
+                "total_pages": sum([1 for doc in documents]),
+            }
+        }
+
+
+def _chunk_ids(content_hash: str, num_chunks: int, start: int = 0) -> List[str]:
+    """Stable docstore ids for a file's chunks: content hash prefix plus chunk position"""
+    return [f"{content_hash[:16]}:{idx}" for idx in range(start, start + num_chunks)]
+
+
+def _unique_by_hash(file_paths: List[Path], file_hashes: List[str]) -> Tuple[List[Path], List[str]]:
+    """Drop files whose content already appears earlier in the list"""
+    unique = {}
+    for file_path, content_hash in zip(file_paths, file_hashes):
+        unique.setdefault(content_hash, file_path)
+    return list(unique.values()), list(unique.keys())
+
+
+def _manifest_entry(file_path: Path, content_hash: str, pages: int, chunks: int) -> Dict[str, Any]:
+    return {
+        "filename": file_path.name,
+        "content_hash": content_hash,
+        "pages": pages,
+        "chunks": chunks,
+    }
+
+
+def _merge_insights(
+    insights: Dict[str, Any],
+    added: List[Dict[str, Any]],
+    removed: List[Dict[str, Any]],
+    manifest: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Fold per-file insights into a collection's insights and refresh its stats"""
+    removed_concepts = {c for r in removed for c in r.get("key_concepts", [])}
+    removed_questions = {q for r in removed for q in r.get("suggested_questions", [])}
+    
+    concepts = [c for c in insights.get("key_concepts", []) if c not in removed_concepts]
+    questions = [q for q in insights.get("suggested_questions", []) if q not in removed_questions]
+    for a in added:
+        concepts.extend(a.get("key_concepts", []))
+        questions.extend(a.get("suggested_questions", []))
+    
+    summary = insights.get("summary") or ""
+    if not summary and added:
+        summary = added[0].get("summary", "")
+    
+    return {
+        "summary": summary,
+        "key_concepts": list(dict.fromkeys(concepts))[:10],
+        "suggested_questions": list(dict.fromkeys(questions))[:10],
+        "document_stats": {
+            "total_documents": len(manifest),
+            "total_pages": sum(entry.get("pages", 0) for entry in manifest),
+        }
+    }
+
+
+# Per-collection JSON files stored next to the FAISS index (tables live in the TableStore)
+COLLECTION_METADATA_FILES = {
+    "images": ("images.json", list),
+    "insights": ("insights.json", dict),
+    "geometry": ("geometry.json", dict),
+    "retrieval": ("retrieval.json", dict),
+}
+
+
+def _read_collection_metadata(vector_store_path: Path) -> Dict[str, Any]:
+    """images, insights, highlight geometry and retrieval settings of a collection"""
+    metadata = {}
+    for key, (filename, default) in COLLECTION_METADATA_FILES.items():
+        path = vector_store_path / filename
+        if path.exists():
+            with open(path, "r") as f:
+                metadata[key] = json.load(f)
+        else:
+            metadata[key] = default()
+    return metadata
+
+
+def _write_collection_metadata(vector_store_path: Path, **metadata):
+    """Write the given metadata files (keys of COLLECTION_METADATA_FILES)"""
+    for key, value in metadata.items():
+        filename = COLLECTION_METADATA_FILES[key][0]
+        with open(vector_store_path / filename, "w") as f:
+            if key == "geometry":
+                # Geometry is read on every load; keep it compact
+                json.dump(value, f, separators=(",", ":"))
+            else:
+                json.dump(value, f, indent=2)
+
+
+def _page_geometry(pages: List[Document]) -> Dict[str, Dict[str, List[List[float]]]]:
+    """Text block bounding boxes per page: {source: {page: [[x0, y0, x1, y1], ...]}}"""
+    geometry: Dict[str, Dict[str, List[List[float]]]] = {}
+    for page in pages:
+        blocks = json.loads(page.metadata.get("text_blocks", "[]"))
+        geometry.setdefault(page.metadata["source"], {})[str(page.metadata["page"])] = [
+            [round(coord, 1) for coord in block["bbox"]] for block in blocks
+        ]
+    return geometry
+
+
+_collection_locks: Dict[str, threading.Lock] = {}
+_collection_locks_guard = threading.Lock()
+
+
+def _build_lexical_index(vector_store) -> BM25Index:
+    """BM25 index over every chunk in a FAISS store, in index order"""
+    doc_ids = [vector_store.index_to_docstore_id[pos] for pos in sorted(vector_store.index_to_docstore_id)]
+    return BM25Index.build(doc_ids, [vector_store.docstore.search(doc_id).page_content for doc_id in doc_ids])
+
+
+def _update_lexical_index(
+    vector_store_path: Path,
+    vector_store,
+    added: Optional[List[str]] = None,
+    removed: Optional[List[str]] = None
+):
+    """Apply an in-place update to a collection's stored BM25 index.
+    
+    Only the added chunks are tokenized, and only the index delta is written.
+    """
+    lexical_index = BM25Index.load(vector_store_path)
+    if lexical_index is None:
+        # Collections built before the lexical index existed get a full one
+        _build_lexical_index(vector_store).save(vector_store_path)
+        return
+    if removed:
+        lexical_index.remove(removed)
+    if added:
+        lexical_index.add(added, [vector_store.docstore.search(doc_id).page_content for doc_id in added])
+    lexical_index.save(vector_store_path)
+
+
+def _collection_lock(session_id: str) -> threading.Lock:
+    """Serializes modifications of one collection"""
+    with _collection_locks_guard:
+        return _collection_locks.setdefault(session_id, threading.Lock())
+
+
+def _add_geometry(geometry: Dict[str, Dict[str, List[List[float]]]], pages: List[Document]):
+    """Merge the text block boxes of `pages` into a collection's geometry"""
+    for source, page_boxes in _page_geometry(pages).items():
+        geometry.setdefault(source, {}).update(page_boxes)
+
+
+class _CollectionWriter:
+    """Receives ingested files batch by batch and adds them to a collection.
+    
+    Chunks go into the FAISS store (a new flat one is created on the first batch
+    unless an existing store is given), tables into the table store; images and
+    highlight geometry, which are small, are collected for the metadata files.
+    """
+    
+    def __init__(
+        self,
+        vector_store_path: Path,
+        embeddings,
+        vector_store=None,
+        images: Optional[List[Dict[str, Any]]] = None,
+        geometry: Optional[Dict[str, Any]] = None
+    ):
+        self.embeddings = embeddings
+        self.vector_store = vector_store
+        self.table_store = open_table_store(vector_store_path)
+        self.images = images if images is not None else []
+        self.geometry = geometry if geometry is not None else {}
+        self.chunk_ids: List[str] = []
+        self.chunks_added = 0
+        self.tables_added = 0
+        self.images_added = 0
+    
+    def add_chunks(self, chunks: List[Document], vectors: np.ndarray, ids: List[str]):
+        if not chunks:
+            return
+        if self.vector_store is None:
+            self.vector_store = empty_vector_store(self.embeddings, vectors.shape[1])
+        self.vector_store.add_embeddings(
+            list(zip([chunk.page_content for chunk in chunks], vectors)),
+            metadatas=[chunk.metadata for chunk in chunks],
+            ids=ids
+        )
+        self.chunk_ids.extend(ids)
+        self.chunks_added += len(chunks)
+    
+    def add_pages(self, pages: List[Document]):
+        _add_geometry(self.geometry, pages)
+    
+    def add_tables(self, tables: List[Dict[str, Any]]):
+        self.table_store.add(tables)
+        self.tables_added += len(tables)
+    
+    def add_images(self, images: List[Dict[str, Any]]):
+        self.images.extend(images)
+        self.images_added += len(images)
+
+
+class _IngestStats:
+    """Running counters of one ingestion, reported to the job as they advance"""
+    
+    def __init__(self, report: Callable[..., None]):
+        self.report = report
+        self.pages_parsed = 0
+        self.tables_extracted = 0
+        self.chunks_embedded = 0
+        self.files_reused = 0
+        self.parse_seconds = 0.0
+        self.cache_hits = 0
+        self.chunks_encoded = 0
+        self.embed_seconds = 0.0
+        self.embedding_started = False
+    
+    def parsed(self, pages: int, tables: int):
+        self.pages_parsed += pages
+        self.tables_extracted += tables
+        self.report(pages_parsed=self.pages_parsed, tables_extracted=self.tables_extracted)
+    
+    def embedded(self, chunks: int, embed_stats: Dict[str, Any]):
+        self.chunks_embedded += chunks
+        self.cache_hits += embed_stats["embedding_cache_hits"]
+        self.chunks_encoded += embed_stats["chunks_encoded"]
+        self.embed_seconds += embed_stats["embed_seconds"]
+        self.report(chunks_embedded=self.chunks_embedded)
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "files_reused": self.files_reused,
+            "extraction_pages_per_second": (
+                round(self.pages_parsed / self.parse_seconds, 1) if self.parse_seconds else 0.0
+            ),
+            "embedding_cache_hits": self.cache_hits,
+            "embedding_cache_misses": self.chunks_embedded - self.cache_hits,
+            "embedding_cache_hit_rate": (
+                round(self.cache_hits / self.chunks_embedded, 4) if self.chunks_embedded else 0.0
+            ),
+            "embed_chunks_per_second": (
+                round(self.chunks_encoded / self.embed_seconds, 1) if self.embed_seconds else 0.0
+            ),
+        }
 
 
 class EnhancedRAGSystem:
     """Enhanced Retrieval-Augmented Generation system with multi-document support"""
     
     def __init__(self, llm_provider: str = "openai", llm_model: Optional[str] = None):
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        self.embeddings = model_registry.get_embeddings()
+        self.embedder = CachedEmbedder(self.embeddings, EMBEDDING_MODEL_NAME, embedding_cache)
         self.llm_manager = LLMManager(llm_provider, llm_model)
         self.document_processor = DocumentProcessor()
         self.insights_generator = ProactiveInsights(self.llm_manager)
         self.vector_store = None
         self.tables_data = []
+        self.table_store = None
         self.images_info = []
+        self.geometry = {}
+        self.lexical_index = None
+        self.positions = {}
+        self.retrieval = retrieval_settings()
+        self.collection_id = None
     
     def process_files(
         self, 
         file_paths: List[Path], 
-        vector_store_path: Path
+        vector_store_path: Path,
+        progress_callback: Optional[Callable[..., None]] = None,
+        file_hashes: Optional[List[str]] = None,
+        index_type: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process multiple PDF files and create vector store with metadata"""
-        all_documents = []
-        all_tables = []
-        all_images = []
-        
-        # Process each file
-        for file_path in file_paths:
-            print(f"Processing {file_path.name}...")
-            
-            # Extract text with metadata
-            documents = self.document_processor.extract_text_with_metadata(file_path)
-            all_documents.extend(documents)
-            
-            # Extract tables (will fail gracefully if Java not installed)
-            tables = self.document_processor.extract_tables(file_path)
-            all_tables.extend(tables)
-            
-            # Extract image information
-            images = self.document_processor.extract_images_info(file_path)
-            all_images.extend(images)
+        """Process multiple PDF files and create vector store with metadata.
         
-        # Chunk documents
-        chunks = self.document_processor.chunk_documents(all_documents)
+        Files whose content was ingested before (by any collection) are assembled
+        from their stored artifacts without parsing or embedding. `file_hashes`
+        are the SHA-256 digests of `file_paths`, computed here when not given.
+        `index_type` forces a FAISS index type; by default it follows the chunk count.
+        `progress_callback(stage, **counts)` is called as each stage advances.
+        """
+        report = progress_callback or (lambda stage=None, **counts: None)
+        if file_hashes is None:
+            file_hashes = [file_sha256(file_path) for file_path in file_paths]
         
-        # Create vector store
-        print(f"Creating vector store with {len(chunks)} chunks...")
-        self.vector_store = FAISS.from_documents(chunks, self.embeddings)
+        # A collection holds each distinct file content once
+        file_paths, file_hashes = _unique_by_hash(file_paths, file_hashes)
         
-        # Save vector store
+        # Pages flow through parse -> chunk -> embed -> index in bounded batches
         vector_store_path.mkdir(parents=True, exist_ok=True)
-        self.vector_store.save_local(str(vector_store_path))
-        print(f"Vector store saved to {vector_store_path}")
+        writer = _CollectionWriter(vector_store_path, self.embeddings)
+        manifest, stats = self._ingest_files(file_paths, file_hashes, writer, report)
+        if writer.vector_store is None:
+            raise ValueError("No text could be extracted from the uploaded files")
         
-        # Save tables and images metadata
-        with open(vector_store_path / "tables.json", "w") as f:
-            json.dump(all_tables, f, indent=2)
+        # Convert the streamed flat index to the type chosen for the final size
+        report("indexing")
+        print(f"Creating vector store with {writer.chunks_added} chunks...")
+        self.vector_store = writer.vector_store
+        index_config = finalize_vector_store(self.vector_store, index_type)
         
-        with open(vector_store_path / "images.json", "w") as f:
-            json.dump(all_images, f, indent=2)
+        # Save vector store and the index settings chosen for it
+        save_vector_store(self.vector_store, vector_store_path)
+        write_index_config(vector_store_path, index_config)
+        print(f"Vector store ({index_config['index_type']}) saved to {vector_store_path}")
+        
+        # Lexical index for hybrid retrieval, over the same chunk ids
+        self.lexical_index = _build_lexical_index(self.vector_store)
+        self.lexical_index.save(vector_store_path)
+        
+        # Tables are already in the table store; save images and highlight geometry
+        _write_collection_metadata(
+            vector_store_path,
+            images=writer.images,
+            geometry=writer.geometry
+        )
         
-        # Generate proactive insights
-        print("Generating insights...")
-        insights = self.insights_generator.analyze_document(all_documents[:10])
+        # Record the source files and take a reference on their shared artifacts
+        write_manifest(vector_store_path, manifest)
+        artifact_store.acquire(vector_store_path.name, file_hashes)
         
-        # Save insights
-        with open(vector_store_path / "insights.json", "w") as f:
-            json.dump(insights, f, indent=2)
+        # Insights are generated later by schedule_insights, once the collection is queryable
+        _write_collection_metadata(vector_store_path, insights={"status": "pending"})
         
         return {
             "status": "success",
-            "chunks_created": len(chunks),
+            "chunks_created": writer.chunks_added,
             "documents_processed": len(file_paths),
-            "tables_extracted": len(all_tables),
-            "images_found": len(all_images),
-            "insights": insights
+            "tables_extracted": writer.tables_added,
+            "images_found": writer.images_added,
+            "index_type": index_config["index_type"],
+            **stats,
+            "insights_status": "pending"
         }
     
+    def add_files(
+        self,
+        file_paths: List[Path],
+        vector_store_path: Path,
+        progress_callback: Optional[Callable[..., None]] = None,
+        file_hashes: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Append PDFs to an existing collection in place.
+        
+        Only the new files are parsed and embedded; their vectors are added to the
+        stored index and their tables, images and insights merged into the
+        collection's metadata.
+        """
+        report = progress_callback or (lambda stage=None, **counts: None)
+        if file_hashes is None:
+            file_hashes = [file_sha256(file_path) for file_path in file_paths]
+        
+        with _collection_lock(vector_store_path.name):
+            manifest = read_manifest(vector_store_path)
+            present_hashes = {entry["content_hash"] for entry in manifest}
+            present_names = {entry["filename"] for entry in manifest}
+            
+            new_paths, new_hashes = [], []
+            for file_path, content_hash in zip(*_unique_by_hash(file_paths, file_hashes)):
+                if content_hash in present_hashes:
+                    continue
+                if file_path.name in present_names:
+                    raise ValueError(f"A different file named '{file_path.name}' is already in this collection")
+                new_paths.append(file_path)
+                new_hashes.append(content_hash)
+            
+            if not new_paths:
+                return {"status": "unchanged", "chunks_created": 0, "documents_processed": 0}
+            
+            # Writable load: the cached copy is read-only and may be serving searches.
+            # New chunks stream into the existing index, whatever its type.
+            vector_store = load_vector_store(vector_store_path, self.embeddings)
+            metadata = _read_collection_metadata(vector_store_path)
+            writer = _CollectionWriter(
+                vector_store_path,
+                self.embeddings,
+                vector_store=vector_store,
+                images=metadata["images"],
+                geometry=metadata["geometry"]
+            )
+            try:
+                new_entries, stats = self._ingest_files(new_paths, new_hashes, writer, report)
+            except BaseException:
+                # Tables are stored as they stream in; nothing else was saved yet
+                for file_path in new_paths:
+                    writer.table_store.remove_source(file_path.name)
+                raise
+            
+            report("indexing")
+            index_config = read_index_config(vector_store_path)
+            save_vector_store(vector_store, vector_store_path)
+            index_config["num_vectors"] = vector_store.index.ntotal
+            write_index_config(vector_store_path, index_config)
+            _update_lexical_index(vector_store_path, vector_store, added=writer.chunk_ids)
+            
+            manifest.extend(new_entries)
+            write_manifest(vector_store_path, manifest)
+            artifact_store.acquire(vector_store_path.name, new_hashes)
+            
+            # Current insights stay readable; the new files are folded in by schedule_insights
+            metadata["insights"] = {**metadata["insights"], "status": "pending"}
+            _write_collection_metadata(vector_store_path, **metadata)
+            
+            collection_cache.invalidate(vector_store_path.name)
+            answer_cache.invalidate(vector_store_path.name)
+            self.vector_store = vector_store
+        
+        return {
+            "status": "success",
+            "chunks_created": writer.chunks_added,
+            "documents_processed": len(new_paths),
+            "tables_extracted": writer.tables_added,
+            "images_found": writer.images_added,
+            **stats,
+            "insights_status": "pending"
+        }
+    
+    def remove_source(self, vector_store_path: Path, source: str) -> Dict[str, Any]:
+        """Remove one source file's chunks, tables and images from a collection in place"""
+        with _collection_lock(vector_store_path.name):
+            manifest = read_manifest(vector_store_path)
+            entry = next((e for e in manifest if e["filename"] == source), None)
+            
+            vector_store = load_vector_store(vector_store_path, self.embeddings)
+            
+            if entry is not None:
+                ids = _chunk_ids(entry["content_hash"], entry["chunks"])
+            else:
+                # Collections built before chunk ids were stable: find chunks by metadata
+                ids = [
+                    doc_id for doc_id, doc in vector_store.docstore._dict.items()
+                    if doc.metadata.get("source") == source
+                ]
+            
+            if not ids:
+                raise KeyError(f"Source '{source}' not found in this collection")
+            if len(ids) >= len(vector_store.index_to_docstore_id):
+                raise ValueError("Cannot remove the last document of a collection; delete the collection instead")
+            
+            index_config = read_index_config(vector_store_path)
+            delete_from_vector_store(vector_store, ids, index_config)
+            save_vector_store(vector_store, vector_store_path)
+            index_config["num_vectors"] = vector_store.index.ntotal
+            write_index_config(vector_store_path, index_config)
+            _update_lexical_index(vector_store_path, vector_store, removed=ids)
+            
+            open_table_store(vector_store_path).remove_source(source)
+            
+            metadata = _read_collection_metadata(vector_store_path)
+            metadata["images"] = [i for i in metadata["images"] if i.get("source") != source]
+            metadata["geometry"].pop(source, None)
+            
+            removed_insights = []
+            if entry is not None:
+                manifest.remove(entry)
+                write_manifest(vector_store_path, manifest)
+                artifact_store.release(vector_store_path.name, [entry["content_hash"]])
+                file_insights = artifact_store.load_insights(entry["content_hash"])
+                if file_insights:
+                    removed_insights.append(file_insights)
+            insights_status = metadata["insights"].get("status")
+            metadata["insights"] = _merge_insights(metadata["insights"], [], removed_insights, manifest)
+            if insights_status:
+                metadata["insights"]["status"] = insights_status
+            _write_collection_metadata(vector_store_path, **metadata)
+            
+            collection_cache.invalidate(vector_store_path.name)
+            answer_cache.invalidate(vector_store_path.name)
+            self.vector_store = vector_store
+        
+        return {"status": "success", "source": source, "chunks_removed": len(ids)}
+    
+    def _file_insights(self, content_hash: str, pages: List[Document]) -> Dict[str, Any]:
+        """Insights for a single file, stored with its artifact"""
+        insights = artifact_store.load_insights(content_hash)
+        if insights is None:
+            insights = self.insights_generator.analyze_document(pages[:10])
+            # Only keep insights the LLM actually produced
+            if insights.get("key_concepts"):
+                artifact_store.save_insights(content_hash, insights)
+        return insights
+    
+    def generate_insights(self, vector_store_path: Path, content_hashes: List[str]):
+        """Generate insights for newly ingested files and store them with the collection.
+        
+        A new collection gets insights of its own (reused for a single file seen
+        before); files added to an existing one are folded into its insights.
+        Runs after the collection is queryable; LLM calls happen outside the lock.
+        """
+        wanted = set(content_hashes)
+        entries = [e for e in read_manifest(vector_store_path) if e["content_hash"] in wanted]
+        if not entries:
+            return
+        pages = {e["content_hash"]: artifact_store.load_pages(e["content_hash"], e["filename"]) for e in entries}
+        
+        is_new = "document_stats" not in _read_collection_metadata(vector_store_path)["insights"]
+        print(f"Generating insights for {len(entries)} file(s)...")
+        if not is_new:
+            added = [self._file_insights(e["content_hash"], pages[e["content_hash"]]) for e in entries]
+        elif len(entries) == 1:
+            added = [self._file_insights(entries[0]["content_hash"], pages[entries[0]["content_hash"]])]
+        else:
+            added = [self.insights_generator.analyze_document(
+                [page for e in entries for page in pages[e["content_hash"]]][:10]
+            )]
+        
+        with _collection_lock(vector_store_path.name):
+            if not vector_store_path.exists():
+                return  # Deleted meanwhile
+            manifest = read_manifest(vector_store_path)
+            current = _read_collection_metadata(vector_store_path)["insights"]
+            if is_new:
+                insights = {**added[0], "document_stats": _merge_insights({}, [], [], manifest)["document_stats"]}
+            else:
+                insights = _merge_insights(current, added, [], manifest)
+            # Files of an earlier failed run that this one did not cover stay failed
+            present = {e["content_hash"] for e in manifest}
+            still_failed = [h for h in current.get("failed_hashes", []) if h not in wanted and h in present]
+            if still_failed:
+                insights.update(status="failed", failed_hashes=still_failed)
+            _write_collection_metadata(vector_store_path, insights=insights)
+    
+    def _ingest_files(
+        self,
+        file_paths: List[Path],
+        file_hashes: List[str],
+        writer: _CollectionWriter,
+        report: Callable[..., None]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Feed files into `writer` in input order; returns their manifest entries and stats.
+        
+        Content already in the artifact store is replayed from it without parsing or
+        embedding; everything else is built (and saved there) by the streaming pipeline.
+        """
+        stats = _IngestStats(report)
+        report("parsing")
+        
+        manifest = []
+        for file_path, content_hash in zip(file_paths, file_hashes):
+            if artifact_store.exists(content_hash):
+                pages, chunks = self._replay_file(file_path, content_hash, writer)
+                stats.files_reused += 1
+            elif file_path.exists():
+                pages, chunks = self._build_file(file_path, content_hash, writer, stats)
+            else:
+                # Uploads of known content are not copied; the upload holds a reference on
+                # its artifact (see endpoints._save_uploaded_pdfs), so this means it was lost
+                raise FileNotFoundError(f"{file_path.name} is no longer stored; upload it again")
+            manifest.append(_manifest_entry(file_path, content_hash, pages, chunks))
+        
+        return manifest, stats.summary()
+    
+    def _build_file(
+        self,
+        file_path: Path,
+        content_hash: str,
+        writer: _CollectionWriter,
+        stats: _IngestStats
+    ) -> Tuple[int, int]:
+        """Streaming pipeline for one new file; returns its (page, chunk) counts.
+        
+        Page ranges are parsed on a background thread (and the process pool when
+        configured) at most INGEST_PREFETCH_RANGES ahead; their chunks are embedded
+        and added to the index and the artifact one embedder batch at a time, so
+        memory use follows the batch and range sizes, not the file size.
+        """
+        print(f"Processing {file_path.name}...")
+        # The pymupdf table backend detects tables in the parsing pass
+        tables_in_pass = TABLE_BACKEND == "pymupdf"
+        batch_size = self.embedder.batch_size
+        artifact = artifact_store.writer(content_hash)
+        pages = 0
+        chunks_done = 0
+        table_index = 0
+        pending: List[Document] = []
+        
+        def embed_and_add(batch: List[Document]):
+            nonlocal chunks_done
+            if not stats.embedding_started:
+                stats.embedding_started = True
+                stats.report("embedding")
+            vectors, embed_stats = self.embedder.embed_documents([chunk.page_content for chunk in batch])
+            vectors = np.asarray(vectors, dtype=np.float32)
+            artifact.add_chunks(batch, vectors)
+            writer.add_chunks(batch, vectors, _chunk_ids(content_hash, len(batch), start=chunks_done))
+            chunks_done += len(batch)
+            stats.embedded(len(batch), embed_stats)
+        
+        def add_tables(tables: List[Dict[str, Any]]):
+            nonlocal table_index
+            for table in tables:
+                table["table_index"] = table_index
+                table_index += 1
+            artifact.add_tables(tables)
+            writer.add_tables(tables)
+        
+        parsed = _Prefetch(
+            self.document_processor.iter_pdf(file_path, with_tables=tables_in_pass),
+            INGEST_PREFETCH_RANGES,
+            name="ingest-parse"
+        )
+        try:
+            for documents, images, tables in parsed:
+                artifact.add_pages(documents)
+                writer.add_pages(documents)
+                artifact.add_images(images)
+                writer.add_images(images)
+                add_tables(tables)
+                pages += len(documents)
+                stats.parsed(len(documents), len(tables))
+                
+                pending.extend(self.document_processor.chunk_documents(documents))
+                while len(pending) >= batch_size:
+                    embed_and_add(pending[:batch_size])
+                    del pending[:batch_size]
+            
+            if pending:
+                embed_and_add(pending)
+            stats.parse_seconds += parsed.busy_seconds
+            
+            # Tabula backend: page ranges on the shared JVM (fails gracefully without Java)
+            if not tables_in_pass:
+                tables = self.document_processor.extract_tables(file_path)
+                add_tables(tables)
+                stats.parsed(0, len(tables))
+        except BaseException:
+            artifact.abort()
+            raise
+        
+        artifact.commit()
+        return pages, chunks_done
+    
+    def _replay_file(self, file_path: Path, content_hash: str, writer: _CollectionWriter) -> Tuple[int, int]:
+        """Add a stored artifact to `writer`; returns its (page, chunk) counts"""
+        artifact = artifact_store.load(content_hash, file_path.name, str(file_path))
+        writer.add_pages(artifact["pages"])
+        writer.add_images(artifact["images"])
+        writer.add_tables(artifact["tables"])
+        
+        chunks, vectors = artifact["chunks"], artifact["vectors"]
+        batch_size = self.embedder.batch_size
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            writer.add_chunks(
+                batch,
+                np.asarray(vectors[start:start + batch_size], dtype=np.float32),
+                _chunk_ids(content_hash, len(batch), start=start)
+            )
+        return len(artifact["pages"]), len(chunks)
+    
     def load_vector_store(self, vector_store_path: Path):
-        """Load existing vector store and metadata"""
-        self.vector_store = FAISS.load_local(
-            str(vector_store_path),
-            self.embeddings,
-            allow_dangerous_deserialization=True
+        """Load existing vector store and metadata (served from the collection cache when hot)"""
+        collection = collection_cache.get_or_load(
+            vector_store_path.name,
+            lambda: self._read_collection(vector_store_path)
         )
+        self.vector_store = collection.vector_store
+        self.tables_data = collection.tables_data
+        self.table_store = TableStore(vector_store_path)
+        self.images_info = collection.images_info
+        self.geometry = collection.geometry
+        self.lexical_index = collection.lexical_index
+        self.positions = collection.positions
+        self.retrieval = retrieval_settings(collection.retrieval)
+        self.collection_id = vector_store_path.name
+    
+    def _read_collection(self, vector_store_path: Path) -> LoadedCollection:
+        """Deserialize a collection from disk"""
+        # Read-only: chat never modifies the store, so the index can be memory-mapped
+        vector_store = load_vector_store(vector_store_path, self.embeddings, read_only=True)
+        
+        metadata = _read_collection_metadata(vector_store_path)
         
-        # Load tables
-        tables_path = vector_store_path / "tables.json"
-        if tables_path.exists():
-            with open(tables_path, "r") as f:
-                self.tables_data = json.load(f)
+        # Collections built before the lexical index existed get one in memory
+        lexical_index = BM25Index.load(vector_store_path)
+        if lexical_index is None and RETRIEVAL_MODE == "hybrid":
+            lexical_index = _build_lexical_index(vector_store)
         
-        # Load images
-        images_path = vector_store_path / "images.json"
-        if images_path.exists():
-            with open(images_path, "r") as f:
-                self.images_info = json.load(f)
+        # A mapped index lives in the shared page cache; one read in counts against the budget
+        return LoadedCollection(
+            vector_store=vector_store,
+            tables_data=open_table_store(vector_store_path).catalog(),
+            images_info=metadata["images"],
+            size_bytes=collection_size_bytes(vector_store_path, exclude=["index.faiss"] if FAISS_MMAP else []),
+            geometry=metadata["geometry"],
+            lexical_index=lexical_index,
+            retrieval=metadata["retrieval"],
+            positions={doc_id: pos for pos, doc_id in vector_store.index_to_docstore_id.items()}
+        )
     
-    def query_tables(self, question: str) -> Optional[str]:
-        """Query tables using LLM"""
+    def build_table_prompt(self, question: str) -> Optional[str]:
+        """Prompt for answering from the extracted tables, or None without tables.
+        
+        The tables whose schemas best match the question are offered to the LLM,
+        which writes one SQLite query; it runs locally against the collection's
+        table store and only the (capped) result goes into the answer prompt.
+        """
+        sql_prompt = self._table_sql_prompt(question)
+        if sql_prompt is None:
+            return None
+        
+        schema_text, prompt = sql_prompt
+        return self._table_answer_prompt(question, schema_text, self.llm_manager.generate_response(prompt))
+    
+    async def abuild_table_prompt(self, question: str) -> Optional[str]:
+        """Async build_table_prompt: the SQL comes from the pooled async LLM client,
+        whose LLMError failures propagate; the table store work runs on the compute pool"""
+        sql_prompt = await compute_pool.run(self._table_sql_prompt, question)
+        if sql_prompt is None:
+            return None
+        
+        schema_text, prompt = sql_prompt
+        sql = await self.llm_manager.agenerate_response(prompt)
+        return await compute_pool.run(self._table_answer_prompt, question, schema_text, sql)
+    
+    def _table_sql_prompt(self, question: str) -> Optional[Tuple[str, str]]:
+        """(schema text, SQL-writing prompt) for the best-matching tables, or None without tables"""
         if not self.tables_data:
             return None
         
-        # Convert tables to text format
-        tables_text = "\n\n".join([
-            f"Table from {t['source']}:\n{t['csv_string']}"
-            for t in self.tables_data
-        ])
+        tables = self.select_tables(question)
+        schema_text = "\n".join(self._table_schema(table) for table in tables)
+        
+        return schema_text, f"""Write one SQLite SELECT query that answers the question from these tables.
+Use only the listed tables and columns. Return only the SQL, without explanation.
+
+Tables:
+{schema_text}
+
+Question: {question}
+
+SQL:"""
+    
+    def _table_answer_prompt(self, question: str, schema_text: str, sql: str) -> str:
+        """Run the LLM-written query and build the answer prompt from its result"""
+        sql = sql.strip().removeprefix("```sql").removeprefix("```").removesuffix("```").strip()
+        
+        try:
+            columns, rows, truncated = self.table_store.query(sql)
+        except (ValueError, sqlite3.Error) as e:
+            print(f"Table query failed ({e}); answering from table samples")
+            return f"""Based on the following table schemas and sample rows, answer this question: {question}
+Only sample rows are shown; say so if the answer needs the full table.
+
+Tables:
+{schema_text}
+
+Answer:"""
         
-        prompt = f"""Based on the following tables, answer this question: {question}
+        result_text = pd.DataFrame(rows, columns=columns).to_csv(index=False)
+        note = f"(first {len(rows)} rows shown)\n" if truncated else ""
+        
+        return f"""Based on the following query result over tables extracted from the documents, answer this question: {question}
 
 Tables:
-{tables_text[:3000]}
+{schema_text}
+
+Query:
+{sql}
 
+Result:
+{note}{result_text}
 Answer:"""
+    
+    def select_tables(self, question: str) -> List[Dict[str, Any]]:
+        """Catalog entries most relevant to the question, by overlap with column names and source"""
+        question_tokens = set(tokenize(question))
         
-        return self.llm_manager.generate_response(prompt)
+        def overlap(table):
+            schema_tokens = set(tokenize(" ".join(table["columns"] + [table["source"]])))
+            return len(question_tokens & schema_tokens)
+        
+        ranked = sorted(self.tables_data, key=overlap, reverse=True)
+        return ranked[:TABLE_QUERY_MAX_TABLES]
     
-    def get_answer_with_sources(
-        self, 
-        question: str, 
-        k: int = 4
-    ) -> Dict[str, Any]:
-        """Get answer with detailed source information for highlighting"""
-        if not self.vector_store:
-            return {"error": "Vector store not loaded"}
+    def _table_schema(self, table: Dict[str, Any]) -> str:
+        """One table's schema line plus a few sample rows, for prompts"""
+        columns = ", ".join(
+            f'{name} {sql_type} ("{original}")'
+            for name, sql_type, original in zip(table["sql_columns"], table["types"], table["columns"])
+        )
+        samples = "\n".join(f"  {row}" for row in self.table_store.sample_rows(table["table_name"]))
+        return f"{table['table_name']}({columns})  [{table['row_count']} rows, from {table['source']}]\n{samples}"
+    
+    def query_tables(self, question: str) -> Optional[str]:
+        """Query tables using LLM"""
+        prompt = self.build_table_prompt(question)
+        if prompt is None:
+            return None
         
-        # Check if question is about tables
+        return self.llm_manager.generate_response(prompt)
+    
+    def is_table_question(self, question: str) -> bool:
+        """Check if question is about tables"""
         table_keywords = ["table", "data", "row", "column", "value", "sales", "revenue"]
-        if any(keyword in question.lower() for keyword in table_keywords):
-            table_answer = self.query_tables(question)
-            if table_answer:
-                return {
-                    "answer": table_answer,
-                    "type": "table_query",
-                    "sources": []
-                }
+        return any(keyword in question.lower() for keyword in table_keywords)
+    
+    def retrieve(
+        self,
+        question: str,
+        k: int = 4,
+        query_vector: Optional[List[float]] = None
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Retrieve relevant chunks: returns the context parts and their source info.
+        
+        max(k, CONTEXT_CANDIDATES) candidates are retrieved and k of them picked by
+        maximal marginal relevance, with the retrieval rank as relevance (so the
+        hybrid order, including BM25-only hits, is kept) and candidate vectors
+        read back from the index. Collections with reranking enabled instead
+        have their top rerank_top_n candidates chosen by the cross-encoder, unless
+        that would exceed rerank_budget_ms. Chunks that overlap on a page are
+        merged into one context part, and parts are packed into the answering
+        model's context token budget; sources list every chunk in the context.
         
-        # Retrieve relevant documents
-        docs_and_scores = self.vector_store.similarity_search_with_score(question, k=k)
+        relevance_score is the cross-encoder score when reranked, else the FAISS
+        distance in "vector" mode and the fused reciprocal-rank score (higher is
+        better) in "hybrid" mode. Pass `query_vector` when the question was
+        already embedded.
+        """
+        if query_vector is None:
+            query_vector = self.embeddings.embed_query(question)
+        
+        rerank = self.retrieval["rerank"]
+        candidates = max(k, CONTEXT_CANDIDATES, self.retrieval["rerank_candidates"] if rerank else 0)
+        if RETRIEVAL_MODE == "hybrid" and self.lexical_index is not None:
+            ranking = self._hybrid_ranking(question, candidates, query_vector)
+        else:
+            ranking = self._vector_ranking(query_vector, candidates)
+        docs_and_scores = [(self.vector_store.docstore.search(doc_id), score) for doc_id, score in ranking]
+        
+        picked = None
+        if rerank:
+            picked = reranker.rerank(
+                question,
+                docs_and_scores[:self.retrieval["rerank_candidates"]],
+                self.retrieval["rerank_top_n"],
+                self.retrieval["rerank_budget_ms"]
+            )
+        if picked is None:
+            vectors = reconstruct_vectors(self.vector_store.index, [self.positions[doc_id] for doc_id, _ in ranking])
+            picked = [docs_and_scores[idx] for idx in mmr_order(rank_relevance(len(ranking)), vectors, k)]
+        
+        model = self.llm_manager.api_model_name
+        passages = assemble_context(picked, context_token_budget(model), model)
         
         # Prepare context with source information
         context_parts = []
         sources = []
         
-        for doc, score in docs_and_scores:
-            context_parts.append(doc.page_content)
-            
-            # Parse text blocks for highlighting
-            text_blocks = []
-            if "text_blocks" in doc.metadata:
-                try:
-                    text_blocks = json.loads(doc.metadata["text_blocks"])
-                except:
-                    text_blocks = []
+        for passage in passages:
+            context_parts.append(passage.text)
             
-            sources.append({
-                "source": doc.metadata.get("source", "Unknown"),
-                "page": doc.metadata.get("page", 0),
-                "file_path": doc.metadata.get("file_path", ""),
-                "relevance_score": float(score),
-                "text_preview": doc.page_content[:200] + "...",
-                "text_blocks": text_blocks
-            })
+            for doc, score in passage.chunks:
+                sources.append({
+                    "source": doc.metadata.get("source", "Unknown"),
+                    "page": doc.metadata.get("page", 0),
+                    "file_path": doc.metadata.get("file_path", ""),
+                    "relevance_score": float(score),
+                    "text_preview": doc.page_content[:200] + "...",
+                    "text_blocks": self._chunk_geometry(doc)
+                })
+        
+        return context_parts, sources
+    
+    def hybrid_search(
+        self,
+        question: str,
+        k: int = 4,
+        query_vector: Optional[List[float]] = None
+    ) -> List[Tuple[Document, float]]:
+        """Top-k chunks by reciprocal-rank fusion of FAISS and BM25 candidate lists.
         
+        Each list holds max(k, HYBRID_CANDIDATES) candidates, so k results come
+        back whenever the collection has that many chunks.
+        """
+        if query_vector is None:
+            query_vector = self.embeddings.embed_query(question)
+        fused = self._hybrid_ranking(question, k, query_vector)
+        return [(self.vector_store.docstore.search(doc_id), score) for doc_id, score in fused]
+    
+    def _hybrid_ranking(self, question: str, k: int, query_vector: List[float]) -> List[Tuple[str, float]]:
+        """(docstore id, fused score) of the hybrid_search results"""
+        candidates = max(k, HYBRID_CANDIDATES)
+        vector_ranking = [doc_id for doc_id, _ in self._vector_ranking(query_vector, candidates)]
+        lexical_ranking = [doc_id for doc_id, _ in self.lexical_index.search(question, candidates)]
+        return reciprocal_rank_fusion([vector_ranking, lexical_ranking], k, RRF_K)
+    
+    def _vector_ranking(self, query_vector: List[float], k: int) -> List[Tuple[str, float]]:
+        """(docstore id, FAISS distance) of the k nearest chunks"""
+        distances, positions = self.vector_store.index.search(
+            np.asarray([query_vector], dtype=np.float32), k
+        )
+        return [
+            (self.vector_store.index_to_docstore_id[int(pos)], float(distance))
+            for pos, distance in zip(positions[0], distances[0]) if pos != -1
+        ]
+    
+    def _chunk_geometry(self, doc: Document) -> List[Dict[str, Any]]:
+        """Bounding boxes of the page text blocks this chunk overlaps, for highlighting"""
+        block_range = doc.metadata.get("block_range")
+        if block_range is not None:
+            page_boxes = self.geometry.get(doc.metadata.get("source"), {}).get(str(doc.metadata.get("page")), [])
+            return [{"bbox": bbox} for bbox in page_boxes[block_range[0]:block_range[1] + 1]]
+        
+        # Chunks ingested before block ranges carry the whole page's blocks
+        if "text_blocks" in doc.metadata:
+            try:
+                return json.loads(doc.metadata["text_blocks"])
+            except:
+                return []
+        return []
+    
+    def build_answer_prompt(self, question: str, context_parts: List[str]) -> str:
+        """Prompt template for grounded answers"""
         context = "\n\n".join(context_parts)
         
-        # Generate answer with prompt template
-        prompt = f"""You are a helpful AI assistant analyzing documents. Answer the question based on the provided context.
+        return f"""You are a helpful AI assistant analyzing documents. Answer the question based on the provided context.
 If the context doesn't contain the answer, say so clearly.
 
 Context from multiple documents:
@@ -423,14 +1427,159 @@ Context from multiple documents:
 Question: {question}
 
 Provide a clear, detailed answer citing specific sources when possible:"""
+    
+    def get_answer_with_sources(
+        self, 
+        question: str, 
+        k: int = 4
+    ) -> Dict[str, Any]:
+        """Get answer with detailed source information for highlighting.
         
-        answer = self.llm_manager.generate_response(prompt)
+        Answers to semantically equivalent earlier questions come from the answer
+        cache, without retrieval or an LLM call.
+        """
+        if not self.vector_store:
+            return {"error": "Vector store not loaded"}
         
-        return {
-            "answer": answer,
+        query_vector, cached, prompt, result = self._prepare_answer(question, k)
+        if cached is not None:
+            return cached
+        
+        result["answer"] = self.llm_manager.generate_response(prompt)
+        if not result["answer"].startswith(LLM_ERROR_PREFIX):
+            answer_cache.store(self._answer_scope(), question, query_vector, result)
+        return result
+    
+    async def aget_answer_with_sources(self, question: str, k: int = 4) -> Dict[str, Any]:
+        """Async get_answer_with_sources: retrieval and table queries run on the compute
+        pool, and both the table SQL and the answer come from the pooled async LLM
+        client, whose LLMError failures propagate"""
+        if not self.vector_store:
+            return {"error": "Vector store not loaded"}
+        
+        query_vector, cached = await compute_pool.run(self._cached_answer, question)
+        if cached is not None:
+            return cached
+        
+        prompt = await self.abuild_table_prompt(question) if self.is_table_question(question) else None
+        if prompt is not None:
+            result = {"type": "table_query", "sources": []}
+        else:
+            prompt, result = await compute_pool.run(self._document_prompt, question, k, query_vector)
+        
+        result["answer"] = await self.llm_manager.agenerate_response(prompt)
+        answer_cache.store(self._answer_scope(), question, query_vector, result)
+        return result
+    
+    def _prepare_answer(
+        self,
+        question: str,
+        k: int
+    ) -> Tuple[List[float], Optional[Dict[str, Any]], Optional[str], Dict[str, Any]]:
+        """Everything before the answering LLM call.
+        
+        Returns (query vector, cached result or None, answer prompt, result without
+        "answer"). Table questions use the table prompt when the collection has tables.
+        """
+        query_vector, cached = self._cached_answer(question)
+        if cached is not None:
+            return query_vector, cached, None, {}
+        
+        if self.is_table_question(question):
+            prompt = self.build_table_prompt(question)
+            if prompt is not None:
+                return query_vector, None, prompt, {"type": "table_query", "sources": []}
+        
+        prompt, result = self._document_prompt(question, k, query_vector)
+        return query_vector, None, prompt, result
+    
+    def _cached_answer(self, question: str) -> Tuple[List[float], Optional[Dict[str, Any]]]:
+        """(query vector, answer cache hit or None)"""
+        query_vector = self.embeddings.embed_query(question)
+        return query_vector, answer_cache.lookup(self._answer_scope(), question, query_vector)
+    
+    def _document_prompt(
+        self,
+        question: str,
+        k: int,
+        query_vector: List[float]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Retrieve relevant chunks; returns the answer prompt and the result without its answer"""
+        context_parts, sources = self.retrieve(question, k=k, query_vector=query_vector)
+        prompt = self.build_answer_prompt(question, context_parts)
+        return prompt, {
             "type": "document_query",
             "sources": sources,
-            "context_used": len(context_parts)
+            "context_used": len(context_parts),
+            "prompt_tokens": count_tokens(prompt, self.llm_manager.api_model_name)
+        }
+    
+    def _answer_scope(self) -> Tuple[str, str, str]:
+        """Answer cache scope: (collection, provider, model)"""
+        return (self.collection_id or "", self.llm_manager.llm_provider, self.llm_manager.llm_model or "default")
+    
+    def stream_answer_with_sources(
+        self,
+        question: str,
+        k: int = 4
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Streaming variant of get_answer_with_sources.
+        
+        Yields (event, payload) pairs: one "sources" event as soon as retrieval
+        finishes, a "token" event per streamed chunk, then a "done" event with
+        context_used, prompt_tokens, whether the answer came from the answer cache, and timings
+        in milliseconds. A cached answer arrives as a single token event.
+        """
+        start = time.perf_counter()
+        if not self.vector_store:
+            yield "error", {"error": "Vector store not loaded"}
+            return
+        
+        query_vector, cached, prompt, partial = self._prepare_answer(question, k)
+        if cached is not None:
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+            yield "sources", {"type": cached["type"], "sources": cached["sources"]}
+            yield "token", {"text": cached["answer"]}
+            yield "done", {
+                "context_used": cached.get("context_used"),
+                "cached": True,
+                "timing": {"retrieval_ms": elapsed_ms, "time_to_first_token_ms": elapsed_ms, "total_ms": elapsed_ms}
+            }
+            return
+        
+        answer_type = partial["type"]
+        sources = partial["sources"]
+        context_used = partial.get("context_used")
+        
+        retrieval_ms = (time.perf_counter() - start) * 1000
+        yield "sources", {"type": answer_type, "sources": sources}
+        
+        first_token_ms = None
+        tokens = []
+        for token in self.llm_manager.stream_response(prompt):
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start) * 1000
+            tokens.append(token)
+            yield "token", {"text": token}
+        
+        # Only complete streams reach this point; failures raise out of the loop
+        answer_cache.store(self._answer_scope(), question, query_vector, {
+            "answer": "".join(tokens),
+            "type": answer_type,
+            "sources": sources,
+            "context_used": context_used,
+            "prompt_tokens": partial.get("prompt_tokens")
+        })
+        
+        yield "done", {
+            "context_used": context_used,
+            "prompt_tokens": partial.get("prompt_tokens"),
+            "cached": False,
+            "timing": {
+                "retrieval_ms": round(retrieval_ms, 1),
+                "time_to_first_token_ms": round(first_token_ms, 1) if first_token_ms is not None else None,
+                "total_ms": round((time.perf_counter() - start) * 1000, 1)
+            }
         }
 
 
@@ -439,13 +1588,58 @@ def process_files(
     file_paths: List[Path], 
     vector_store_path: Path,
     llm_provider: str = "openai",
-    llm_model: Optional[str] = None
+    llm_model: Optional[str] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+    file_hashes: Optional[List[str]] = None,
+    index_type: Optional[str] = None
 ) -> Dict[str, Any]:
     """Main function to process files"""
     rag_system = EnhancedRAGSystem(llm_provider, llm_model)
-    return rag_system.process_files(file_paths, vector_store_path)
+    return rag_system.process_files(file_paths, vector_store_path, progress_callback, file_hashes, index_type)
+
+
+
+def add_files_to_collection(
+    file_paths: List[Path],
+    vector_store_path: Path,
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+    file_hashes: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Append files to an existing collection"""
+    rag_system = EnhancedRAGSystem(llm_provider, llm_model)
+    return rag_system.add_files(file_paths, vector_store_path, progress_callback, file_hashes)
 
 
+def remove_source_from_collection(
+    vector_store_path: Path,
+    source: str,
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None
+) -> Dict[str, Any]:
+    """Remove one source file from an existing collection"""
+    rag_system = EnhancedRAGSystem(llm_provider, llm_model)
+    return rag_system.remove_source(vector_store_path, source)
+
+
+def get_retrieval_settings(vector_store_path: Path) -> Dict[str, Any]:
+    """Effective retrieval settings of a collection (stored overrides on the defaults)"""
+    return retrieval_settings(_read_collection_metadata(vector_store_path)["retrieval"])
+
+
+def update_retrieval_settings(vector_store_path: Path, changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Store retrieval setting overrides of a collection; returns the effective settings"""
+    with _collection_lock(vector_store_path.name):
+        stored = _read_collection_metadata(vector_store_path)["retrieval"]
+        stored.update({key: value for key, value in changes.items() if value is not None})
+        _write_collection_metadata(vector_store_path, retrieval=stored)
+        
+        # Cached collections and answers were retrieved with the old settings
+        collection_cache.invalidate(vector_store_path.name)
+        answer_cache.invalidate(vector_store_path.name)
+    return retrieval_settings(stored)
+
 def get_chat_answer(
     question: str, 
     vector_store_path: Path,
@@ -458,6 +1652,88 @@ def get_chat_answer(
     return rag_system.get_answer_with_sources(question)
 
 
+async def aget_chat_answer(
+    question: str,
+    vector_store_path: Path,
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None
+) -> Dict[str, Any]:
+    """Async chat answer: blocking steps on the compute pool, LLM call on the async client.
+    
+    Raises offload.PoolSaturatedError when the compute pool is full.
+    """
+    def load() -> EnhancedRAGSystem:
+        rag_system = EnhancedRAGSystem(llm_provider, llm_model)
+        rag_system.load_vector_store(vector_store_path)
+        return rag_system
+    
+    rag_system = await compute_pool.run(load)
+    return await rag_system.aget_answer_with_sources(question)
+
+
+def stream_chat_answer(
+    question: str,
+    vector_store_path: Path,
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Main function to stream a chat answer: yields (event, payload) pairs"""
+    rag_system = EnhancedRAGSystem(llm_provider, llm_model)
+    rag_system.load_vector_store(vector_store_path)
+    yield from rag_system.stream_answer_with_sources(question)
+
+
+def generate_collection_insights(
+    vector_store_path: Path,
+    content_hashes: List[str],
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None
+):
+    """Insights pool task: generate insights, recording a failure in insights.json.
+    
+    A failure keeps the files it covered in "failed_hashes", for retry_insights.
+    """
+    try:
+        rag_system = EnhancedRAGSystem(llm_provider, llm_model)
+        rag_system.generate_insights(vector_store_path, content_hashes)
+    except Exception as e:
+        print(f"Insights generation failed for {vector_store_path.name}: {str(e)}")
+        with _collection_lock(vector_store_path.name):
+            if vector_store_path.exists():
+                insights = _read_collection_metadata(vector_store_path)["insights"]
+                failed = list(dict.fromkeys(insights.get("failed_hashes", []) + list(content_hashes)))
+                _write_collection_metadata(
+                    vector_store_path,
+                    insights={**insights, "status": "failed", "failed_hashes": failed}
+                )
+
+
+def schedule_insights(
+    vector_store_path: Path,
+    content_hashes: List[str],
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None
+) -> Future:
+    """Generate insights in the background; /insights reports "pending" until done"""
+    return _insights_pool.submit(generate_collection_insights, vector_store_path, content_hashes, llm_provider, llm_model)
+
+
+def retry_insights(
+    vector_store_path: Path,
+    llm_provider: str = "openai",
+    llm_model: Optional[str] = None
+) -> bool:
+    """Schedule failed insights again; False when they are not in the "failed" state"""
+    with _collection_lock(vector_store_path.name):
+        insights = _read_collection_metadata(vector_store_path)["insights"]
+        if insights.get("status") != "failed":
+            return False
+        content_hashes = insights.get("failed_hashes") or [e["content_hash"] for e in read_manifest(vector_store_path)]
+        _write_collection_metadata(vector_store_path, insights={**insights, "status": "pending"})
+    schedule_insights(vector_store_path, content_hashes, llm_provider, llm_model)
+    return True
+
+
 def get_insights(vector_store_path: Path) -> Dict[str, Any]:
     """Get proactive insights for a collection"""
     insights_path = vector_store_path / "insights.json"
@@ -466,4 +1742,4 @@ def get_insights(vector_store_path: Path) -> Dict[str, Any]:
         with open(insights_path, "r") as f:
             return json.load(f)
     
-    return {"error": "No insights found"}
\ No newline at end of file
+    return {"error": "No insights found"}
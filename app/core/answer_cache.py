@@ -0,0 +1,138 @@
+import os
+import re
+import copy
+import time
+import itertools
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Cosine similarity a new question needs to reuse a stored answer
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+# Entries across all collections; 0 disables the cache
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2048"))
+
+# (vector_store_session_id, llm provider, llm model)
+Scope = Tuple[str, str, str]
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+class CachedAnswer:
+    """A stored answer with the normalized embedding of the question that produced it"""
+
+    def __init__(self, question: str, vector: np.ndarray, result: Dict[str, Any]):
+        self.question = question
+        self.vector = vector
+        self.numbers = frozenset(_NUMBER_RE.findall(question))
+        self.result = result
+        self.created = time.monotonic()
+
+
+class AnswerCache:
+    """Semantic cache of chat answers, scoped per (collection, provider, model).
+
+    A question hits when its embedding has cosine similarity >= `threshold` with a
+    stored question of the same scope and both mention the same numbers (so
+    "revenue in 2022" never reuses the answer for 2021). Entries expire after
+    `ttl_seconds`; beyond `max_entries` the least recently used is evicted.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS,
+        threshold: float = ANSWER_CACHE_THRESHOLD
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._scopes: Dict[Scope, "OrderedDict[int, CachedAnswer]"] = {}
+        self._lru: "OrderedDict[int, Scope]" = OrderedDict()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, scope: Scope, question: str, vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Stored result of the most similar matching question, or None"""
+        if self.max_entries <= 0:
+            return None
+        query = _normalize(vector)
+        numbers = frozenset(_NUMBER_RE.findall(question))
+        now = time.monotonic()
+
+        with self._lock:
+            entries = self._scopes.get(scope, {})
+            best_id, best_score = None, self.threshold
+            for entry_id, entry in list(entries.items()):
+                if now - entry.created > self.ttl_seconds:
+                    self._remove(scope, entry_id)
+                    self.expirations += 1
+                    continue
+                score = float(np.dot(query, entry.vector))
+                if score >= best_score and entry.numbers == numbers:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None:
+                self.misses += 1
+                return None
+
+            self._lru.move_to_end(best_id)
+            self.hits += 1
+            return copy.deepcopy(self._scopes[scope][best_id].result)
+
+    def store(self, scope: Scope, question: str, vector: np.ndarray, result: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        entry = CachedAnswer(question, _normalize(vector), copy.deepcopy(result))
+        with self._lock:
+            entry_id = next(self._ids)
+            self._scopes.setdefault(scope, OrderedDict())[entry_id] = entry
+            self._lru[entry_id] = scope
+            while len(self._lru) > self.max_entries:
+                oldest_id, oldest_scope = next(iter(self._lru.items()))
+                self._remove(oldest_scope, oldest_id)
+                self.evictions += 1
+
+    def invalidate(self, session_id: str):
+        """Drop every answer about a collection, e.g. after its documents changed"""
+        with self._lock:
+            for scope in [s for s in self._scopes if s[0] == session_id]:
+                for entry_id in list(self._scopes[scope]):
+                    self._remove(scope, entry_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _remove(self, scope: Scope, entry_id: int):
+        entries = self._scopes.get(scope)
+        if entries is not None:
+            entries.pop(entry_id, None)
+            if not entries:
+                del self._scopes[scope]
+        self._lru.pop(entry_id, None)
+
+
+def _normalize(vector) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,278 @@
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from langchain.docstore.document import Document
+
+# Per-file ingestion artifacts, one directory per content hash
+ARTIFACTS_DIR = Path(os.getenv("ARTIFACTS_DIR", "storage/artifacts"))
+
+# Written into each collection's vector store directory: which files it was built from
+MANIFEST_NAME = "sources.json"
+
+
+def file_sha256(path: Path) -> str:
+    """Content hash of a file on disk"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _relabel(records: List[Dict[str, Any]], filename: str, file_path: str) -> List[Dict[str, Any]]:
+    """Point stored records at the file name and path of the current upload"""
+    for record in records:
+        if "source" in record:
+            record["source"] = filename
+        if "file_path" in record:
+            record["file_path"] = file_path
+    return records
+
+
+def _documents_to_json(documents: List[Document]) -> List[Dict[str, Any]]:
+    return [{"page_content": d.page_content, "metadata": d.metadata} for d in documents]
+
+
+def _documents_from_json(items: List[Dict[str, Any]], filename: str, file_path: str) -> List[Document]:
+    _relabel([item["metadata"] for item in items], filename, file_path)
+    return [Document(page_content=item["page_content"], metadata=item["metadata"]) for item in items]
+
+
+class _JsonArrayWriter:
+    """Writes a JSON array to a file one item at a time"""
+
+    def __init__(self, path: Path):
+        self._file = open(path, "w")
+        self._file.write("[")
+        self._empty = True
+
+    def extend(self, items: List[Any]):
+        for item in items:
+            if not self._empty:
+                self._file.write(",")
+            json.dump(item, self._file)
+            self._empty = False
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write("]")
+            self._file.close()
+
+
+class ArtifactWriter:
+    """Builds one artifact incrementally, in the files ArtifactStore.load reads.
+
+    Pages, chunks, tables and images are appended to their JSON files and vectors
+    to a raw float32 file as they are produced, so nothing is held for the whole
+    file. The artifact becomes visible on commit(); abort() discards it.
+    """
+
+    def __init__(self, store: "ArtifactStore", content_hash: str):
+        self.store = store
+        self.content_hash = content_hash
+        self.tmp_dir = store.root / f".tmp-{content_hash}-{uuid.uuid4().hex}"
+        self.tmp_dir.mkdir(parents=True)
+        self._pages = _JsonArrayWriter(self.tmp_dir / "pages.json")
+        self._chunks = _JsonArrayWriter(self.tmp_dir / "chunks.json")
+        self._tables = _JsonArrayWriter(self.tmp_dir / "tables.json")
+        self._images = _JsonArrayWriter(self.tmp_dir / "images.json")
+        self._vectors = open(self.tmp_dir / "vectors.f32", "wb")
+        self._shape = (0, 0)
+
+    def add_pages(self, pages: List[Document]):
+        self._pages.extend(_documents_to_json(pages))
+
+    def add_chunks(self, chunks: List[Document], vectors: np.ndarray):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self._chunks.extend(_documents_to_json(chunks))
+        if len(vectors):
+            self._vectors.write(vectors.tobytes())
+            self._shape = (self._shape[0] + len(vectors), vectors.shape[1])
+
+    def add_tables(self, tables: List[Dict[str, Any]]):
+        self._tables.extend(tables)
+
+    def add_images(self, images: List[Dict[str, Any]]):
+        self._images.extend(images)
+
+    def commit(self):
+        self._close()
+        raw_path = self.tmp_dir / "vectors.f32"
+        with open(self.tmp_dir / "vectors.npy", "wb") as out, open(raw_path, "rb") as raw:
+            np.lib.format.write_array_header_1_0(out, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)),
+                "fortran_order": False,
+                # An artifact without chunks holds an empty 1-d array, as np.asarray([]) gives
+                "shape": self._shape if self._shape[0] else (0,),
+            })
+            shutil.copyfileobj(raw, out, 1024 * 1024)
+        raw_path.unlink()
+        with open(self.tmp_dir / "refs.json", "w") as f:
+            json.dump([], f)
+
+        try:
+            os.replace(self.tmp_dir, self.store.path(self.content_hash))
+        except OSError:
+            # Another writer got there first; its copy is identical
+            shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def abort(self):
+        self._close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _close(self):
+        for writer in (self._pages, self._chunks, self._tables, self._images):
+            writer.close()
+        self._vectors.close()
+
+
+class ArtifactStore:
+    """Content-addressed store of per-file ingestion results.
+
+    A PDF that was ingested once (page documents, chunks and their vectors, tables,
+    image info, insights) can be assembled into any later collection without
+    parsing or embedding it again. Each artifact keeps the list of collections (and
+    accepted uploads waiting to be ingested) that reference it and is removed when
+    the last one is released.
+    """
+
+    def __init__(self, root: Path = ARTIFACTS_DIR):
+        self.root = root
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path(self, content_hash: str) -> Path:
+        return self.root / content_hash
+
+    def exists(self, content_hash: str) -> bool:
+        return self.path(content_hash).is_dir()
+
+    def writer(self, content_hash: str) -> ArtifactWriter:
+        """Incremental writer for a new artifact"""
+        return ArtifactWriter(self, content_hash)
+
+    def load(self, content_hash: str, filename: str, file_path: str) -> Dict[str, Any]:
+        """Read an artifact, relabelled with the current upload's file name and path.
+
+        Vectors are a read-only memory map of vectors.npy, paged in as they are used.
+        """
+        artifact_dir = self.path(content_hash)
+
+        with open(artifact_dir / "pages.json", "r") as f:
+            pages = _documents_from_json(json.load(f), filename, file_path)
+        with open(artifact_dir / "chunks.json", "r") as f:
+            chunks = _documents_from_json(json.load(f), filename, file_path)
+        vectors = np.load(artifact_dir / "vectors.npy", mmap_mode="r")
+        with open(artifact_dir / "tables.json", "r") as f:
+            tables = _relabel(json.load(f), filename, file_path)
+        with open(artifact_dir / "images.json", "r") as f:
+            images = _relabel(json.load(f), filename, file_path)
+
+        return {
+            "pages": pages,
+            "chunks": chunks,
+            "vectors": vectors,
+            "tables": tables,
+            "images": images,
+        }
+
+    def load_pages(self, content_hash: str, filename: str, file_path: str = "") -> List[Document]:
+        """Only the page documents of an artifact"""
+        with open(self.path(content_hash) / "pages.json", "r") as f:
+            return _documents_from_json(json.load(f), filename, file_path)
+
+    def load_insights(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        insights_path = self.path(content_hash) / "insights.json"
+        if not insights_path.exists():
+            return None
+        with open(insights_path, "r") as f:
+            return json.load(f)
+
+    def save_insights(self, content_hash: str, insights: Dict[str, Any]):
+        if self.exists(content_hash):
+            with open(self.path(content_hash) / "insights.json", "w") as f:
+                json.dump(insights, f, indent=2)
+
+    # --- Reference counting ---
+
+    def acquire(self, session_id: str, content_hashes: List[str]):
+        """Record that a collection uses these artifacts"""
+        with self._lock:
+            for content_hash in content_hashes:
+                refs = self._read_refs(content_hash)
+                if session_id not in refs:
+                    refs.append(session_id)
+                self._write_refs(content_hash, refs)
+
+    def acquire_if_exists(self, session_id: str, content_hash: str) -> bool:
+        """Reference an artifact if it exists; it then stays until released.
+
+        Checked and taken under the store lock, so a concurrent release of the
+        last other reference cannot delete it in between.
+        """
+        with self._lock:
+            if not self.exists(content_hash):
+                return False
+            refs = self._read_refs(content_hash)
+            if session_id not in refs:
+                refs.append(session_id)
+            self._write_refs(content_hash, refs)
+            return True
+
+    def release(self, session_id: str, content_hashes: List[str]):
+        """Drop a collection's references; artifacts nobody references are deleted.
+
+        Artifacts `session_id` holds no reference on are left alone.
+        """
+        with self._lock:
+            for content_hash in content_hashes:
+                if not self.exists(content_hash):
+                    continue
+                refs = self._read_refs(content_hash)
+                if session_id not in refs:
+                    continue
+                refs.remove(session_id)
+                if refs:
+                    self._write_refs(content_hash, refs)
+                else:
+                    shutil.rmtree(self.path(content_hash), ignore_errors=True)
+
+    def release_collection(self, vector_store_path: Path):
+        """Release every artifact listed in a collection's manifest"""
+        manifest = read_manifest(vector_store_path)
+        self.release(vector_store_path.name, [entry["content_hash"] for entry in manifest])
+
+    def _read_refs(self, content_hash: str) -> List[str]:
+        refs_path = self.path(content_hash) / "refs.json"
+        if not refs_path.exists():
+            return []
+        with open(refs_path, "r") as f:
+            return json.load(f)
+
+    def _write_refs(self, content_hash: str, refs: List[str]):
+        with open(self.path(content_hash) / "refs.json", "w") as f:
+            json.dump(refs, f)
+
+
+def write_manifest(vector_store_path: Path, entries: List[Dict[str, str]]):
+    """Record the (filename, content_hash) pairs a collection was built from"""
+    with open(vector_store_path / MANIFEST_NAME, "w") as f:
+        json.dump(entries, f, indent=2)
+
+
+def read_manifest(vector_store_path: Path) -> List[Dict[str, str]]:
+    manifest_path = vector_store_path / MANIFEST_NAME
+    if not manifest_path.exists():
+        return []
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+artifact_store = ArtifactStore()
@@ -0,0 +1,195 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Cache limits (bytes of on-disk collection data, seconds without access)
+COLLECTION_CACHE_MAX_BYTES = int(os.getenv("COLLECTION_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+COLLECTION_CACHE_IDLE_SECONDS = int(os.getenv("COLLECTION_CACHE_IDLE_SECONDS", "1800"))
+
+
+class LoadedCollection:
+    """A deserialized collection: FAISS store and BM25 index plus its tables, images and highlight geometry"""
+
+    def __init__(
+        self,
+        vector_store: Any,
+        tables_data: List[Dict[str, Any]],
+        images_info: List[Dict[str, Any]],
+        size_bytes: int,
+        geometry: Optional[Dict[str, Any]] = None,
+        lexical_index: Any = None,
+        retrieval: Optional[Dict[str, Any]] = None,
+        positions: Optional[Dict[str, int]] = None
+    ):
+        self.vector_store = vector_store
+        self.tables_data = tables_data
+        self.images_info = images_info
+        self.size_bytes = size_bytes
+        self.geometry = geometry or {}
+        self.lexical_index = lexical_index
+        # Stored retrieval setting overrides (reranking)
+        self.retrieval = retrieval or {}
+        # Docstore id -> index position, for reading candidate vectors back
+        self.positions = positions or {}
+        self.last_access = time.monotonic()
+
+
+def collection_size_bytes(vector_store_path: Path, exclude: Iterable[str] = ()) -> int:
+    """Approximate the private in-memory size of a collection by its files on disk.
+
+    Memory-mapped files are passed in `exclude`: they live in the shared page cache.
+    """
+    excluded = set(exclude)
+    total = 0
+    for path in vector_store_path.iterdir():
+        if path.is_file() and path.name not in excluded:
+            total += path.stat().st_size
+    return total
+
+
+class _Load:
+    """Loads in flight for one collection.
+
+    `generation` is bumped by invalidate(), so a load that started before it is
+    returned to its callers but not cached. Dropped once no loader is waiting.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.waiters = 0
+
+
+class CollectionCache:
+    """In-process LRU cache of loaded collections keyed by vector_store_session_id.
+
+    Entries are evicted least-recently-used first once the byte budget is exceeded,
+    and dropped after sitting idle longer than `idle_seconds`.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = COLLECTION_CACHE_MAX_BYTES,
+        idle_seconds: int = COLLECTION_CACHE_IDLE_SECONDS
+    ):
+        self.max_bytes = max_bytes
+        self.idle_seconds = idle_seconds
+        self._entries: "OrderedDict[str, LoadedCollection]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads: Dict[str, _Load] = {}
+        self._current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(
+        self,
+        session_id: str,
+        loader: Callable[[], LoadedCollection]
+    ) -> LoadedCollection:
+        """Return the cached collection, calling `loader` on a miss"""
+        entry = self._get(session_id)
+        if entry is not None:
+            return entry
+
+        # One loader per collection; concurrent misses wait and reuse its result
+        with self._lock:
+            load = self._loads.setdefault(session_id, _Load())
+            load.waiters += 1
+
+        try:
+            with load.lock:
+                entry = self._get(session_id, count_miss=False)
+                if entry is not None:
+                    return entry
+
+                with self._lock:
+                    generation = load.generation
+                entry = loader()
+                self._put(session_id, entry, load, generation)
+                return entry
+        finally:
+            with self._lock:
+                load.waiters -= 1
+                if load.waiters == 0 and self._loads.get(session_id) is load:
+                    del self._loads[session_id]
+
+    def invalidate(self, session_id: str):
+        """Drop a collection, e.g. after its store was deleted or rewritten"""
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                self._current_bytes -= entry.size_bytes
+            load = self._loads.get(session_id)
+            if load is not None:
+                load.generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            for load in self._loads.values():
+                load.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _get(self, session_id: str, count_miss: bool = True):
+        with self._lock:
+            self._evict_idle()
+            entry = self._entries.get(session_id)
+            if entry is None:
+                if count_miss:
+                    self.misses += 1
+                return None
+
+            self._entries.move_to_end(session_id)
+            entry.last_access = time.monotonic()
+            self.hits += 1
+            return entry
+
+    def _put(self, session_id: str, entry: LoadedCollection, load: _Load, generation: int):
+        with self._lock:
+            # Invalidated while loading: the entry may predate the rewrite
+            if load.generation != generation:
+                return
+
+            # Collections larger than the whole budget are served but never cached
+            if entry.size_bytes > self.max_bytes:
+                return
+
+            previous = self._entries.pop(session_id, None)
+            if previous is not None:
+                self._current_bytes -= previous.size_bytes
+
+            self._entries[session_id] = entry
+            self._current_bytes += entry.size_bytes
+
+            while self._current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._current_bytes -= evicted.size_bytes
+                self.evictions += 1
+
+    def _evict_idle(self):
+        """Drop entries that have not been used within idle_seconds (lock held)"""
+        cutoff = time.monotonic() - self.idle_seconds
+        for session_id in [k for k, e in self._entries.items() if e.last_access < cutoff]:
+            evicted = self._entries.pop(session_id)
+            self._current_bytes -= evicted.size_bytes
+            self.evictions += 1
+
+
+collection_cache = CollectionCache()
@@ -0,0 +1,186 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import tiktoken
+from langchain.docstore.document import Document
+
+# Chunks retrieved per question; MMR picks the prompt's k chunks from these
+CONTEXT_CANDIDATES = int(os.getenv("CONTEXT_CANDIDATES", "20"))
+# MMR trade-off: 1.0 ranks by relevance only, lower values favour chunks unlike those already picked
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))
+
+# Context tokens per answer prompt, by API model name (CONTEXT_TOKEN_BUDGET > 0 overrides)
+CONTEXT_TOKEN_BUDGETS = {
+    "gpt-3.5-turbo": 1500,
+    "gpt-4": 1500,
+    "gpt-4-turbo-preview": 3000,
+    "gpt-4o": 3000,
+    "gpt-4o-mini": 3000,
+}
+DEFAULT_CONTEXT_TOKEN_BUDGET = 1500
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "0"))
+
+# build_answer_prompt joins passages with this
+PASSAGE_SEPARATOR = "\n\n"
+
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    """tiktoken encoding of `model` (cl100k_base for unknown names), None if tiktoken is unusable"""
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # e.g. the BPE file cannot be downloaded on an offline host
+                print(f"Warning: no tokenizer for '{model}' ({e}); estimating 4 characters per token")
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Longest prefix of `text` within `max_tokens` tokens"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def context_token_budget(model: Optional[str]) -> int:
+    if CONTEXT_TOKEN_BUDGET > 0:
+        return CONTEXT_TOKEN_BUDGET
+    return CONTEXT_TOKEN_BUDGETS.get(model or "", DEFAULT_CONTEXT_TOKEN_BUDGET)
+
+
+def rank_relevance(num_candidates: int) -> np.ndarray:
+    """Relevance of candidates by their retrieval rank: 1 for the first, falling linearly"""
+    return 1.0 - np.arange(num_candidates, dtype=np.float32) / max(num_candidates, 1)
+
+
+def mmr_order(relevance: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float = MMR_LAMBDA) -> List[int]:
+    """Indices of up to `k` rows of `vectors` picked by maximal marginal relevance, in pick order.
+
+    `relevance` holds each row's relevance in [0, 1], as the retrieval ranked
+    it (rank_relevance). Each step takes the row maximizing lambda * relevance
+    - (1 - lambda) * max sim(row, picked), with cosine similarity between rows.
+    The first pick is therefore always the top-ranked row.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) == 0 or k <= 0:
+        return []
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms == 0, 1.0, norms)
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    similarity = unit @ unit.T
+    picked = [int(np.argmax(relevance))]
+    redundancy = similarity[picked[0]].copy()
+    while len(picked) < min(k, len(vectors)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[picked] = -np.inf
+        best = int(np.argmax(scores))
+        picked.append(best)
+        redundancy = np.maximum(redundancy, similarity[best])
+    return picked
+
+
+class Passage:
+    """Contiguous text of one page, made of one or more overlapping or adjacent chunks"""
+
+    def __init__(self, chunk: Document, score: float, tokens: int):
+        self.source = chunk.metadata.get("source")
+        self.page = chunk.metadata.get("page")
+        # Offset of the text in its page; -1 for chunks ingested without start_index
+        self.start = chunk.metadata.get("start_index", -1)
+        self.text = chunk.page_content
+        self.tokens = tokens
+        self.chunks: List[Tuple[Document, float]] = [(chunk, score)]
+
+    def joined(self, source: Any, page: Any, start: int, text: str) -> Optional[Tuple[int, str]]:
+        """(start, text) of this passage extended by a span of page text, None if they do not touch"""
+        if self.start < 0 or start < 0 or (source, page) != (self.source, self.page):
+            return None
+        end, own_end = start + len(text), self.start + len(self.text)
+        if start > own_end or end < self.start:
+            return None
+
+        joined = self.text
+        if start < self.start:
+            joined = text[:self.start - start] + joined
+        if end > own_end:
+            joined = joined + text[len(text) - (end - own_end):]
+        return min(start, self.start), joined
+
+
+def assemble_context(
+    chunks: List[Tuple[Document, float]],
+    budget: int,
+    model: str
+) -> List[Passage]:
+    """Pack chunks, most important first, into passages within `budget` tokens.
+
+    A chunk that overlaps or touches a passage from the same page extends it
+    (its shared text is not repeated); if that joins two passages they become
+    one. A chunk whose addition would exceed the budget is skipped, except that
+    the first one is truncated to fit so the context is never empty.
+    """
+    separator = count_tokens(PASSAGE_SEPARATOR, model)
+    passages: List[Passage] = []
+    used = 0
+
+    for chunk, score in chunks:
+        source, page = chunk.metadata.get("source"), chunk.metadata.get("page")
+        start = chunk.metadata.get("start_index", -1)
+
+        target = next((p for p in passages if p.joined(source, page, start, chunk.page_content)), None)
+        if target is None:
+            tokens = count_tokens(chunk.page_content, model)
+            cost = tokens + (separator if passages else 0)
+            if used + cost <= budget:
+                passages.append(Passage(chunk, score, tokens))
+                used += cost
+            elif not passages:
+                passage = Passage(chunk, score, budget)
+                passage.text = truncate_tokens(chunk.page_content, budget, model)
+                passages.append(passage)
+                used = budget
+            continue
+
+        new_start, new_text = target.joined(source, page, start, chunk.page_content)
+        # The extended span may now reach other passages of the page as well
+        absorbed = []
+        for other in passages:
+            if other is target:
+                continue
+            joined = other.joined(target.source, target.page, new_start, new_text)
+            if joined is not None:
+                new_start, new_text = joined
+                absorbed.append(other)
+
+        tokens = count_tokens(new_text, model)
+        cost = tokens - target.tokens - sum(p.tokens + separator for p in absorbed)
+        if cost > 0 and used + cost > budget:
+            continue
+        target.start, target.text, target.tokens = new_start, new_text, tokens
+        target.chunks.append((chunk, score))
+        for other in absorbed:
+            target.chunks.extend(other.chunks)
+            passages.remove(other)
+        used += cost
+
+    return passages
+
@@ -1,19 +1,21 @@
 from fastapi import Depends, HTTPException, status
 # The class is 'OAuth2PasswordBearer', not 'OAuth2Bearer'
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
 from app.models import db_models, schemas
 from app.core.security import decode_access_token
+from app.core.auth_cache import user_cache, token_cache, token_key
 
 # This is the scheme that tells FastAPI "this endpoint requires a Bearer token"
 # It also needs to be updated to the correct class name.
 # The 'tokenUrl' should point to your login endpoint.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> db_models.User:
     
     credentials_exception = HTTPException(
@@ -22,16 +24,26 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
+    # Tokens already verified skip the signature check until they expire
+    key = token_key(token)
+    payload = token_cache.get(key)
     if payload is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        token_cache.put(key, payload, expires_at=payload.get("exp"))
         
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
-        
-    user = db.query(db_models.User).filter(db_models.User.username == username).first()
+    
+    # Cached users are detached: read their columns, do not lazy-load relationships
+    user = user_cache.get(username)
     if user is None:
-        raise credentials_exception
+        user = await db.scalar(select(db_models.User).where(db_models.User.username == username))
+        if user is None:
+            raise credentials_exception
+        db.expunge(user)
+        user_cache.put(username, user)
         
     return user
\ No newline at end of file
@@ -0,0 +1,127 @@
+import os
+import time
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Any
+
+import numpy as np
+
+# Persistent cache location and batch size for encoding cache misses
+EMBEDDING_CACHE_PATH = Path(os.getenv("EMBEDDING_CACHE_PATH", "storage/embedding_cache.db"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent embedding store keyed by (model name, SHA-256 of the chunk text)"""
+
+    def __init__(self, db_path: Path = EMBEDDING_CACHE_PATH):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (model, text_hash))"
+            )
+            self._conn.commit()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Look up cached vectors; missing hashes are absent from the result"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for h, blob in rows:
+                    found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, model: str, items: List[Tuple[str, List[float]]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                [(model, h, np.asarray(v, dtype=np.float32).tobytes()) for h, v in items]
+            )
+            self._conn.commit()
+
+
+class CachedEmbedder:
+    """Embeds chunk texts through the cache, encoding only misses in fixed-size batches"""
+
+    def __init__(
+        self,
+        embeddings: Any,
+        model_name: str,
+        cache: EmbeddingCache,
+        batch_size: int = EMBED_BATCH_SIZE
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+
+    def embed_documents(
+        self,
+        texts: List[str],
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> Tuple[List[List[float]], Dict[str, Any]]:
+        """Return one vector per text plus hit/miss and throughput stats.
+
+        `progress_callback(done)` receives the number of texts with a vector so far.
+        """
+        hashes = [text_hash(t) for t in texts]
+        cached = self.cache.get_many(self.model_name, hashes)
+
+        # Encode each distinct missing text once, even if it repeats within the upload
+        missing: Dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached and h not in missing:
+                missing[h] = t
+
+        hits = sum(1 for h in hashes if h in cached)
+        if progress_callback:
+            progress_callback(hits)
+
+        embed_seconds = 0.0
+        missing_items = list(missing.items())
+        done = hits
+        for i in range(0, len(missing_items), self.batch_size):
+            batch = missing_items[i:i + self.batch_size]
+            start = time.perf_counter()
+            vectors = self.embeddings.embed_documents([t for _, t in batch])
+            embed_seconds += time.perf_counter() - start
+
+            new_items = [(h, v) for (h, _), v in zip(batch, vectors)]
+            self.cache.put_many(self.model_name, new_items)
+            cached.update(new_items)
+
+            done += len(batch)
+            if progress_callback:
+                progress_callback(min(done, len(texts)))
+
+        stats = {
+            "embedding_cache_hits": hits,
+            "embedding_cache_misses": len(texts) - hits,
+            "embedding_cache_hit_rate": round(hits / len(texts), 4) if texts else 0.0,
+            "embed_chunks_per_second": round(len(missing_items) / embed_seconds, 1) if embed_seconds else 0.0,
+            "chunks_encoded": len(missing_items),
+            "embed_seconds": embed_seconds,
+        }
+        return [cached[h] for h in hashes], stats
+
+
+embedding_cache = EmbeddingCache()
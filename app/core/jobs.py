@@ -0,0 +1,116 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Worker pool sizing for background ingestion
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+# How long finished jobs stay pollable
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+
+class QueueFullError(Exception):
+    """Raised when the ingestion queue cannot accept another job"""
+
+
+class IngestionJob:
+    """State of one background upload, updated by the worker as stages complete"""
+
+    def __init__(self, owner_id: int):
+        self.job_id = str(uuid.uuid4())
+        self.owner_id = owner_id
+        self.status = "queued"  # queued, running, completed, failed
+        self.stage: Optional[str] = None
+        self.progress = {
+            "pages_parsed": 0,
+            "chunks_embedded": 0,
+            "tables_extracted": 0,
+        }
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, stage: Optional[str] = None, **counts):
+        """Progress callback handed to process_files"""
+        with self._lock:
+            if stage:
+                self.stage = stage
+            for key, value in counts.items():
+                self.progress[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobManager:
+    """Runs ingestion jobs on a fixed worker pool with a bounded backlog"""
+
+    def __init__(self, workers: int = INGEST_WORKERS, queue_size: int = INGEST_QUEUE_SIZE):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        # Running plus waiting jobs; submit fails fast once this is exhausted
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._jobs: Dict[str, IngestionJob] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner_id: int, work: Callable[[IngestionJob], Dict[str, Any]]) -> IngestionJob:
+        """Queue `work(job)`; its return value becomes the job result"""
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Ingestion queue is full, try again later")
+
+        job = IngestionJob(owner_id)
+        with self._lock:
+            self._prune()
+            self._jobs[job.job_id] = job
+
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: IngestionJob, work: Callable[[IngestionJob], Dict[str, Any]]):
+        job.status = "running"
+        try:
+            result = work(job)
+            with job._lock:
+                job.result = result
+                job.status = "completed"
+                job.stage = "completed"
+        except Exception as e:
+            print(f"Ingestion job {job.job_id} failed: {str(e)}")
+            with job._lock:
+                job.error = str(e)
+                job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def _prune(self):
+        """Forget finished jobs past their retention window (lock held)"""
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_manager = JobManager()
@@ -0,0 +1,364 @@
+import os
+import re
+import math
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Stored next to index.faiss in each collection directory
+LEXICAL_INDEX_NAME = "bm25.npz"
+LEXICAL_DELTA_NAME = "bm25_delta.npz"
+
+# Delta size (added plus removed chunks) relative to the base that triggers a merge
+BM25_DELTA_MAX_FRACTION = float(os.getenv("BM25_DELTA_MAX_FRACTION", "0.25"))
+
+# BM25 parameters
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# Words plus identifiers such as "AB-1234", "4.2.1" or "v2/api"
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-./:_][a-z0-9]+)*")
+_SPLIT_RE = re.compile(r"[-./:_]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased tokens; compound identifiers are kept whole and also split into parts"""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        tokens.append(token)
+        if _SPLIT_RE.search(token):
+            tokens.extend(part for part in _SPLIT_RE.split(token) if part)
+    return tokens
+
+
+def _varint_encode(values: np.ndarray) -> np.ndarray:
+    """LEB128-encode unsigned integers into one uint8 array"""
+    values = values.astype(np.uint64)
+    bits = np.zeros(len(values), dtype=np.int64)
+    nonzero = values > 0
+    bits[nonzero] = np.floor(np.log2(values[nonzero].astype(np.float64))).astype(np.int64) + 1
+    nbytes = np.maximum(1, (bits + 6) // 7)
+
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    starts = np.cumsum(nbytes) - nbytes
+    for byte_idx in range(int(nbytes.max()) if len(values) else 0):
+        mask = nbytes > byte_idx
+        chunk = (values[mask] >> np.uint64(7 * byte_idx)) & np.uint64(0x7F)
+        more = (nbytes[mask] - 1 > byte_idx).astype(np.uint64) << np.uint64(7)
+        out[starts[mask] + byte_idx] = (chunk | more).astype(np.uint8)
+    return out
+
+
+def _varint_decode(data: np.ndarray) -> np.ndarray:
+    """Inverse of _varint_encode"""
+    is_last = data < 0x80
+    group = np.concatenate(([0], np.cumsum(is_last)[:-1]))
+    group_starts = np.concatenate(([0], np.flatnonzero(is_last)[:-1] + 1))
+    shifts = (np.arange(len(data)) - group_starts[group]) * 7
+
+    values = np.zeros(int(is_last.sum()), dtype=np.uint64)
+    np.add.at(values, group, (data & 0x7F).astype(np.uint64) << shifts.astype(np.uint64))
+    return values
+
+
+class _Segment:
+    """Immutable postings of a set of chunks.
+
+    Postings of a term are (doc gap, term frequency) pairs, varint-encoded into one
+    shared byte array; the sorted term list is binary-searched. Doc numbers are
+    positions in `doc_ids`.
+    """
+
+    def __init__(
+        self,
+        doc_ids: np.ndarray,
+        doc_lengths: np.ndarray,
+        terms: np.ndarray,
+        offsets: np.ndarray,
+        dfs: np.ndarray,
+        postings: np.ndarray
+    ):
+        self.doc_ids = doc_ids
+        self.doc_lengths = doc_lengths
+        self.terms = terms
+        self.offsets = offsets
+        self.dfs = dfs
+        self.postings = postings
+
+    @classmethod
+    def build(cls, doc_ids: List[str], texts: List[str]) -> "_Segment":
+        term_postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+        for doc_idx, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                term_postings.setdefault(token, []).append((doc_idx, tf))
+        return cls.from_postings(doc_ids, doc_lengths, term_postings)
+
+    @classmethod
+    def from_postings(
+        cls,
+        doc_ids: List[str],
+        doc_lengths: List[int],
+        term_postings: Dict[str, List[Tuple[int, int]]]
+    ) -> "_Segment":
+        """Encode {term: [(doc number, tf), ...]}, each list in doc order"""
+        terms = sorted(term_postings)
+        dfs = np.array([len(term_postings[t]) for t in terms], dtype=np.uint32)
+
+        # Flatten every term's (gap, tf) pairs, encode once, then find each term's byte range
+        values = []
+        for term in terms:
+            previous = 0
+            for doc_idx, tf in term_postings[term]:
+                values.append(doc_idx - previous)
+                values.append(tf)
+                previous = doc_idx
+        values = np.array(values, dtype=np.uint64)
+        postings = _varint_encode(values)
+
+        value_ends = np.flatnonzero(postings < 0x80) + 1 if len(postings) else np.array([], dtype=np.int64)
+        term_value_ends = np.cumsum(dfs.astype(np.int64) * 2)
+        offsets = np.concatenate(([0], value_ends[term_value_ends - 1] if len(terms) else [])).astype(np.int64)
+
+        return cls(
+            doc_ids=np.array(doc_ids, dtype=str),
+            doc_lengths=np.array(doc_lengths, dtype=np.uint32),
+            terms=np.array(terms, dtype=str),
+            offsets=offsets,
+            dfs=dfs,
+            postings=postings
+        )
+
+    @classmethod
+    def merge(cls, parts: List[Tuple["_Segment", np.ndarray]]) -> "_Segment":
+        """One segment of the kept docs of each (segment, keep mask) part, in part order.
+
+        Works on the decoded postings; no text is tokenized again.
+        """
+        doc_ids: List[str] = []
+        doc_lengths: List[int] = []
+        term_postings: Dict[str, List[Tuple[int, int]]] = {}
+        for segment, keep in parts:
+            # Old doc number -> new one, for the kept docs
+            renumber = np.cumsum(keep) - 1 + len(doc_ids)
+            doc_ids.extend(segment.doc_ids[keep].tolist())
+            doc_lengths.extend(segment.doc_lengths[keep].tolist())
+            for pos, term in enumerate(segment.terms.tolist()):
+                docs, tfs = segment.decode(pos)
+                kept = keep[docs]
+                if kept.any():
+                    term_postings.setdefault(term, []).extend(
+                        zip(renumber[docs[kept]].tolist(), tfs[kept].astype(np.int64).tolist())
+                    )
+        return cls.from_postings(doc_ids, doc_lengths, term_postings)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def every_doc(self) -> np.ndarray:
+        """Keep mask selecting all docs"""
+        return np.ones(len(self), dtype=bool)
+
+    def find(self, term: str) -> Optional[int]:
+        """Position of `term` in the term list"""
+        pos = int(np.searchsorted(self.terms, term))
+        if pos >= len(self.terms) or self.terms[pos] != term:
+            return None
+        return pos
+
+    def decode(self, pos: int) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc numbers, term frequencies) of the term at `pos`"""
+        pairs = _varint_decode(self.postings[self.offsets[pos]:self.offsets[pos + 1]])
+        return np.cumsum(pairs[0::2]).astype(np.int64), pairs[1::2].astype(np.float64)
+
+    def arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}doc_ids": self.doc_ids,
+            f"{prefix}doc_lengths": self.doc_lengths,
+            f"{prefix}terms": self.terms,
+            f"{prefix}offsets": self.offsets,
+            f"{prefix}dfs": self.dfs,
+            f"{prefix}postings": self.postings,
+        }
+
+    @classmethod
+    def from_arrays(cls, data, prefix: str = "") -> "_Segment":
+        return cls(**{name: data[f"{prefix}{name}"] for name in (
+            "doc_ids", "doc_lengths", "terms", "offsets", "dfs", "postings"
+        )})
+
+
+class BM25Index:
+    """Per-collection BM25 inverted index over chunk texts.
+
+    A query decodes only the postings of its own terms, so its cost follows how
+    many chunks contain those terms rather than the collection size.
+
+    Incremental updates leave the base segment (bm25.npz) as it is: added chunks
+    go into a small delta segment and removed base chunks into a tombstone list,
+    both stored in bm25_delta.npz, so an update tokenizes and writes only the
+    chunks it touches. Once the delta outgrows BM25_DELTA_MAX_FRACTION of the base,
+    both are merged into a new base from their postings.
+    """
+
+    def __init__(self, base: _Segment, delta: Optional[_Segment] = None, deleted: Optional[List[str]] = None):
+        self.base = base
+        self.delta = delta if delta is not None else _Segment.build([], [])
+        self.deleted = set(deleted or [])
+        self.generation = uuid.uuid4().hex
+        self._base_saved = False
+        self._refresh()
+
+    def _refresh(self):
+        """Live masks and collection statistics after a change"""
+        self.base_live = self.base.every_doc()
+        if self.deleted:
+            self.base_live &= ~np.isin(self.base.doc_ids, list(self.deleted))
+        self.num_docs = int(self.base_live.sum()) + len(self.delta)
+        total_length = float(self.base.doc_lengths[self.base_live].sum()) + float(self.delta.doc_lengths.sum())
+        self.avg_doc_length = total_length / self.num_docs if self.num_docs else 0.0
+
+    @property
+    def doc_ids(self) -> List[str]:
+        """Ids of the live chunks, base first"""
+        return self.base.doc_ids[self.base_live].tolist() + self.delta.doc_ids.tolist()
+
+    @classmethod
+    def build(cls, doc_ids: List[str], texts: List[str]) -> "BM25Index":
+        return cls(_Segment.build(doc_ids, texts))
+
+    def add(self, doc_ids: List[str], texts: List[str]):
+        """Index new chunks; only their texts are tokenized"""
+        added = _Segment.build(doc_ids, texts)
+        self.delta = _Segment.merge([(self.delta, self.delta.every_doc()), (added, added.every_doc())])
+        self._refresh()
+        self._compact_if_needed()
+
+    def remove(self, doc_ids: List[str]):
+        """Drop chunks: base ones are tombstoned, delta ones removed from the delta"""
+        removed = np.array(list(doc_ids), dtype=str)
+        self.deleted.update(self.base.doc_ids[np.isin(self.base.doc_ids, removed)].tolist())
+        in_delta = np.isin(self.delta.doc_ids, removed)
+        if in_delta.any():
+            self.delta = _Segment.merge([(self.delta, ~in_delta)])
+        self._refresh()
+        self._compact_if_needed()
+
+    def _compact_if_needed(self):
+        if len(self.delta) + len(self.deleted) > BM25_DELTA_MAX_FRACTION * max(1, len(self.base)):
+            self.base = _Segment.merge([(self.base, self.base_live), (self.delta, self.delta.every_doc())])
+            self.delta = _Segment.build([], [])
+            self.deleted = set()
+            self.generation = uuid.uuid4().hex
+            self._base_saved = False
+            self._refresh()
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Top-k (doc id, BM25 score) pairs, best first"""
+        if not self.num_docs:
+            return []
+
+        # Delta docs are numbered after the base docs
+        segments = [(self.base, self.base_live, 0), (self.delta, None, len(self.base))]
+        matched_docs = []
+        matched_scores = []
+        for term in set(tokenize(query)):
+            term_docs = []
+            for segment, live, first in segments:
+                pos = segment.find(term)
+                if pos is None:
+                    continue
+                docs, tfs = segment.decode(pos)
+                if live is not None:
+                    docs, tfs = docs[live[docs]], tfs[live[docs]]
+                term_docs.append((docs, tfs, segment.doc_lengths[docs], first))
+
+            df = float(sum(len(docs) for docs, _, _, _ in term_docs))
+            if not df:
+                continue
+            idf = math.log(1.0 + (self.num_docs - df + 0.5) / (df + 0.5))
+            for docs, tfs, lengths, first in term_docs:
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / self.avg_doc_length)
+                matched_docs.append(docs + first)
+                matched_scores.append(idf * tfs * (BM25_K1 + 1.0) / (tfs + norm))
+
+        if not matched_docs:
+            return []
+
+        # Sum per document over the matched postings only
+        docs, inverse = np.unique(np.concatenate(matched_docs), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(matched_scores))
+        top = np.argsort(-scores, kind="stable")[:k]
+        base_count = len(self.base)
+        return [
+            (str(self.base.doc_ids[d] if d < base_count else self.delta.doc_ids[d - base_count]), float(scores[i]))
+            for i, d in ((i, int(docs[i])) for i in top)
+        ]
+
+    def save(self, vector_store_path: Path):
+        """Write bm25_delta.npz, and bm25.npz when the base is new, by atomic rename.
+
+        The delta names the base generation it applies to, and is replaced first:
+        a reader between the two renames sees the old base without a delta.
+        """
+        _save_npz(
+            vector_store_path / LEXICAL_DELTA_NAME,
+            base_generation=np.array(self.generation),
+            deleted=np.array(sorted(self.deleted), dtype=str),
+            **self.delta.arrays("delta_")
+        )
+        if not self._base_saved:
+            _save_npz(
+                vector_store_path / LEXICAL_INDEX_NAME,
+                generation=np.array(self.generation),
+                **self.base.arrays()
+            )
+            self._base_saved = True
+
+    @classmethod
+    def load(cls, vector_store_path: Path) -> Optional["BM25Index"]:
+        """The stored index, or None for collections built without one"""
+        index_path = vector_store_path / LEXICAL_INDEX_NAME
+        if not index_path.exists():
+            return None
+        with np.load(index_path) as data:
+            base = _Segment.from_arrays(data)
+            # Bases written before deltas existed have no generation
+            generation = str(data["generation"]) if "generation" in data.files else None
+
+        delta, deleted = None, None
+        delta_path = vector_store_path / LEXICAL_DELTA_NAME
+        if generation is not None and delta_path.exists():
+            with np.load(delta_path) as data:
+                if str(data["base_generation"]) == generation:
+                    delta = _Segment.from_arrays(data, "delta_")
+                    deleted = data["deleted"].tolist()
+
+        index = cls(base, delta, deleted)
+        if generation is not None:
+            index.generation = generation
+            index._base_saved = True
+        return index
+
+
+def _save_npz(path: Path, **arrays: np.ndarray):
+    tmp_path = path.parent / f".tmp-{uuid.uuid4().hex}-{path.name}"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int, rrf_k: int = 60) -> List[Tuple[str, float]]:
+    """Merge ranked id lists: each id scores sum(1 / (rrf_k + rank)) over the lists"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
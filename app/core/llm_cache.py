@@ -0,0 +1,149 @@
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Exact-prompt response cache; 0 entries disables caching (coalescing still applies)
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "600"))
+
+
+def prompt_key(model: str, temperature: float, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{temperature}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCallCache:
+    """Collapses identical in-flight LLM calls and caches completed responses.
+
+    Calls are identified by prompt_key (model, temperature, prompt). While one
+    call for a key is running, later callers wait for its result instead of
+    going upstream. Successful responses are kept for `ttl_seconds` in a
+    bounded LRU; failures reach every waiter and are never cached.
+
+    call() serves blocking callers and acall() coroutines; both share the same
+    in-flight calls, so a chat request and an insights thread asking the same
+    prompt still go upstream once.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: int = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+        self.cached_calls = 0
+        self.failed_calls = 0
+
+    def call(self, key: str, fn: Callable[[], str]) -> str:
+        """Return the cached or in-flight result for `key`, or run `fn` once for it"""
+        cached, future, leader = self._join(key)
+        if cached is not None:
+            return cached
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._complete(key, future, result)
+        return result
+
+    async def acall(self, key: str, fn: Callable[[], Awaitable[str]]) -> str:
+        """Async call(): `fn` returns the coroutine that produces the response"""
+        cached, future, leader = self._join(key)
+        if cached is not None:
+            return cached
+        if not leader:
+            # Shielded: a waiter that is cancelled must not cancel the shared call
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        try:
+            result = await fn()
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._complete(key, future, result)
+        return result
+
+    def _join(self, key: str) -> Tuple[Optional[str], Optional[Future], bool]:
+        """(cached result, None, False), or the in-flight future and whether the caller runs it"""
+        with self._lock:
+            cached = self._get(key)
+            if cached is not None:
+                self.cached_calls += 1
+                return cached, None, False
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced_calls += 1
+                return None, future, False
+
+            future = Future()
+            self._inflight[key] = future
+            self.upstream_calls += 1
+            return None, future, True
+
+    def _complete(self, key: str, future: Future, result: str):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._put(key, result)
+        future.set_result(result)
+
+    def _fail(self, key: str, future: Future, error: BaseException):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self.failed_calls += 1
+        future.set_exception(error)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response only (no coalescing), e.g. before starting a stream"""
+        with self._lock:
+            cached = self._get(key)
+            if cached is not None:
+                self.cached_calls += 1
+            return cached
+
+    def put(self, key: str, result: str):
+        with self._lock:
+            self._put(key, result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "upstream_calls": self.upstream_calls,
+                "coalesced_calls": self.coalesced_calls,
+                "cached_calls": self.cached_calls,
+                "failed_calls": self.failed_calls,
+            }
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key: str, result: str):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+llm_call_cache = LLMCallCache()
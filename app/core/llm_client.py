@@ -0,0 +1,208 @@
+import os
+import time
+import random
+import asyncio
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Concurrency caps for upstream LLM calls
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY_PER_MODEL = int(os.getenv("LLM_MAX_CONCURRENCY_PER_MODEL", "8"))
+
+# Token bucket: sustained requests per second and burst size; 0 disables it
+LLM_RATE_LIMIT_RPS = float(os.getenv("LLM_RATE_LIMIT_RPS", "0"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+
+# Retries on 429/5xx/connection errors, with full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+
+
+class LLMError(Exception):
+    """Base class of failures from the async LLM client"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMRateLimitError(LLMError):
+    """429 from the provider, still failing after all retries"""
+
+
+class LLMServerError(LLMError):
+    """5xx from the provider, still failing after all retries"""
+
+
+class LLMTimeoutError(LLMError):
+    """The provider did not answer in time, or could not be reached"""
+
+
+class LLMRequestError(LLMError):
+    """Non-retryable rejection (bad request, authentication, unknown model)"""
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, up to `capacity` saved up"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            # No await between refill and take: safe on a single event loop
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _retry_after(error: APIStatusError) -> Optional[float]:
+    value = error.response.headers.get("retry-after") if error.response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _typed_error(error: Exception) -> LLMError:
+    """Map an OpenAI SDK exception to the client's error types"""
+    if isinstance(error, APITimeoutError):
+        return LLMTimeoutError(f"LLM request timed out: {error}")
+    if isinstance(error, APIConnectionError):
+        return LLMTimeoutError(f"LLM provider unreachable: {error}")
+    if isinstance(error, APIStatusError):
+        status = error.status_code
+        if status == 429:
+            return LLMRateLimitError(f"LLM rate limit: {error}", status, _retry_after(error))
+        if status >= 500:
+            return LLMServerError(f"LLM provider error {status}: {error}", status, _retry_after(error))
+        return LLMRequestError(f"LLM request rejected ({status}): {error}", status)
+    return LLMError(str(error))
+
+
+class AsyncLLMClient:
+    """Shared async client for OpenAI chat completions.
+
+    One pooled HTTP client per event loop; calls pass a global and a per-model
+    semaphore and the token bucket before going out. 429, 5xx and connection
+    failures are retried with full-jitter exponential backoff (honouring
+    Retry-After); what still fails is raised as an LLMError subclass.
+    """
+
+    def __init__(self):
+        self._client: Optional[AsyncOpenAI] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global_limit = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+        self._model_limits: Dict[str, asyncio.Semaphore] = {}
+        self._bucket = TokenBucket(LLM_RATE_LIMIT_RPS, LLM_RATE_LIMIT_BURST)
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    def _get_client(self) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise LLMRequestError("OPENAI_API_KEY not found in environment variables")
+            self._client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=os.getenv("OPENAI_BASE_URL") or None,
+                timeout=LLM_TIMEOUT_SECONDS,
+                max_retries=0,  # retries are handled here, with backoff and limits
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_CONNECTIONS
+                    ),
+                    timeout=LLM_TIMEOUT_SECONDS
+                )
+            )
+            # asyncio semaphores belong to the loop they were first used on
+            self._global_limit = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+            self._model_limits = {}
+            self._loop = loop
+        return self._client
+
+    def _model_limit(self, model: str) -> asyncio.Semaphore:
+        if model not in self._model_limits:
+            self._model_limits[model] = asyncio.Semaphore(LLM_MAX_CONCURRENCY_PER_MODEL)
+        return self._model_limits[model]
+
+    async def _backoff(self, attempt: int, error: LLMError):
+        delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+        if error.retry_after is not None:
+            delay = max(delay, min(error.retry_after, LLM_BACKOFF_MAX_SECONDS))
+        self.retries += 1
+        await asyncio.sleep(delay)
+
+    async def generate(self, model: str, prompt: str, temperature: float = 0.3) -> str:
+        """Complete one prompt; raises an LLMError subclass on failure"""
+        client = self._get_client()
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            async with self._global_limit, self._model_limit(model):
+                await self._bucket.acquire()
+                self.requests += 1
+                self.in_flight += 1
+                try:
+                    response = await client.chat.completions.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature
+                    )
+                    return response.choices[0].message.content or ""
+                except Exception as e:
+                    error = _typed_error(e)
+                finally:
+                    self.in_flight -= 1
+
+            if not self._should_retry(error, attempt):
+                raise error
+            await self._backoff(attempt, error)
+
+    def _should_retry(self, error: LLMError, attempt: int) -> bool:
+        if isinstance(error, LLMRateLimitError):
+            self.rate_limited += 1
+        retryable = isinstance(error, (LLMRateLimitError, LLMServerError, LLMTimeoutError))
+        if retryable and attempt < LLM_MAX_RETRIES:
+            return True
+        self.failures += 1
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+        }
+
+
+llm_client = AsyncLLMClient()
@@ -0,0 +1,141 @@
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+from contextvars import ContextVar
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Embedding, FAISS/BM25 search and index rebuilds. Threads, not processes: the
+# models and memory-mapped collections live in this process, and numpy, torch
+# and faiss release the GIL while they work.
+COMPUTE_POOL_WORKERS = int(os.getenv("COMPUTE_POOL_WORKERS", str(os.cpu_count() or 4)))
+COMPUTE_POOL_QUEUE = int(os.getenv("COMPUTE_POOL_QUEUE", "32"))
+# Blocking file and SQLite work of request handlers
+IO_POOL_WORKERS = int(os.getenv("IO_POOL_WORKERS", "16"))
+IO_POOL_QUEUE = int(os.getenv("IO_POOL_QUEUE", "128"))
+
+# Recent calls kept per pool for the wait/service percentiles
+TIMING_WINDOW = 1024
+
+# Per-request {metric: milliseconds}, filled by WorkPool.run for Server-Timing
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a pool's workers and queue are all taken"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WorkPool:
+    """Fixed thread pool with a bounded queue, for blocking work of async handlers.
+
+    `run` fails fast with PoolSaturatedError once `workers + queue_size` calls
+    are running or waiting, instead of letting latency grow without bound.
+    Time spent waiting for a worker and time spent working are recorded
+    separately, per pool and for the current request.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int):
+        self.name = name
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._timings = deque(maxlen=TIMING_WINDOW)  # (queue_wait_s, service_s)
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` on the pool and await its result"""
+        with self._lock:
+            if self._pending >= self.workers + self.queue_size:
+                self.rejected += 1
+                raise PoolSaturatedError(f"Server is busy ({self.name}), try again later", self._retry_after())
+            self._pending += 1
+
+        timings = _request_timings.get()
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+                    self._timings.append((started - submitted, finished - started))
+                    if timings is not None:
+                        queue_key = f"{self.name}-queue"
+                        timings[queue_key] = timings.get(queue_key, 0.0) + (started - submitted) * 1000
+                        timings[self.name] = timings.get(self.name, 0.0) + (finished - started) * 1000
+
+        future = self._executor.submit(timed)
+        # Also runs when the caller gives up and the call is cancelled before starting
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Future):
+        with self._lock:
+            self._pending -= 1
+
+    def _retry_after(self) -> int:
+        """Seconds until a queue slot is likely free, from recent service times (lock held)"""
+        if not self._timings:
+            return 1
+        mean_service = sum(service for _, service in self._timings) / len(self._timings)
+        waiting = max(1, self._pending - self.workers + 1)
+        return max(1, min(60, math.ceil(mean_service * waiting / self.workers)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(wait for wait, _ in self._timings)
+            services = sorted(service for _, service in self._timings)
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "queue_wait_ms": _percentiles(waits),
+                "service_ms": _percentiles(services),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _percentiles(values) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0}
+    return {
+        "p50": round(values[len(values) // 2] * 1000, 1),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))] * 1000, 1),
+    }
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Collect pool timings of the current request into the returned dict"""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+
+
+compute_pool = WorkPool("compute", COMPUTE_POOL_WORKERS, COMPUTE_POOL_QUEUE)
+io_pool = WorkPool("io", IO_POOL_WORKERS, IO_POOL_QUEUE)
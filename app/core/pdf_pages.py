@@ -0,0 +1,115 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# Page parsing for the extraction worker processes. Workers are spawned, so they
+# import only this module: PyMuPDF, no langchain, torch or pandas. Pages are
+# returned as {"page_content", "metadata"} dicts and made into Documents by the caller.
+
+
+def table_record(table, source: str, page: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Extracted table (a pandas DataFrame) in the {source, columns, data} form the table store takes"""
+    if table is None or not hasattr(table, "to_dict") or table.empty:
+        return None
+    record = {
+        "source": source,
+        "data": table.to_dict('records'),
+        "columns": list(table.columns)
+    }
+    if page is not None:
+        record["page"] = page
+    return record
+
+
+def page_tables(page, source: str, page_num: int) -> List[Dict[str, Any]]:
+    """Tables PyMuPDF detects on an already-open page"""
+    tables = []
+    try:
+        for found in page.find_tables().tables:
+            record = table_record(found.to_pandas(), source, page_num + 1)
+            if record is not None:
+                tables.append(record)
+    except Exception as e:
+        print(f"Table detection failed on page {page_num + 1} of {source}: {str(e)}")
+    return tables
+
+
+def parse_page(
+    page,
+    pdf_path: Path,
+    page_num: int,
+    total_pages: int,
+    with_tables: bool = False
+) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Single pass over one page: its page dict (None when blank), image and table records.
+    
+    Text is extracted once as blocks; the page text is rebuilt from the text
+    blocks in reading order, so get_text() is not run a second time. Tables are
+    detected with PyMuPDF on the same open page when `with_tables` is set.
+    """
+    blocks = page.get_text("blocks")
+    text_blocks = []
+    
+    for block in blocks:
+        if block[6] == 0:  # Text block
+            text_blocks.append({
+                "text": block[4],
+                "bbox": list(block[:4])  # x0, y0, x1, y1
+            })
+    
+    # Image xrefs come from the page's resources, no second text extraction
+    images = [
+        {
+            "source": pdf_path.name,
+            "page": page_num + 1,
+            "image_index": img_idx,
+            "xref": img[0]
+        }
+        for img_idx, img in enumerate(page.get_images())
+    ]
+    
+    tables = page_tables(page, pdf_path.name, page_num) if with_tables else []
+    
+    text = "".join(block["text"] for block in text_blocks)
+    if not text.strip():
+        return None, images, tables
+    
+    # Page with rich metadata
+    page_dict = {
+        "page_content": text,
+        "metadata": {
+            "source": pdf_path.name,
+            "page": page_num + 1,
+            "total_pages": total_pages,
+            "file_path": str(pdf_path),
+            "text_blocks": json.dumps(text_blocks)  # For highlighting
+        }
+    }
+    return page_dict, images, tables
+
+
+def parse_page_range(
+    pdf_path: str,
+    start: int,
+    end: int,
+    with_tables: bool = False
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Process-pool worker: open the PDF independently and parse pages [start, end)"""
+    path = Path(pdf_path)
+    pages = []
+    images_info = []
+    tables = []
+    pdf_document = fitz.open(path)
+    total_pages = len(pdf_document)
+    
+    for page_num in range(start, min(end, total_pages)):
+        page, images, page_table_records = parse_page(pdf_document[page_num], path, page_num, total_pages, with_tables)
+        if page is not None:
+            pages.append(page)
+        images_info.extend(images)
+        tables.extend(page_table_records)
+    
+    pdf_document.close()
+    return pages, images_info, tables
@@ -0,0 +1,123 @@
+import os
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_openai import ChatOpenAI
+from sentence_transformers import CrossEncoder
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Embedding model used for every collection
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# LLMs created eagerly during startup, as "provider:model" pairs
+WARMUP_LLMS = os.getenv("WARMUP_LLMS", "openai:gpt-3.5-turbo")
+
+
+class ModelRegistry:
+    """Process-wide, thread-safe registry of embedding models and LLM clients.
+
+    Models are created once per key and shared by every request, so chat and
+    upload calls no longer pay for model loading.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._embeddings: Dict[str, HuggingFaceEmbeddings] = {}
+        self._llms: Dict[Tuple[str, str, float], Any] = {}
+        self._cross_encoders: Dict[str, CrossEncoder] = {}
+        self._ready = threading.Event()
+        self._warmup_error: Optional[str] = None
+
+    def get_embeddings(self, model_name: str = EMBEDDING_MODEL_NAME) -> HuggingFaceEmbeddings:
+        """Return the shared embedding model, loading it on first use"""
+        embeddings = self._embeddings.get(model_name)
+        if embeddings is not None:
+            return embeddings
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            if model_name not in self._embeddings:
+                print(f"Loading embedding model: {model_name}")
+                self._embeddings[model_name] = HuggingFaceEmbeddings(model_name=model_name)
+            return self._embeddings[model_name]
+
+    def get_cross_encoder(self, model_name: str) -> CrossEncoder:
+        """Return the shared reranking cross-encoder, loading it (on CPU) on first use"""
+        cross_encoder = self._cross_encoders.get(model_name)
+        if cross_encoder is not None:
+            return cross_encoder
+
+        with self._lock:
+            if model_name not in self._cross_encoders:
+                print(f"Loading cross-encoder: {model_name}")
+                self._cross_encoders[model_name] = CrossEncoder(model_name, device="cpu")
+            return self._cross_encoders[model_name]
+
+    def get_llm(self, provider: str, model: str, temperature: float = 0.3):
+        """Return the shared LLM client for (provider, model, temperature)"""
+        key = (provider, model, temperature)
+        llm = self._llms.get(key)
+        if llm is not None:
+            return llm
+
+        with self._lock:
+            if key not in self._llms:
+                self._llms[key] = self._create_llm(provider, model, temperature)
+            return self._llms[key]
+
+    def _create_llm(self, provider: str, model: str, temperature: float):
+        """Create a new LLM client"""
+        if provider != "openai":
+            raise ValueError(f"Only OpenAI provider is supported. Got: {provider}")
+
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("OPENAI_API_KEY not found in environment variables")
+
+        print(f"Initializing ChatOpenAI with model: {model}")
+        return ChatOpenAI(
+            model=model,
+            openai_api_key=api_key,
+            temperature=temperature
+        )
+
+    def warmup(self):
+        """Load the embedding model and default LLM clients ahead of traffic"""
+        try:
+            embeddings = self.get_embeddings()
+            # Run one encode so torch initialisation happens now, not on the first request
+            embeddings.embed_query("warmup")
+
+            for entry in WARMUP_LLMS.split(","):
+                if ":" not in entry:
+                    continue
+                provider, model = entry.strip().split(":", 1)
+                try:
+                    self.get_llm(provider, model)
+                except ValueError as e:
+                    # Missing API keys should not stop the server from serving retrieval
+                    print(f"Skipping LLM warmup for {entry}: {str(e)}")
+        except Exception as e:
+            self._warmup_error = str(e)
+            print(f"Model warmup failed: {str(e)}")
+        finally:
+            self._ready.set()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set() and self._warmup_error is None
+
+    def status(self) -> Dict[str, Any]:
+        """Readiness information for health checks"""
+        return {
+            "ready": self.is_ready(),
+            "warmup_error": self._warmup_error,
+            "embedding_models": list(self._embeddings.keys()),
+            "cross_encoders": list(self._cross_encoders.keys()),
+            "llm_clients": [f"{p}:{m}" for p, m, _ in self._llms.keys()],
+        }
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,169 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.docstore.document import Document
+
+from app.core.embedding_cache import text_hash
+from app.core.registry import model_registry
+
+# Small CPU cross-encoder scoring (question, chunk) pairs
+RERANK_MODEL_NAME = os.getenv("RERANK_MODEL_NAME", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+
+# Defaults for collection retrieval settings (see retrieval_settings)
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "0") == "1"
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "4"))
+RERANK_BUDGET_MS = int(os.getenv("RERANK_BUDGET_MS", "300"))
+
+# Scores are deterministic per (question, chunk text) for the model; 0 entries disables caching
+RERANK_CACHE_MAX_ENTRIES = int(os.getenv("RERANK_CACHE_MAX_ENTRIES", "20000"))
+
+# Weight of the newest batch in the seconds-per-pair estimate
+_COST_SMOOTHING = 0.2
+
+
+def retrieval_settings(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """A collection's retrieval settings: its stored overrides on top of the env defaults"""
+    settings = {
+        "rerank": RERANK_ENABLED,
+        "rerank_candidates": RERANK_CANDIDATES,
+        "rerank_top_n": RERANK_TOP_N,
+        "rerank_budget_ms": RERANK_BUDGET_MS,
+    }
+    settings.update({key: value for key, value in (overrides or {}).items() if key in settings and value is not None})
+    return settings
+
+
+class CrossEncoderReranker:
+    """Reorders retrieval candidates by cross-encoder score, within a latency budget.
+
+    All uncached pairs of a question are scored in one batched predict call.
+    The expected cost comes from a running seconds-per-pair estimate; when it
+    exceeds the caller's budget (or the model is still loading) the candidates
+    are left as they are and the caller falls back to its normal ranking.
+    """
+
+    def __init__(self, model_name: str = RERANK_MODEL_NAME, max_entries: int = RERANK_CACHE_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model = None
+        self._loading = False
+        self._load_error: Optional[str] = None
+        self._seconds_per_pair: Optional[float] = None
+        self.reranked = 0
+        self.skipped_budget = 0
+        self.skipped_loading = 0
+        self.cache_hits = 0
+        self.pairs_scored = 0
+
+    def rerank(
+        self,
+        question: str,
+        docs_and_scores: List[Tuple[Document, float]],
+        top_n: int,
+        budget_ms: float
+    ) -> Optional[List[Tuple[Document, float]]]:
+        """Top `top_n` candidates with their cross-encoder scores, or None if skipped"""
+        model = self._get_model()
+        if model is None:
+            with self._lock:
+                self.skipped_loading += 1
+            return None
+
+        question_key = text_hash(question)
+        keys = [(question_key, text_hash(doc.page_content)) for doc, _ in docs_and_scores]
+        scores: Dict[Tuple[str, str], float] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._scores:
+                    self._scores.move_to_end(key)
+                    scores[key] = self._scores[key]
+            self.cache_hits += sum(1 for key in keys if key in scores)
+            seconds_per_pair = self._seconds_per_pair
+
+        # Each distinct uncached chunk is scored once
+        missing = {key: doc.page_content for key, (doc, _) in zip(keys, docs_and_scores) if key not in scores}
+        if missing:
+            if seconds_per_pair is not None and len(missing) * seconds_per_pair * 1000 > budget_ms:
+                with self._lock:
+                    self.skipped_budget += 1
+                return None
+            values = self._predict(model, [(question, text) for text in missing.values()])
+            scores.update(zip(missing.keys(), values))
+            self._store(list(zip(missing.keys(), values)))
+
+        with self._lock:
+            self.reranked += 1
+        ranked = sorted(range(len(keys)), key=lambda idx: scores[keys[idx]], reverse=True)[:top_n]
+        return [(docs_and_scores[idx][0], scores[keys[idx]]) for idx in ranked]
+
+    def _predict(self, model, pairs: List[Tuple[str, str]]) -> List[float]:
+        start = time.perf_counter()
+        values = [float(value) for value in model.predict(pairs, batch_size=RERANK_BATCH_SIZE)]
+        per_pair = (time.perf_counter() - start) / len(pairs)
+        with self._lock:
+            self.pairs_scored += len(pairs)
+            if self._seconds_per_pair is None:
+                self._seconds_per_pair = per_pair
+            else:
+                self._seconds_per_pair += _COST_SMOOTHING * (per_pair - self._seconds_per_pair)
+        return values
+
+    def _store(self, items: List[Tuple[Tuple[str, str], float]]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            for key, value in items:
+                self._scores[key] = value
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+
+    def _get_model(self):
+        """The loaded cross-encoder, or None while it loads in the background.
+
+        Loading takes seconds, far beyond any request's budget, so the first
+        request that wants reranking starts it and falls back meanwhile.
+        """
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if not self._loading:
+                self._loading = True
+                threading.Thread(target=self._load, name="reranker-load", daemon=True).start()
+        return None
+
+    def _load(self):
+        try:
+            model = model_registry.get_cross_encoder(self.model_name)
+            # Calibrate the cost estimate on a candidate-sized batch of chunk-sized text
+            self._predict(model, [("warmup question", "warmup " * 150)] * RERANK_CANDIDATES)
+            self._model = model
+        except Exception as e:
+            # Not retried: requests keep their normal ranking
+            self._load_error = str(e)
+            print(f"Reranker model failed to load: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "model": self.model_name,
+                "loaded": self._model is not None,
+                "load_error": self._load_error,
+                "reranked": self.reranked,
+                "skipped_budget": self.skipped_budget,
+                "skipped_loading": self.skipped_loading,
+                "pairs_scored": self.pairs_scored,
+                "cache_entries": len(self._scores),
+                "cache_hits": self.cache_hits,
+                "ms_per_pair": round(self._seconds_per_pair * 1000, 2) if self._seconds_per_pair is not None else None,
+            }
+
+
+reranker = CrossEncoderReranker()
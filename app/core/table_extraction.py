@@ -0,0 +1,93 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import fitz  # PyMuPDF
+import jpype
+import pandas as pd
+import tabula
+
+from app.core.pdf_pages import page_tables, table_record
+
+# "pymupdf" detects tables during the text pass over the open document;
+# "tabula" runs tabula-java on an in-process (JPype) JVM
+TABLE_BACKEND = os.getenv("TABLE_BACKEND", "pymupdf")
+TABLE_BACKENDS = ["pymupdf", "tabula"]
+
+# Concurrent page ranges per file for the tabula backend
+TABULA_WORKERS = int(os.getenv("TABULA_WORKERS", "4"))
+TABULA_PAGES_PER_TASK = int(os.getenv("TABULA_PAGES_PER_TASK", "8"))
+
+_tabula_pool: Optional[ThreadPoolExecutor] = None
+_tabula_pool_lock = threading.Lock()
+
+
+def number_tables(tables: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Assign table_index in document order"""
+    for idx, table in enumerate(tables):
+        table["table_index"] = idx
+    return tables
+
+
+def extract_tables_pymupdf(pdf_path: Path) -> List[Dict[str, Any]]:
+    """Tables of a whole PDF with PyMuPDF (ingestion gets them from the text pass instead)"""
+    tables = []
+    with fitz.open(pdf_path) as pdf_document:
+        for page_num, page in enumerate(pdf_document):
+            tables.extend(page_tables(page, pdf_path.name, page_num))
+    return number_tables(tables)
+
+
+def _get_tabula_pool() -> ThreadPoolExecutor:
+    global _tabula_pool
+    with _tabula_pool_lock:
+        if _tabula_pool is None:
+            _tabula_pool = ThreadPoolExecutor(max_workers=TABULA_WORKERS, thread_name_prefix="tabula")
+        return _tabula_pool
+
+
+def _tabula_range(pdf_path: Path, first: int, last: int) -> List[pd.DataFrame]:
+    # force_subprocess=False keeps every call on the one JVM JPype starts in this process
+    try:
+        return tabula.read_pdf(
+            str(pdf_path),
+            pages=f"{first}-{last}",
+            multiple_tables=True,
+            silent=True,
+            force_subprocess=False
+        )
+    finally:
+        # A pool thread left attached (or the one that started the JVM) makes
+        # JPype's shutdown at interpreter exit wait forever
+        jpype.detachThreadFromJVM()
+
+
+def extract_tables_tabula(
+    pdf_path: Path,
+    pages_per_task: int = TABULA_PAGES_PER_TASK
+) -> List[Dict[str, Any]]:
+    """Tables of a PDF with tabula, page ranges extracted concurrently on the shared JVM"""
+    try:
+        with fitz.open(pdf_path) as pdf_document:
+            total_pages = len(pdf_document)
+
+        pool = _get_tabula_pool()
+        futures = [
+            pool.submit(_tabula_range, pdf_path, first, min(first + pages_per_task - 1, total_pages))
+            for first in range(1, total_pages + 1, pages_per_task)
+        ]
+
+        # Collected in submission order, so tables stay in page order
+        tables = []
+        for future in futures:
+            for table in future.result():
+                record = table_record(table, pdf_path.name)
+                if record is not None:
+                    tables.append(record)
+        return number_tables(tables)
+    except Exception as e:
+        print(f"Table extraction failed for {pdf_path.name}: {str(e)}")
+        print("Note: Table extraction requires Java. Install Java and set JAVA_HOME if needed.")
+        return []
@@ -0,0 +1,213 @@
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+
+# Per-collection SQLite file holding every extracted table plus a schema catalog
+TABLES_DB_NAME = "tables.db"
+# Collections built before the table store kept records and CSV copies in JSON
+LEGACY_TABLES_NAME = "tables.json"
+
+# Limits on locally executed table queries
+TABLE_RESULT_MAX_ROWS = int(os.getenv("TABLE_RESULT_MAX_ROWS", "50"))
+TABLE_QUERY_TIMEOUT_SECONDS = float(os.getenv("TABLE_QUERY_TIMEOUT_SECONDS", "2"))
+
+CATALOG_TABLE = "_catalog"
+
+
+def _sql_column_names(columns: List[Any]) -> List[str]:
+    """Unique SQL identifiers for extracted column headers"""
+    names = []
+    for column in columns:
+        name = re.sub(r"[^a-z0-9]+", "_", str(column).lower()).strip("_") or "col"
+        if name[0].isdigit():
+            name = f"c_{name}"
+        base, n = name, 2
+        while name in names:
+            name = f"{base}_{n}"
+            n += 1
+        names.append(name)
+    return names
+
+
+def _typed_frame(table: Dict[str, Any], sql_columns: List[str]) -> Tuple[pd.DataFrame, List[str]]:
+    """Records of one extracted table as a frame with numeric columns converted.
+
+    A column is INTEGER or REAL when every non-empty cell parses as a number once
+    thousands separators, currency and percent signs are stripped; otherwise TEXT.
+    """
+    frame = pd.DataFrame(
+        [[record.get(column) for column in table["columns"]] for record in table["data"]],
+        columns=sql_columns
+    )
+
+    types = []
+    for name in sql_columns:
+        values = frame[name]
+        text = values.map(lambda v: None if pd.isna(v) else str(v).strip())
+        present = text.map(lambda v: bool(v))
+        numeric = pd.to_numeric(
+            text.where(present).str.replace(r"[,$%\s]", "", regex=True),
+            errors="coerce"
+        )
+
+        if present.any() and numeric.notna().sum() == present.sum():
+            if (numeric.dropna() % 1 == 0).all():
+                frame[name] = numeric.map(lambda v: None if pd.isna(v) else int(v)).astype(object)
+                types.append("INTEGER")
+            else:
+                frame[name] = numeric.map(lambda v: None if pd.isna(v) else float(v)).astype(object)
+                types.append("REAL")
+        else:
+            frame[name] = text.where(present, None).astype(object)
+            types.append("TEXT")
+    return frame, types
+
+
+class TableStore:
+    """Typed storage and local querying of a collection's extracted tables.
+
+    Each table becomes one SQLite table (t_1, t_2, ...); the catalog records its
+    source file, original and SQL column names, column types and row count, so
+    listing tables or choosing which ones a question needs never reads the rows.
+    """
+
+    def __init__(self, vector_store_path: Path):
+        self.db_path = vector_store_path / TABLES_DB_NAME
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        if read_only:
+            return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=10)
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {CATALOG_TABLE} ("
+            "table_name TEXT PRIMARY KEY, source TEXT NOT NULL, table_index INTEGER NOT NULL, "
+            "columns TEXT NOT NULL, sql_columns TEXT NOT NULL, types TEXT NOT NULL, "
+            "row_count INTEGER NOT NULL)"
+        )
+        return conn
+
+    def add(self, tables: List[Dict[str, Any]]):
+        """Store extracted tables ({source, table_index, columns, data} records)"""
+        if not tables:
+            return
+        conn = self._connect()
+        try:
+            taken = [row[0] for row in conn.execute(f"SELECT table_name FROM {CATALOG_TABLE}")]
+            next_id = max((int(name[2:]) for name in taken), default=0) + 1
+
+            for table in tables:
+                table_name = f"t_{next_id}"
+                next_id += 1
+                sql_columns = _sql_column_names(table["columns"])
+                frame, types = _typed_frame(table, sql_columns)
+                frame.to_sql(table_name, conn, index=False, dtype=dict(zip(sql_columns, types)))
+                conn.execute(
+                    f"INSERT INTO {CATALOG_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        table_name,
+                        table["source"],
+                        table["table_index"],
+                        json.dumps([str(c) for c in table["columns"]]),
+                        json.dumps(sql_columns),
+                        json.dumps(types),
+                        len(frame)
+                    )
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def remove_source(self, source: str):
+        """Drop every table extracted from one source file"""
+        if not self.db_path.exists():
+            return
+        conn = self._connect()
+        try:
+            names = [row[0] for row in conn.execute(
+                f"SELECT table_name FROM {CATALOG_TABLE} WHERE source = ?", (source,)
+            )]
+            for name in names:
+                conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            conn.execute(f"DELETE FROM {CATALOG_TABLE} WHERE source = ?", (source,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def catalog(self) -> List[Dict[str, Any]]:
+        """Schema of every stored table, without its rows"""
+        if not self.db_path.exists():
+            return []
+        conn = self._connect(read_only=True)
+        try:
+            rows = conn.execute(
+                f"SELECT table_name, source, table_index, columns, sql_columns, types, row_count "
+                f"FROM {CATALOG_TABLE} ORDER BY rowid"
+            ).fetchall()
+        finally:
+            conn.close()
+        return [
+            {
+                "table_name": table_name,
+                "source": source,
+                "table_index": table_index,
+                "columns": json.loads(columns),
+                "sql_columns": json.loads(sql_columns),
+                "types": json.loads(types),
+                "row_count": row_count,
+            }
+            for table_name, source, table_index, columns, sql_columns, types, row_count in rows
+        ]
+
+    def query(self, sql: str, max_rows: int = TABLE_RESULT_MAX_ROWS) -> Tuple[List[str], List[tuple], bool]:
+        """Run one read-only SELECT; returns (column names, rows, truncated).
+
+        Raises ValueError for anything but a single SELECT and sqlite3.Error when the
+        query fails or exceeds TABLE_QUERY_TIMEOUT_SECONDS.
+        """
+        statement = sql.strip().rstrip(";")
+        if not re.match(r"(?is)^\s*(select|with)\b", statement):
+            raise ValueError("Only SELECT queries can run against extracted tables")
+
+        conn = self._connect(read_only=True)
+        deadline = time.monotonic() + TABLE_QUERY_TIMEOUT_SECONDS
+        # A non-zero return aborts the statement
+        conn.set_progress_handler(lambda: int(time.monotonic() > deadline), 10000)
+        try:
+            cursor = conn.execute(statement)
+            rows = cursor.fetchmany(max_rows + 1)
+            columns = [d[0] for d in cursor.description or []]
+        finally:
+            conn.close()
+        return columns, rows[:max_rows], len(rows) > max_rows
+
+    def sample_rows(self, table_name: str, n: int = 3) -> List[tuple]:
+        conn = self._connect(read_only=True)
+        try:
+            return conn.execute(f'SELECT * FROM "{table_name}" LIMIT ?', (n,)).fetchall()
+        finally:
+            conn.close()
+
+
+def open_table_store(vector_store_path: Path) -> TableStore:
+    """Table store of a collection, converting a legacy tables.json on first use"""
+    store = TableStore(vector_store_path)
+    legacy_path = vector_store_path / LEGACY_TABLES_NAME
+    if legacy_path.exists() and not store.db_path.exists():
+        with open(legacy_path, "r") as f:
+            tables = json.load(f)
+
+        # Build aside and rename, so a concurrent reader never sees a partial catalog
+        tmp_store = TableStore(vector_store_path)
+        tmp_store.db_path = vector_store_path / f".tmp-{uuid.uuid4().hex}-{TABLES_DB_NAME}"
+        tmp_store.add(tables)
+        tmp_store._connect().close()
+        os.replace(tmp_store.db_path, store.db_path)
+        legacy_path.unlink(missing_ok=True)
+    return store
@@ -0,0 +1,277 @@
+import os
+import json
+import math
+import uuid
+import pickle
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import faiss
+import numpy as np
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+# "auto" picks by collection size; any other value forces that type for every collection
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "auto")
+INDEX_TYPES = ["flat", "ivf_flat", "hnsw", "ivf_pq"]
+
+# Collection sizes (chunks) at which "auto" moves to the next index type
+HNSW_MIN_VECTORS = int(os.getenv("HNSW_MIN_VECTORS", "20000"))
+IVF_PQ_MIN_VECTORS = int(os.getenv("IVF_PQ_MIN_VECTORS", "200000"))
+
+# Search-time parameters
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "16"))
+HNSW_M = int(os.getenv("HNSW_M", "32"))
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "64"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("HNSW_EF_CONSTRUCTION", "80"))
+
+INDEX_CONFIG_NAME = "index_config.json"
+
+# Vectors copied per step when a streamed flat index is converted to another type
+INDEX_REBUILD_BATCH = int(os.getenv("INDEX_REBUILD_BATCH", "8192"))
+
+# Chat loads map index.faiss read-only so processes share it through the page cache
+FAISS_MMAP = os.getenv("FAISS_MMAP", "1") == "1"
+IVF_TYPES = ("ivf_flat", "ivf_pq")
+
+
+def mmap_read_flags(index_type: str) -> int:
+    """faiss.read_index flags that map the vectors of an `index_type` index.
+    
+    IO_FLAG_MMAP maps IVF inverted lists and IO_FLAG_MMAP_IFC flat codes (flat
+    and HNSW storage); faiss does not accept both on one read.
+    """
+    if index_type in IVF_TYPES:
+        return faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP
+    return faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP_IFC
+
+
+def choose_index_type(num_vectors: int, forced: Optional[str] = None) -> str:
+    """Index type for a collection of `num_vectors` chunks"""
+    requested = forced or FAISS_INDEX_TYPE
+    if requested != "auto":
+        if requested not in INDEX_TYPES:
+            raise ValueError(f"Unknown index type '{requested}'. Available: {INDEX_TYPES}")
+        return requested
+
+    if num_vectors >= IVF_PQ_MIN_VECTORS:
+        return "ivf_pq"
+    if num_vectors >= HNSW_MIN_VECTORS:
+        return "hnsw"
+    return "flat"
+
+
+def index_params(index_type: str, num_vectors: int, dim: int) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    if index_type in ("ivf_flat", "ivf_pq"):
+        # ~4 * sqrt(n) lists, capped so each list still gets enough training points
+        params["nlist"] = max(1, min(int(4 * math.sqrt(num_vectors)), num_vectors // 39))
+        params["nprobe"] = min(IVF_NPROBE, params["nlist"])
+    if index_type == "ivf_pq":
+        # 8-dim sub-vectors, 8 bits each: dim / 8 bytes per vector
+        params["pq_m"] = next(m for m in (dim // 8, dim // 4, dim // 2, dim) if dim % m == 0)
+        params["pq_bits"] = 8
+    if index_type == "hnsw":
+        params["M"] = HNSW_M
+        params["ef_construction"] = HNSW_EF_CONSTRUCTION
+        params["ef_search"] = HNSW_EF_SEARCH
+    return params
+
+
+def _empty_index(index_type: str, dim: int, params: Dict[str, Any]) -> faiss.Index:
+    """Untrained, empty FAISS index (L2 metric, as the flat store uses)"""
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["M"])
+        index.hnsw.efConstruction = params["ef_construction"]
+        return index
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(faiss.IndexFlatL2(dim), dim, params["nlist"])
+    if index_type == "ivf_pq":
+        return faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, params["nlist"], params["pq_m"], params["pq_bits"])
+    raise ValueError(f"Unknown index type '{index_type}'")
+
+
+def build_index(vectors: np.ndarray, index_type: str, params: Dict[str, Any]) -> faiss.Index:
+    """Create, train and fill a FAISS index"""
+    index = _empty_index(index_type, vectors.shape[1], params)
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    apply_search_params(index, params)
+    return index
+
+
+def rebuild_index(
+    source: faiss.Index,
+    index_type: str,
+    params: Dict[str, Any],
+    batch_size: int = INDEX_REBUILD_BATCH
+) -> faiss.Index:
+    """Copy a flat index into a new index of `index_type`, `batch_size` vectors at a time.
+
+    IVF training uses an evenly spaced sample of at most 256 vectors per list,
+    which is as many as faiss itself would use.
+    """
+    total = source.ntotal
+    index = _empty_index(index_type, source.d, params)
+    if not index.is_trained:
+        sample_size = min(total, 256 * params["nlist"])
+        if sample_size == total:
+            sample = source.reconstruct_n(0, total)
+        else:
+            positions = np.linspace(0, total - 1, sample_size).astype(np.int64)
+            sample = np.vstack([source.reconstruct(int(pos)) for pos in positions])
+        index.train(sample.astype(np.float32))
+    for start in range(0, total, batch_size):
+        index.add(source.reconstruct_n(start, min(batch_size, total - start)))
+    apply_search_params(index, params)
+    return index
+
+
+def apply_search_params(index: faiss.Index, params: Dict[str, Any]):
+    """Set nprobe / efSearch, which are not guaranteed to survive serialization"""
+    if "nprobe" in params and hasattr(index, "nprobe"):
+        index.nprobe = params["nprobe"]
+    if "ef_search" in params and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = params["ef_search"]
+
+
+def empty_vector_store(embeddings: Any, dim: int):
+    """Flat LangChain FAISS store with no vectors, filled batch by batch during ingestion"""
+    return FAISS(
+        embedding_function=embeddings,
+        index=faiss.IndexFlatL2(dim),
+        docstore=InMemoryDocstore({}),
+        index_to_docstore_id={}
+    )
+
+
+def finalize_vector_store(vector_store, index_type: Optional[str] = None) -> Dict[str, Any]:
+    """Give a streamed (flat) store the index type chosen for its final size.
+
+    Returns the index_config to write next to it.
+    """
+    total = vector_store.index.ntotal
+    chosen = choose_index_type(total, index_type)
+    if chosen == "ivf_pq" and total < 256:
+        # PQ codebooks need at least 256 training vectors
+        print(f"Too few vectors ({total}) for ivf_pq, using flat index instead")
+        chosen = "flat"
+    params = index_params(chosen, total, vector_store.index.d)
+    if chosen != "flat":
+        vector_store.index = rebuild_index(vector_store.index, chosen, params)
+    return {"index_type": chosen, "num_vectors": total, "params": params}
+
+
+def delete_from_vector_store(vector_store, ids: List[str], index_config: Dict[str, Any]):
+    """Remove chunks by id.
+
+    A flat index removes in place and closes the gaps, as LangChain renumbers
+    index_to_docstore_id. HNSW cannot remove, and IVF remove_ids keeps the old
+    labels of the remaining vectors, which would then no longer match their
+    positions (nor the labels later adds get). Both are rebuilt from the kept
+    vectors; IVF keeps its trained quantizer.
+    """
+    index_type = index_config.get("index_type", "flat")
+    if index_type == "flat":
+        vector_store.delete(ids)
+        return
+
+    removed = set(ids)
+    keep = [(pos, doc_id) for pos, doc_id in sorted(vector_store.index_to_docstore_id.items()) if doc_id not in removed]
+    source = vector_store.index
+    if index_type in IVF_TYPES:
+        enable_reconstruct(source)
+        index = faiss.clone_index(source)
+        index.reset()
+    else:
+        index = _empty_index(index_type, source.d, index_config["params"])
+
+    for start in range(0, len(keep), INDEX_REBUILD_BATCH):
+        batch = keep[start:start + INDEX_REBUILD_BATCH]
+        index.add(np.vstack([source.reconstruct(pos) for pos, _ in batch]).astype(np.float32))
+    apply_search_params(index, index_config["params"])
+
+    vector_store.index = index
+    vector_store.index_to_docstore_id = {new_pos: doc_id for new_pos, (_, doc_id) in enumerate(keep)}
+    vector_store.docstore.delete(list(removed))
+
+
+def enable_reconstruct(index: faiss.Index):
+    """Let an IVF index reconstruct vectors by position; other types always can"""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+        ivf.make_direct_map()
+
+
+def reconstruct_vectors(index: faiss.Index, positions: List[int]) -> np.ndarray:
+    """Stored vectors at `positions` (for PQ, their decoded approximation)"""
+    if not positions:
+        return np.zeros((0, index.d), dtype=np.float32)
+    return np.vstack([index.reconstruct(int(pos)) for pos in positions]).astype(np.float32)
+
+
+def write_index_config(vector_store_path: Path, index_config: Dict[str, Any]):
+    with open(vector_store_path / INDEX_CONFIG_NAME, "w") as f:
+        json.dump(index_config, f, indent=2)
+
+
+def read_index_config(vector_store_path: Path) -> Dict[str, Any]:
+    """Index settings of a collection; stores built before this file existed are flat"""
+    config_path = vector_store_path / INDEX_CONFIG_NAME
+    if not config_path.exists():
+        return {"index_type": "flat", "params": {}}
+    with open(config_path, "r") as f:
+        return json.load(f)
+
+
+def load_vector_store(vector_store_path: Path, embeddings: Any, read_only: bool = False):
+    """Load a collection's FAISS store with its search parameters applied.
+
+    read_only=True opens index.faiss with the mmap flags (when FAISS_MMAP is on):
+    the vectors of every index type are mapped, so only touched pages become
+    resident and they are shared between processes through the page cache. Such
+    a store must never be modified. Ingestion and incremental updates use
+    read_only=False.
+    """
+    index_config = read_index_config(vector_store_path)
+    if read_only and FAISS_MMAP:
+        index = faiss.read_index(str(vector_store_path / "index.faiss"), mmap_read_flags(index_config["index_type"]))
+        with open(vector_store_path / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        vector_store = FAISS(
+            embedding_function=embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+    else:
+        vector_store = FAISS.load_local(
+            str(vector_store_path),
+            embeddings,
+            allow_dangerous_deserialization=True
+        )
+
+    apply_search_params(vector_store.index, index_config["params"])
+    # Chat reads candidate vectors back from the index
+    enable_reconstruct(vector_store.index)
+    return vector_store
+
+
+def save_vector_store(vector_store, vector_store_path: Path):
+    """Write index.faiss/index.pkl by atomic rename.
+
+    Readers that mapped the previous index.faiss keep a valid mapping of the old
+    file instead of seeing it truncated under them.
+    """
+    vector_store_path.mkdir(parents=True, exist_ok=True)
+    tmp_dir = vector_store_path / f".tmp-{uuid.uuid4().hex}"
+    try:
+        vector_store.save_local(str(tmp_dir))
+        for name in ("index.faiss", "index.pkl"):
+            os.replace(tmp_dir / name, vector_store_path / name)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
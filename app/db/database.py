@@ -1,7 +1,12 @@
 import os
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # Define the path for the SQLite database file
 # It will be created in the `storage/` directory
@@ -10,28 +15,121 @@ if not os.path.exists(STORAGE_DIR):
     os.makedirs(STORAGE_DIR)
 
 SQLALCHEMY_DATABASE_URL = f"sqlite:///{STORAGE_DIR}/database.db"
+# Same file through aiosqlite, for the request handlers
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{STORAGE_DIR}/database.db"
+
+# Connection pool of the async engine that serves reads
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "8"))
+DB_POOL_TIMEOUT_SECONDS = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10"))
+# How long a connection waits on another writer's lock before "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+# NORMAL is durable under WAL except for the last commits before a power loss
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the single writer instead of blocking on it"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.close()
+
+
+def build_engine(url: str) -> Engine:
+    """Sync engine, for work that runs in worker threads (background ingestion)"""
+    engine = create_engine(
+        url,
+        # `check_same_thread` is needed only for SQLite
+        connect_args={"check_same_thread": False}
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def build_async_engine(
+    url: str,
+    pool_size: int = DB_POOL_SIZE,
+    max_overflow: int = DB_MAX_OVERFLOW
+) -> AsyncEngine:
+    """Pooled aiosqlite engine, for the request handlers"""
+    engine = create_async_engine(
+        url,
+        # aiosqlite file URLs default to NullPool, which takes no pool arguments
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        # Sessions always end their transaction before handing the connection
+        # back; the pool's own reset would be one more rollback, i.e. one more
+        # round trip to the aiosqlite thread per request
+        pool_reset_on_return=None
+    )
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
 
-# Create the SQLAlchemy engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    # `check_same_thread` is needed only for SQLite
-    connect_args={"check_same_thread": False} 
-)
+
+class RoutingSession(Session):
+    """Runs flushes and INSERT/UPDATE/DELETE on the writer engine, queries on the reader.
+    
+    SQLite takes one writer at a time. Writers queue for the writer engine's
+    single connection instead of contending for the file lock (and sleeping in
+    busy_timeout) on connections readers also need; under WAL the readers keep
+    going while a write is in progress.
+    """
+    
+    def __init__(self, reader: Optional[AsyncEngine] = None, writer: Optional[AsyncEngine] = None, **kw):
+        super().__init__(**kw)
+        self._reader = reader.sync_engine if reader is not None else None
+        self._writer = writer.sync_engine if writer is not None else None
+    
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._reader is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return self._writer
+        return self._reader
+
+
+def build_async_sessionmaker(reader: AsyncEngine, writer: AsyncEngine) -> async_sessionmaker:
+    """Sessions that read through `reader` and write through `writer`"""
+    # Loaded attributes stay readable after commit, without a lazy refresh
+    return async_sessionmaker(
+        sync_session_class=RoutingSession,
+        reader=reader,
+        writer=writer,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+
+# Create the SQLAlchemy engines
+engine = build_engine(SQLALCHEMY_DATABASE_URL)
+async_engine = build_async_engine(ASYNC_DATABASE_URL)
+async_write_engine = build_async_engine(ASYNC_DATABASE_URL, pool_size=1, max_overflow=0)
 
 # Create a SessionLocal class, which will be our database session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = build_async_sessionmaker(async_engine, async_write_engine)
 
 # Base class for our models to inherit from
 Base = declarative_base()
 
 # Dependency to get a DB session in our endpoints
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Function to create all tables
-def init_db():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+async def init_db():
+    async with async_write_engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+
+
+def _create_schema(connection):
+    Base.metadata.create_all(bind=connection)
+    # create_all skips existing tables, indexes added since included
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
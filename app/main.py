@@ -1,8 +1,19 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api import endpoints, auth  # Import both routers
-from app.db.database import init_db
+from app.db.database import init_db, async_engine, async_write_engine
+from app.core.registry import model_registry
+from app.core.jobs import job_manager
+from app.core.offload import (
+    compute_pool,
+    io_pool,
+    PoolSaturatedError,
+    start_request_timings,
+    server_timing_header
+)
 
 app = FastAPI(title="AskViolet")
 
@@ -10,9 +21,18 @@ app = FastAPI(title="AskViolet")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Initializing database...")
-    init_db()
+    await init_db()
     print("Database initialized.")
+    # Load embedding model and LLM clients in the background; /health/ready reports progress
+    print("Warming up models...")
+    warmup = asyncio.get_running_loop().run_in_executor(None, model_registry.warmup)
     yield
+    await warmup
+    job_manager.shutdown()
+    compute_pool.shutdown()
+    io_pool.shutdown()
+    await async_engine.dispose()
+    await async_write_engine.dispose()
 
 app = FastAPI(title="AskVoilet", lifespan=lifespan)
 
@@ -31,6 +51,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Worker pool admission and timing ---
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """Report time queued for and spent in the worker pools as Server-Timing"""
+    timings = start_request_timings()
+    response = await call_next(request)
+    if timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
 # --- API Endpoints ---
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 
@@ -40,3 +80,10 @@ app.include_router(endpoints.router, prefix="/api/app", tags=["Application"])
 @app.get("/")
 async def read_root():
     return {"message": "If it is your wish, I will travel anywhere to meet you. I am an Auto Memories Doll, my name is Violet Evergarden💜."}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 200 once shared models are loaded, 503 before that"""
+    status = model_registry.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
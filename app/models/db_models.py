@@ -30,5 +30,5 @@ class DocumentCollection(Base):
     llm_model = Column(String, default="gpt-3.5-turbo")
     
     # Link to user
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id"), index=True)
     owner = relationship("User", back_populates="collections")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 
 # --- User & Token Schemas ---
@@ -75,6 +75,22 @@ class UploadResponse(BaseModel):
     processing_stats: Optional[Dict[str, Any]] = None
     insights: Optional[DocumentInsights] = None
 
+# --- Background Ingestion Schemas ---
+
+class IngestionProgress(BaseModel):
+    pages_parsed: int = 0
+    chunks_embedded: int = 0
+    tables_extracted: int = 0
+
+class JobStatus(BaseModel):
+    """Status of a background upload job"""
+    job_id: str
+    status: str  # "queued", "running", "completed" or "failed"
+    stage: Optional[str] = None  # "parsing", "embedding", "indexing", "completed"
+    progress: IngestionProgress
+    result: Optional[UploadResponse] = None
+    error: Optional[str] = None
+
 # --- Chat Schemas ---
 
 class ChatRequest(BaseModel):
@@ -90,6 +106,7 @@ class ChatResponse(BaseModel):
     type: str  # "document_query" or "table_query"
     sources: List[SourceInfo]
     context_used: Optional[int] = None
+    prompt_tokens: Optional[int] = None  # Answer prompt size, document queries only
 
 # --- Insights Retrieval ---
 
@@ -98,7 +115,8 @@ class InsightsRequest(BaseModel):
 
 class InsightsResponse(BaseModel):
     collection_id: int
-    insights: DocumentInsights
+    status: str = "ready"  # "pending" while generated in the background, "ready" or "failed"
+    insights: Optional[DocumentInsights] = None  # while pending, the previous insights if any
 
 # --- Table Query Schemas ---
 
@@ -110,4 +128,20 @@ class TableInfo(BaseModel):
 
 class TablesListResponse(BaseModel):
     collection_id: int
-    tables: List[TableInfo]
\ No newline at end of file
+    tables: List[TableInfo]
+
+# --- Retrieval Settings ---
+
+class RetrievalSettingsUpdate(BaseModel):
+    """Per-collection retrieval overrides; omitted fields keep their current value"""
+    rerank: Optional[bool] = None
+    rerank_candidates: Optional[int] = Field(None, ge=1, le=200)
+    rerank_top_n: Optional[int] = Field(None, ge=1, le=50)
+    rerank_budget_ms: Optional[int] = Field(None, ge=0)
+
+class RetrievalSettings(BaseModel):
+    collection_id: int
+    rerank: bool
+    rerank_candidates: int
+    rerank_top_n: int
+    rerank_budget_ms: int
\ No newline at end of file
@@ -0,0 +1,111 @@
+"""
+Per-request authentication overhead and event-loop stalls from bcrypt.
+
+Usage:
+    python -m benchmarks.auth_overhead [requests] [logins]
+
+Resolving the current user runs get_current_user `requests` times against a
+temporary database, first with the token and user caches disabled (decode and
+query on every request, as before) and then enabled. The login part runs
+`logins` concurrent password checks, first inline on the event loop (as before)
+and then on the bcrypt executor, while a 1 ms ticker measures the worst loop stall.
+"""
+import os
+import sys
+import time
+import asyncio
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.database import Base, build_async_engine
+from app.models import db_models
+from app.core.security import create_access_token, get_password_hash, verify_password, averify_password
+from app.core.auth_cache import user_cache, token_cache
+from app.core.dependencies import get_current_user
+
+PASSWORD = "benchmark-password"
+
+
+async def _resolve(Session, token: str, requests: int):
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        async with Session() as db:
+            await get_current_user(token, db)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def _logins(hashed: str, logins: int, inline: bool):
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - start - 0.001)
+
+    async def login():
+        if inline:
+            return verify_password(PASSWORD, hashed)
+        return await averify_password(PASSWORD, hashed)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    seconds = time.perf_counter() - start
+    done = True
+    await tick
+    return seconds, stall
+
+
+def _us(timings, q):
+    timings = sorted(timings)
+    return timings[min(len(timings) - 1, int(len(timings) * q))] * 1e6
+
+
+async def run(requests: int, logins: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'auth.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+        hashed = get_password_hash(PASSWORD)
+        async with Session() as db:
+            db.add(db_models.User(username="benchmark", hashed_password=hashed))
+            await db.commit()
+        token = create_access_token(data={"sub": "benchmark"})
+
+        user_cache.max_entries = token_cache.max_entries = 0
+        before = await _resolve(Session, token, requests)
+        user_cache.max_entries = token_cache.max_entries = 1024
+        after = await _resolve(Session, token, requests)
+
+        print(f"get_current_user, {requests} requests")
+        for name, timings in (("before", before), ("after", after)):
+            print(f"  {name:<8}p50 {_us(timings, 0.5):8.0f}us  p95 {_us(timings, 0.95):8.0f}us")
+
+        print(f"login password check, {logins} concurrent")
+        for name, inline in (("inline", True), ("executor", False)):
+            seconds, stall = await _logins(hashed, logins, inline)
+            print(f"  {name:<10}{logins / seconds:6.1f} logins/s  worst loop stall {stall * 1000:7.1f}ms")
+
+        await engine.dispose()
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(run(requests, logins))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Measure chat latency with and without the shared model registry.
+
+Usage:
+    python -m benchmarks.chat_latency storage/vector_store/<session_id> "What is this about?"
+
+"Before" rebuilds the embedding model and LLM client for every question, the way
+each request used to. "After" reuses the clients held by `model_registry`.
+
+Only the registry differs between the two: the answer and LLM response caches
+are off, and the collection cache is cleared before every run, so each question
+loads the collection from disk and calls the LLM in both.
+"""
+import sys
+import time
+import statistics
+from pathlib import Path
+
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from app.core.ai import EnhancedRAGSystem
+from app.core.answer_cache import answer_cache
+from app.core.collection_cache import collection_cache
+from app.core.llm_cache import llm_call_cache
+from app.core.registry import model_registry, EMBEDDING_MODEL_NAME
+
+
+def _time_question(rag_factory, vector_store_path: Path, question: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        collection_cache.clear()
+        start = time.perf_counter()
+        rag_system = rag_factory()
+        rag_system.load_vector_store(vector_store_path)
+        rag_system.get_answer_with_sources(question)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _cold_system():
+    # Bypass the registry: fresh model objects per request
+    rag_system = EnhancedRAGSystem()
+    rag_system.embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+    rag_system.llm_manager.llm = model_registry._create_llm("openai", "gpt-3.5-turbo", 0.3)
+    return rag_system
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    vector_store_path = Path(sys.argv[1])
+    question = sys.argv[2]
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    model_registry.warmup()
+    # Repeated questions would otherwise be answered from the answer cache, or
+    # "after" would reuse the LLM responses "before" stored
+    answer_cache.max_entries = 0
+    llm_call_cache.max_entries = 0
+
+    before = _time_question(_cold_system, vector_store_path, question, runs)
+    after = _time_question(EnhancedRAGSystem, vector_store_path, question, runs)
+
+    print(f"before (per-request models): median {statistics.median(before):.0f} ms")
+    print(f"after  (shared registry):    median {statistics.median(after):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
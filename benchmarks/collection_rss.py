@@ -0,0 +1,56 @@
+"""
+Resident memory with many collections open, copy-loaded vs memory-mapped.
+
+Usage:
+    python -m benchmarks.collection_rss copy storage/vector_store/<id1> [<id2> ...]
+    python -m benchmarks.collection_rss mmap storage/vector_store/<id1> [<id2> ...]
+
+Run each mode in its own process. Every collection is loaded the way chat loads
+it and searched once, then RSS (and its file-backed share, which the page cache
+can reclaim and other processes share) is reported after each load.
+"""
+import sys
+from pathlib import Path
+
+from app.core.registry import model_registry
+from app.core.vector_index import load_vector_store
+
+
+def _rss_kib():
+    """(total RSS, file-backed RSS) of this process in KiB"""
+    values = {}
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("VmRSS", "RssFile"):
+                values[key] = int(rest.split()[0])
+    return values.get("VmRSS", 0), values.get("RssFile", 0)
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("copy", "mmap"):
+        print(__doc__)
+        sys.exit(1)
+
+    read_only = sys.argv[1] == "mmap"
+    paths = [Path(p) for p in sys.argv[2:]]
+    embeddings = model_registry.get_embeddings()
+
+    base_rss, base_file = _rss_kib()
+    print(f"baseline: RSS {base_rss / 1024:.1f} MiB (file-backed {base_file / 1024:.1f} MiB)")
+
+    stores = []
+    for n, path in enumerate(paths, start=1):
+        store = load_vector_store(path, embeddings, read_only=read_only)
+        store.similarity_search("warm up the index", k=4)
+        stores.append(store)
+
+        rss, file_backed = _rss_kib()
+        print(
+            f"{n} open: RSS +{(rss - base_rss) / 1024:.1f} MiB, "
+            f"private +{((rss - file_backed) - (base_rss - base_file)) / 1024:.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Answer prompt size with top-k context vs. the token-budgeted context assembler.
+
+Usage:
+    python -m benchmarks.context_tokens storage/vector_store/<session_id> questions.txt [k] [model]
+
+For each question (one per line) the prompt is built twice without calling the
+LLM: "before" joins the full text of the top-k retrieved chunks, as
+get_answer_with_sources used to; "after" is what retrieve() assembles now (MMR
+over CONTEXT_CANDIDATES, merged overlaps, token budget). Reported per variant:
+mean and max prompt tokens, and the mean number of distinct pages in the
+context, as a rough check that grounding is kept.
+"""
+import sys
+import statistics
+from pathlib import Path
+
+from app.core.ai import EnhancedRAGSystem, RETRIEVAL_MODE
+from app.core.context_assembly import count_tokens
+
+
+def _before(rag, question: str, k: int):
+    query_vector = rag.embeddings.embed_query(question)
+    if RETRIEVAL_MODE == "hybrid" and rag.lexical_index is not None:
+        docs_and_scores = rag.hybrid_search(question, k, query_vector)
+    else:
+        docs_and_scores = rag.vector_store.similarity_search_with_score_by_vector(query_vector, k=k)
+    prompt = rag.build_answer_prompt(question, [doc.page_content for doc, _ in docs_and_scores])
+    pages = {(doc.metadata.get("source"), doc.metadata.get("page")) for doc, _ in docs_and_scores}
+    return prompt, len(pages)
+
+
+def _after(rag, question: str, k: int):
+    context_parts, sources = rag.retrieve(question, k=k)
+    prompt = rag.build_answer_prompt(question, context_parts)
+    return prompt, len({(s["source"], s["page"]) for s in sources})
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    vector_store_path = Path(sys.argv[1])
+    questions = [line.strip() for line in open(sys.argv[2]) if line.strip()]
+    k = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    model = sys.argv[4] if len(sys.argv) > 4 else "gpt-3.5-turbo"
+
+    rag = EnhancedRAGSystem(llm_model=model)
+    rag.load_vector_store(vector_store_path)
+
+    print(f"{len(questions)} questions, k={k}, model {rag.llm_manager.api_model_name}")
+    for name, build in (("before", _before), ("after", _after)):
+        tokens, pages = [], []
+        for question in questions:
+            prompt, distinct_pages = build(rag, question, k)
+            tokens.append(count_tokens(prompt, rag.llm_manager.api_model_name))
+            pages.append(distinct_pages)
+        print(f"  {name:<8}prompt tokens mean {statistics.mean(tokens):7.1f}  max {max(tokens):5d}  "
+              f"pages in context {statistics.mean(pages):4.1f}")
+
+
+if __name__ == "__main__":
+    main()
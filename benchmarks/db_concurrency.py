@@ -0,0 +1,177 @@
+"""
+Concurrent read/write throughput of the old and new database setups.
+
+Usage:
+    python -m benchmarks.db_concurrency [tasks] [ops_per_task] [write_pct]
+
+Each of `tasks` concurrent coroutines runs `ops_per_task` operations on a fresh
+SQLite file seeded with OWNERS users of COLLECTIONS_PER_OWNER collections each:
+reads list one owner's collections (the /collections query), writes insert a
+collection and commit (the end of an upload). "before" is the previous setup:
+default sync engine, rollback journal, no owner_id index, queries run directly
+on the event loop. "after" is the session get_db hands out: reads on the pooled
+aiosqlite engine, writes on the single-connection writer engine, WAL,
+busy_timeout and synchronous=NORMAL. Reported: operations per second, p50/p95
+latency per operation kind, "database is locked" failures, and the longest
+event-loop stall seen by a 1ms ticker (how long other requests would have waited).
+
+Latency runs from the moment a task wants the event loop for its next operation,
+so in "before" it includes waiting for the other tasks' blocking queries.
+"""
+import sys
+import time
+import uuid
+import random
+import asyncio
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base, build_async_engine, build_async_sessionmaker
+from app.models import db_models
+
+OWNERS = 1000
+COLLECTIONS_PER_OWNER = 10
+
+
+def _collection(owner_id: int) -> db_models.DocumentCollection:
+    return db_models.DocumentCollection(
+        collection_name="bench",
+        vector_store_session_id=str(uuid.uuid4()),
+        owner_id=owner_id
+    )
+
+
+def _seed(session):
+    for owner_id in range(1, OWNERS + 1):
+        session.add(db_models.User(id=owner_id, username=f"user{owner_id}", hashed_password="x"))
+        for _ in range(COLLECTIONS_PER_OWNER):
+            session.add(_collection(owner_id))
+
+
+async def run_before(path: Path, tasks: int, ops: int, write_pct: float):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    for index in db_models.DocumentCollection.__table__.indexes:
+        if "owner_id" in index.columns:
+            index.drop(bind=engine)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with Session() as session:
+        _seed(session)
+        session.commit()
+
+    async def worker(timings):
+        for _ in range(ops):
+            owner_id = random.randint(1, OWNERS)
+            write = random.uniform(0, 100) < write_pct
+            start = time.perf_counter()
+            await asyncio.sleep(0)
+            try:
+                with Session() as session:
+                    if write:
+                        session.add(_collection(owner_id))
+                        session.commit()
+                    else:
+                        session.query(db_models.DocumentCollection).filter(
+                            db_models.DocumentCollection.owner_id == owner_id
+                        ).all()
+                timings["write" if write else "read"].append(time.perf_counter() - start)
+            except OperationalError:
+                timings["locked"] += 1
+
+    result = await _measure(worker, tasks)
+    engine.dispose()
+    return result
+
+
+async def run_after(path: Path, tasks: int, ops: int, write_pct: float):
+    reader = build_async_engine(f"sqlite+aiosqlite:///{path}")
+    writer = build_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=1, max_overflow=0)
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = build_async_sessionmaker(reader, writer)
+    async with Session() as session:
+        _seed(session)
+        await session.commit()
+
+    async def worker(timings):
+        for _ in range(ops):
+            owner_id = random.randint(1, OWNERS)
+            write = random.uniform(0, 100) < write_pct
+            start = time.perf_counter()
+            try:
+                async with Session() as session:
+                    if write:
+                        session.add(_collection(owner_id))
+                        await session.commit()
+                    else:
+                        (await session.scalars(
+                            select(db_models.DocumentCollection).where(
+                                db_models.DocumentCollection.owner_id == owner_id
+                            )
+                        )).all()
+                timings["write" if write else "read"].append(time.perf_counter() - start)
+            except OperationalError:
+                timings["locked"] += 1
+
+    result = await _measure(worker, tasks)
+    await reader.dispose()
+    await writer.dispose()
+    return result
+
+
+async def _ticker(timings, done: asyncio.Event):
+    last = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        timings["stall"] = max(timings["stall"], now - last - 0.001)
+        last = now
+
+
+async def _measure(worker, tasks: int):
+    timings = {"read": [], "write": [], "locked": 0, "stall": 0.0}
+    done = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(timings, done))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(timings) for _ in range(tasks)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker
+    return timings, elapsed
+
+
+def _ms(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000
+
+
+def _report(name, timings, seconds):
+    done = len(timings["read"]) + len(timings["write"])
+    print(f"{name:<8}{done / seconds:>10.0f} ops/s   "
+          f"read p50 {_ms(timings['read'], 0.5):.1f}ms p95 {_ms(timings['read'], 0.95):.1f}ms   "
+          f"write p50 {_ms(timings['write'], 0.5):.1f}ms p95 {_ms(timings['write'], 0.95):.1f}ms   "
+          f"locked {timings['locked']}   max loop stall {timings['stall'] * 1000:.1f}ms")
+
+
+def main():
+    args = sys.argv[1:]
+    tasks = int(args[0]) if len(args) > 0 else 32
+    ops = int(args[1]) if len(args) > 1 else 100
+    write_pct = float(args[2]) if len(args) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{tasks} tasks x {ops} ops, {write_pct:.0f}% writes")
+        timings, seconds = asyncio.run(run_before(Path(tmp) / "before.db", tasks, ops, write_pct))
+        _report("before", timings, seconds)
+        timings, seconds = asyncio.run(run_after(Path(tmp) / "after.db", tasks, ops, write_pct))
+        _report("after", timings, seconds)
+
+
+if __name__ == "__main__":
+    main()
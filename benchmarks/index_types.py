@@ -0,0 +1,83 @@
+"""
+Recall-vs-latency benchmark for the FAISS index types used by collections.
+
+Usage:
+    python -m benchmarks.index_types storage/vector_store/<session_id> [k]
+    python -m benchmarks.index_types --synthetic 50000 [k]
+
+For every index type it reports recall@k against the exact flat index, query
+latency p50/p99 (single query, as chat issues them) and serialized bytes per vector.
+Queries are stored vectors with small noise added, so each has a near neighbour.
+"""
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+from app.core.vector_index import INDEX_TYPES, index_params, build_index
+
+NUM_QUERIES = 500
+
+
+def _load_vectors(argv):
+    if argv[1] == "--synthetic":
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((int(argv[2]), 384)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    index = faiss.read_index(str(Path(argv[1]) / "index.faiss"))
+    return index.reconstruct_n(0, index.ntotal).astype(np.float32)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    vectors = _load_vectors(sys.argv)
+    k_arg = 3 if sys.argv[1] == "--synthetic" else 2
+    k = int(sys.argv[k_arg]) if len(sys.argv) > k_arg else 4
+
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(vectors), size=min(NUM_QUERIES, len(vectors)), replace=False)
+    queries = vectors[picks] + rng.normal(0, 0.01, (len(picks), vectors.shape[1])).astype(np.float32)
+
+    results = {}
+    for index_type in INDEX_TYPES:
+        params = index_params(index_type, len(vectors), vectors.shape[1])
+        start = time.perf_counter()
+        index = build_index(vectors, index_type, params)
+        build_seconds = time.perf_counter() - start
+
+        latencies = []
+        neighbours = []
+        for query in queries:
+            start = time.perf_counter()
+            _, ids = index.search(query.reshape(1, -1), k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            neighbours.append(set(ids[0].tolist()))
+
+        results[index_type] = {
+            "neighbours": neighbours,
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "bytes_per_vector": len(faiss.serialize_index(index)) / len(vectors),
+            "build_s": build_seconds,
+            "params": params,
+        }
+
+    baseline = results["flat"]["neighbours"]
+    print(f"{len(vectors)} vectors, dim {vectors.shape[1]}, {len(queries)} queries, k={k}")
+    print(f"{'index':<10}{'recall@k':>10}{'p50 ms':>10}{'p99 ms':>10}{'B/vector':>10}{'build s':>10}  params")
+    for index_type, r in results.items():
+        recall = np.mean([len(a & b) / k for a, b in zip(r["neighbours"], baseline)])
+        print(
+            f"{index_type:<10}{recall:>10.3f}{r['p50_ms']:>10.3f}{r['p99_ms']:>10.3f}"
+            f"{r['bytes_per_vector']:>10.0f}{r['build_s']:>10.1f}  {r['params']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Peak memory and throughput of ingesting PDFs into a new collection.
+
+Usage:
+    python -m benchmarks.ingest_memory file1.pdf [file2.pdf ...]
+
+Runs process_files once into a temporary collection, with a fresh artifact
+store and embedding cache so every page is parsed and embedded. Reported: peak
+RSS (VmHWM) above the baseline taken after the embedding model is loaded, and
+the per-stage counts and rates process_files returns. Compare against a run of
+the previous commit on the same files (e.g. a 2,000-page PDF).
+"""
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["ARTIFACTS_DIR"] = str(Path(_tmp.name) / "artifacts")
+os.environ["EMBEDDING_CACHE_PATH"] = str(Path(_tmp.name) / "embedding_cache.db")
+
+from app.core.ai import EnhancedRAGSystem
+
+
+def _peak_rss_kib():
+    with open("/proc/self/status", "r") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key == "VmHWM":
+                return int(rest.split()[0])
+    return 0
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    pdf_paths = [Path(p) for p in sys.argv[1:]]
+    rag = EnhancedRAGSystem()
+    rag.embeddings.embed_query("warm up")
+    baseline = _peak_rss_kib()
+
+    stages = []
+    start = time.perf_counter()
+    result = rag.process_files(
+        pdf_paths,
+        Path(_tmp.name) / "collection",
+        progress_callback=lambda stage=None, **counts: stage and stages.append((stage, time.perf_counter() - start))
+    )
+    seconds = time.perf_counter() - start
+    peak = _peak_rss_kib()
+
+    print(f"baseline RSS {baseline / 1024:.1f} MiB, peak {peak / 1024:.1f} MiB (+{(peak - baseline) / 1024:.1f} MiB)")
+    print(f"total {seconds:.1f}s; stages: " + ", ".join(f"{stage} @ {at:.1f}s" for stage, at in stages))
+    for key, value in result.items():
+        print(f"  {key}: {value}")
+    _tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
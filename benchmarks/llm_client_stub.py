@@ -0,0 +1,134 @@
+"""
+Drive the async LLM client against a local stub of the chat completions API.
+
+Usage:
+    python -m benchmarks.llm_client_stub [requests] [latency_ms] [rate_limit_pct] [server_error_pct]
+
+The stub answers POST /v1/chat/completions after `latency_ms`, and fails the given
+percentages of calls with 429 (Retry-After: 1) or 503. All requests are fired at
+once; the report shows successes, typed failures, client retries, p50/p99 latency
+and the highest number of requests the stub saw at the same time, which must not
+exceed LLM_MAX_CONCURRENCY / LLM_MAX_CONCURRENCY_PER_MODEL.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import threading
+import statistics
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, latency: float, rate_limit_pct: float, server_error_pct: float):
+        self.latency = latency
+        self.rate_limit_pct = rate_limit_pct
+        self.server_error_pct = server_error_pct
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+
+def _handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with state.lock:
+                state.active += 1
+                state.max_active = max(state.max_active, state.active)
+            try:
+                time.sleep(state.latency)
+                roll = random.uniform(0, 100)
+                if roll < state.rate_limit_pct:
+                    self._send(429, {"error": {"message": "rate limited"}}, {"Retry-After": "1"})
+                elif roll < state.rate_limit_pct + state.server_error_pct:
+                    self._send(503, {"error": {"message": "overloaded"}})
+                else:
+                    self._send(200, {
+                        "id": "stub",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": "stub",
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "stub answer"},
+                            "finish_reason": "stop"
+                        }]
+                    })
+            finally:
+                with state.lock:
+                    state.active -= 1
+
+        def _send(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+async def _fire(client, count: int):
+    from app.core.llm_client import LLMError
+
+    async def one(i):
+        start = time.perf_counter()
+        try:
+            await client.generate("gpt-3.5-turbo", f"question {i}")
+            outcome = "ok"
+        except LLMError as e:
+            outcome = type(e).__name__
+        return outcome, (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(one(i) for i in range(count)))
+
+
+def main():
+    args = sys.argv[1:]
+    count = int(args[0]) if len(args) > 0 else 200
+    latency_ms = float(args[1]) if len(args) > 1 else 100
+    rate_limit_pct = float(args[2]) if len(args) > 2 else 10
+    server_error_pct = float(args[3]) if len(args) > 3 else 5
+
+    state = StubState(latency_ms / 1000, rate_limit_pct, server_error_pct)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    from app.core import llm_client as llm_client_module
+
+    client = llm_client_module.AsyncLLMClient()
+    start = time.perf_counter()
+    results = asyncio.run(_fire(client, count))
+    wall = time.perf_counter() - start
+    server.shutdown()
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    latencies = sorted(ms for _, ms in results)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{count} requests, stub latency {latency_ms:.0f}ms, "
+          f"{rate_limit_pct:.0f}% 429, {server_error_pct:.0f}% 503")
+    print(f"limits: {llm_client_module.LLM_MAX_CONCURRENCY} global, "
+          f"{llm_client_module.LLM_MAX_CONCURRENCY_PER_MODEL} per model, "
+          f"{llm_client_module.LLM_MAX_RETRIES} retries")
+    print(f"outcomes: {dict(outcomes)}")
+    print(f"client: {client.stats()}")
+    print(f"latency: p50 {statistics.median(latencies):.0f}ms  p99 {p99:.0f}ms  wall {wall:.1f}s")
+    print(f"max concurrent at stub: {state.max_active}")
+
+
+if __name__ == "__main__":
+    main()
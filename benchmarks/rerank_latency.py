@@ -0,0 +1,68 @@
+"""
+Retrieval latency and prompt size with and without cross-encoder reranking.
+
+Usage:
+    python -m benchmarks.rerank_latency storage/vector_store/<session_id> questions.txt [top_n] [candidates]
+
+Each question (one per line) goes through retrieve() and build_answer_prompt
+without calling the LLM, in three passes: reranking off (MMR over the
+candidates, k=4), reranking on with a cold score cache, and reranking on again
+with the scores cached. The budget is disabled so every question is reranked.
+Reported per pass: p50/p95 retrieval time and mean prompt tokens.
+"""
+import sys
+import time
+from pathlib import Path
+
+from langchain.docstore.document import Document
+
+from app.core.ai import EnhancedRAGSystem
+from app.core.context_assembly import count_tokens
+from app.core.reranker import reranker
+
+
+def _run(rag, questions):
+    timings, tokens = [], []
+    for question in questions:
+        start = time.perf_counter()
+        context_parts, _ = rag.retrieve(question, k=4)
+        timings.append((time.perf_counter() - start) * 1000)
+        prompt = rag.build_answer_prompt(question, context_parts)
+        tokens.append(count_tokens(prompt, rag.llm_manager.api_model_name))
+    timings.sort()
+    return timings[len(timings) // 2], timings[min(len(timings) - 1, int(len(timings) * 0.95))], sum(tokens) / len(tokens)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        sys.exit(1)
+
+    vector_store_path = Path(sys.argv[1])
+    questions = [line.strip() for line in open(sys.argv[2]) if line.strip()]
+    top_n = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    candidates = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+
+    rag = EnhancedRAGSystem()
+    rag.load_vector_store(vector_store_path)
+
+    # The model loads in the background on first use; wait for it
+    reranker.rerank("warmup", [(Document(page_content="warmup"), 0.0)], 1, float("inf"))
+    while not reranker.stats()["loaded"]:
+        if reranker.stats()["load_error"]:
+            sys.exit(f"reranker failed to load: {reranker.stats()['load_error']}")
+        time.sleep(0.1)
+
+    print(f"{len(questions)} questions, {candidates} candidates, top {top_n}")
+    passes = [("off", False), ("on, cold", True), ("on, cached", True)]
+    for name, rerank in passes:
+        rag.retrieval.update(
+            rerank=rerank, rerank_candidates=candidates, rerank_top_n=top_n, rerank_budget_ms=float("inf")
+        )
+        p50, p95, mean_tokens = _run(rag, questions)
+        print(f"  {name:<12}retrieval p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  prompt tokens {mean_tokens:7.1f}")
+    print(f"  reranker: {reranker.stats()}")
+
+
+if __name__ == "__main__":
+    main()
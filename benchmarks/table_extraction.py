@@ -0,0 +1,90 @@
+"""
+Table extraction throughput and agreement between the pymupdf and tabula backends.
+
+Usage:
+    python -m benchmarks.table_extraction [fixtures_dir_or_file.pdf ...]
+
+Without arguments it runs on the generated corpus of benchmarks.table_fixtures.
+For each backend it reports tables found, tables per second and pages per second
+(tabula is timed after one warm-up call, so JVM startup is not counted). Agreement
+matches every pymupdf table to the tabula table of the same file with the most
+similar cell contents (Jaccard over normalized non-empty cells); a pair agrees
+when that similarity is at least AGREEMENT_THRESHOLD.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz
+
+from app.core.table_extraction import extract_tables_pymupdf, extract_tables_tabula
+from benchmarks.table_fixtures import write_corpus
+
+AGREEMENT_THRESHOLD = 0.8
+
+
+def _pdf_paths(args):
+    paths = []
+    for arg in args:
+        path = Path(arg)
+        paths.extend(sorted(path.glob("*.pdf")) if path.is_dir() else [path])
+    return paths
+
+
+def _cells(table):
+    cells = {" ".join(str(c).split()).lower() for c in table["columns"]}
+    for record in table["data"]:
+        cells.update(" ".join(str(v).split()).lower() for v in record.values())
+    return {c for c in cells if c and c not in ("nan", "none") and not c.startswith("unnamed:")}
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def _run(extract, paths):
+    start = time.perf_counter()
+    results = [extract(p) for p in paths]
+    return results, time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 1:
+        paths = _pdf_paths(sys.argv[1:])
+    else:
+        paths = write_corpus(Path(tempfile.mkdtemp(prefix="table-fixtures-")))
+    pages = 0
+    for path in paths:
+        with fitz.open(path) as pdf_document:
+            pages += len(pdf_document)
+
+    extract_tables_tabula(paths[0])  # starts the JVM
+    runs = {
+        "pymupdf": _run(extract_tables_pymupdf, paths),
+        "tabula": _run(extract_tables_tabula, paths),
+    }
+
+    print(f"{len(paths)} files, {pages} pages")
+    print(f"{'backend':<10}{'tables':>8}{'tables/s':>10}{'pages/s':>10}")
+    for backend, (results, seconds) in runs.items():
+        found = sum(len(tables) for tables in results)
+        print(f"{backend:<10}{found:>8}{found / seconds:>10.1f}{pages / seconds:>10.1f}")
+
+    similarities = []
+    for pymupdf_tables, tabula_tables in zip(runs["pymupdf"][0], runs["tabula"][0]):
+        tabula_cells = [_cells(t) for t in tabula_tables]
+        for table in pymupdf_tables:
+            cells = _cells(table)
+            similarities.append(max((_jaccard(cells, other) for other in tabula_cells), default=0.0))
+
+    if similarities:
+        agreed = sum(1 for s in similarities if s >= AGREEMENT_THRESHOLD)
+        print(f"agreement: {agreed}/{len(similarities)} pymupdf tables matched by tabula "
+              f"(mean best-match Jaccard {sum(similarities) / len(similarities):.3f})")
+    else:
+        print("agreement: pymupdf found no tables")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Generated PDF corpus for the table extraction benchmark.
+
+Usage:
+    python -m benchmarks.table_fixtures OUTPUT_DIR
+
+Writes a few small PDFs with ruled tables (one table, two tables on a page, a
+table on every page of a multi-page file, prose with no table), so
+benchmarks.table_extraction can run without real documents.
+"""
+import sys
+from pathlib import Path
+from typing import List, Sequence
+
+import fitz
+
+CELL_WIDTH = 110
+ROW_HEIGHT = 22
+FONT_SIZE = 10
+
+SIMPLE_TABLE = [
+    ["Region", "Quarter", "Revenue", "Units"],
+    ["North", "Q1", "1200", "34"],
+    ["South", "Q1", "950", "27"],
+    ["East", "Q2", "1430", "41"],
+    ["West", "Q2", "880", "22"],
+]
+
+PROSE = (
+    "Quarterly summary. Revenue grew in every region except the west, where a "
+    "supplier delay held back shipments for most of the second quarter."
+)
+
+
+def draw_table(page, rows: Sequence[Sequence[str]], x: float, y: float) -> float:
+    """Draw a ruled table with its top-left corner at (x, y); returns its bottom edge"""
+    columns = len(rows[0])
+    right = x + columns * CELL_WIDTH
+    bottom = y + len(rows) * ROW_HEIGHT
+    for r in range(len(rows) + 1):
+        page.draw_line((x, y + r * ROW_HEIGHT), (right, y + r * ROW_HEIGHT))
+    for c in range(columns + 1):
+        page.draw_line((x + c * CELL_WIDTH, y), (x + c * CELL_WIDTH, bottom))
+    for r, row in enumerate(rows):
+        for c, value in enumerate(row):
+            page.insert_text((x + c * CELL_WIDTH + 6, y + r * ROW_HEIGHT + 15), value, fontsize=FONT_SIZE)
+    return bottom
+
+
+def _numbered_table(first: int, count: int) -> List[List[str]]:
+    rows = [["Item", "Batch", "Weight", "Status"]]
+    for n in range(first, first + count):
+        rows.append([f"Item {n}", f"B{n % 7}", str(10 + 3 * n), "ok" if n % 3 else "held"])
+    return rows
+
+
+def write_corpus(directory: Path) -> List[Path]:
+    """Write the fixture PDFs into `directory`"""
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+
+    def save(name: str, document):
+        path = directory / name
+        document.save(path)
+        document.close()
+        paths.append(path)
+
+    document = fitz.open()
+    draw_table(document.new_page(), SIMPLE_TABLE, 72, 100)
+    save("simple_table.pdf", document)
+
+    document = fitz.open()
+    page = document.new_page()
+    bottom = draw_table(page, SIMPLE_TABLE, 72, 100)
+    draw_table(page, _numbered_table(1, 6), 72, bottom + 80)
+    save("two_tables.pdf", document)
+
+    document = fitz.open()
+    for page_num in range(4):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Inventory, part {page_num + 1}", fontsize=12)
+        draw_table(page, _numbered_table(page_num * 10, 10), 72, 100)
+    save("multi_page.pdf", document)
+
+    document = fitz.open()
+    document.new_page().insert_textbox(fitz.Rect(72, 72, 520, 300), PROSE, fontsize=11)
+    save("no_tables.pdf", document)
+
+    return paths
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(__doc__)
+        sys.exit(1)
+    for path in write_corpus(Path(sys.argv[1])):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
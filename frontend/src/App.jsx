@@ -25,6 +25,7 @@ const MainApp = () => {
   const [currentQuestion, setCurrentQuestion] = useState("");
   const [isLoading, setIsLoading] = useState(false);
   const [insights, setInsights] = useState(null);
+  const insightsCollectionId = useRef(null);
   const [showUploadModal, setShowUploadModal] = useState(false);
 
   const [uploadFiles, setUploadFiles] = useState([]);
@@ -174,9 +175,23 @@ const MainApp = () => {
         headers: { Authorization: `Bearer ${token}` },
         body: formData,
       });
-      setUploadProgress(70);
-      const data = await resp.json();
-      if (resp.ok) {
+      let data = await resp.json();
+      if (!resp.ok) {
+        showNotification(data.detail || "Upload failed", "error");
+        return;
+      }
+      // Processing runs in the background; poll the job until it finishes
+      setUploadProgress(40);
+      while (data.status === "queued" || data.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const jobResp = await fetch(`${API_BASE_URL}/app/jobs/${data.job_id}`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        data = await jobResp.json();
+        if (!jobResp.ok) break;
+        if (data.stage === "embedding") setUploadProgress(60);
+      }
+      if (data.status === "completed") {
         setUploadProgress(100);
         showNotification(`Successfully uploaded ${uploadFiles.length} file(s)!`);
         setShowUploadModal(false);
@@ -184,12 +199,11 @@ const MainApp = () => {
         setCollectionName("");
         setUploadProgress(0);
         await fetchCollections();
-        setSelectedCollection(data.collection);
-        if (data.insights) {
-          setInsights(data.insights);
-        }
+        setSelectedCollection(data.result.collection);
+        setInsights(null);
+        fetchInsights(data.result.collection.id);
       } else {
-        showNotification(data.detail || "Upload failed", "error");
+        showNotification(data.error || data.detail || "Upload failed", "error");
       }
     } catch (err) {
       showNotification("Upload error. Please try again.", "error");
@@ -199,23 +213,33 @@ const MainApp = () => {
     }
   };
 
-  const handleSelectCollection = async (collection) => {
-    setSelectedCollection(collection);
-    setMessages([]);
-    setInsights(null);
+  // Insights are generated after upload; poll while they are pending
+  const fetchInsights = async (collectionId) => {
+    insightsCollectionId.current = collectionId;
     try {
-      const resp = await fetch(`${API_BASE_URL}/app/insights/${collection.id}`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      if (resp.ok) {
+      for (let attempt = 0; attempt < 60; attempt++) {
+        const resp = await fetch(`${API_BASE_URL}/app/insights/${collectionId}`, {
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        // Stop once another collection has been selected
+        if (!resp.ok || insightsCollectionId.current !== collectionId) return;
         const data = await resp.json();
-        setInsights(data.insights);
+        if (data.insights) setInsights(data.insights);
+        if (data.status !== "pending") return;
+        await new Promise((resolve) => setTimeout(resolve, 3000));
       }
     } catch (err) {
       console.error("Error fetching insights:", err);
     }
   };
 
+  const handleSelectCollection = async (collection) => {
+    setSelectedCollection(collection);
+    setMessages([]);
+    setInsights(null);
+    fetchInsights(collection.id);
+  };
+
   const handleSendQuestion = async (question = currentQuestion) => {
     if (!question.trim() || !selectedCollection) return;
     const userMessage = { role: "user", content: question };
@@ -223,7 +247,7 @@ const MainApp = () => {
     setCurrentQuestion("");
     setIsLoading(true);
     try {
-      const resp = await fetch(`${API_BASE_URL}/app/chat`, {
+      const resp = await fetch(`${API_BASE_URL}/app/chat/stream`, {
         method: "POST",
         headers: {
           Authorization: `Bearer ${token}`,
@@ -234,17 +258,40 @@ const MainApp = () => {
           question,
         }),
       });
-      const data = await resp.json();
-      if (resp.ok) {
-        const assistantMessage = {
-          role: "assistant",
-          content: data.answer,
-          sources: data.sources,
-          type: data.type,
-        };
-        setMessages((prev) => [...prev, assistantMessage]);
-      } else {
+      if (!resp.ok) {
+        const data = await resp.json();
         showNotification(data.detail || "Failed to get answer", "error");
+        return;
+      }
+      // Server-sent events: sources first, then answer tokens, then done
+      const updateAnswer = (update) =>
+        setMessages((prev) => [...prev.slice(0, -1), { ...prev[prev.length - 1], ...update }]);
+      const reader = resp.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let answer = "";
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const raw of events) {
+          const event = raw.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || "{}");
+          if (event === "sources") {
+            setIsLoading(false);
+            setMessages((prev) => [
+              ...prev,
+              { role: "assistant", content: "", sources: data.sources, type: data.type },
+            ]);
+          } else if (event === "token") {
+            answer += data.text;
+            updateAnswer({ content: answer });
+          } else if (event === "error") {
+            showNotification(data.error || "Failed to get answer", "error");
+          }
+        }
       }
     } catch (err) {
       showNotification("Error sending question", "error");
@@ -0,0 +1,32 @@
+import os
+import tempfile
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import pytest
+
+# Set before any app module is imported: security.py requires a secret, and the
+# shared stores must not touch the real storage/ directory
+_STORAGE = Path(tempfile.mkdtemp(prefix="askviolet-tests-"))
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ["ARTIFACTS_DIR"] = str(_STORAGE / "artifacts")
+os.environ["EMBEDDING_CACHE_PATH"] = str(_STORAGE / "embedding_cache.db")
+
+
+def write_pdf(path: Path, pages) -> Path:
+    """Write a PDF with one page per string in `pages`"""
+    document = fitz.open()
+    for text in pages:
+        page = document.new_page()
+        page.insert_text((72, 72), text)
+    document.save(path)
+    document.close()
+    return path
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    def make(name: str, *pages: str) -> Path:
+        return write_pdf(tmp_path / name, pages or ("",))
+    return make
@@ -0,0 +1,47 @@
+import threading
+
+from app.core.collection_cache import CollectionCache, LoadedCollection
+
+
+def _collection(size_bytes=10):
+    return LoadedCollection(vector_store=object(), tables_data=[], images_info=[], size_bytes=size_bytes)
+
+
+def test_load_invalidated_while_in_flight_is_not_cached():
+    cache = CollectionCache(max_bytes=100)
+    started, release = threading.Event(), threading.Event()
+    stale = _collection()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return stale
+
+    results = []
+    loading = threading.Thread(target=lambda: results.append(cache.get_or_load("s1", slow_loader)))
+    loading.start()
+    assert started.wait(5)
+
+    # The store is rewritten while the old copy is still being read
+    cache.invalidate("s1")
+    release.set()
+    loading.join(5)
+
+    # The caller that started the load still gets it, but later lookups reload
+    assert results == [stale]
+    fresh = _collection()
+    assert cache.get_or_load("s1", lambda: fresh) is fresh
+    assert cache.get_or_load("s1", lambda: _collection()) is fresh
+
+
+def test_load_records_do_not_outlive_their_loads():
+    cache = CollectionCache(max_bytes=25)
+
+    for i in range(10):
+        cache.get_or_load(f"s{i}", lambda: _collection())
+    # Oversized collections are served without being cached
+    cache.get_or_load("big", lambda: _collection(size_bytes=50))
+
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 8
+    assert cache._loads == {}
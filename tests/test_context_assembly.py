@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.core import ai
+from app.core.context_assembly import mmr_order, rank_relevance
+from app.core.lexical_index import BM25Index
+from app.core.reranker import retrieval_settings
+from app.core.vector_index import empty_vector_store
+
+
+def test_mmr_keeps_the_top_ranked_row_and_skips_near_duplicates():
+    vectors = np.array([
+        [0.0, 0.0, 1.0],    # ranked first, unlike everything else
+        [1.0, 0.0, 0.0],
+        [1.0, 0.001, 0.0],  # near-duplicate of the row above
+        [0.0, 1.0, 0.0],
+    ])
+
+    assert mmr_order(rank_relevance(len(vectors)), vectors, 3) == [0, 1, 3]
+
+
+def test_retrieve_keeps_a_lexical_only_hit(monkeypatch):
+    monkeypatch.setattr(ai, "RETRIEVAL_MODE", "hybrid")
+    rng = np.random.default_rng(0)
+    query = rng.random(8, dtype=np.float32)
+
+    # Twenty chunks close to the question's vector, one exact identifier match far from it
+    texts = {f"filler-{i}": f"General overview of product line {i} and its options" for i in range(20)}
+    texts["spec"] = "Torque for part XY-3 is 12 Nm"
+    vectors = [query + rng.normal(0, 0.01, 8).astype(np.float32) for _ in range(20)] + [-query]
+
+    store = empty_vector_store(None, 8)
+    store.add_embeddings(
+        list(zip(texts.values(), vectors)),
+        metadatas=[{"source": "manual.pdf", "page": i + 1} for i in range(len(texts))],
+        ids=list(texts)
+    )
+    # No embedder: candidate vectors must come from the index
+    rag = ai.EnhancedRAGSystem.__new__(ai.EnhancedRAGSystem)
+    rag.vector_store = store
+    rag.lexical_index = BM25Index.build(list(texts), list(texts.values()))
+    rag.positions = {doc_id: pos for pos, doc_id in store.index_to_docstore_id.items()}
+    rag.retrieval = retrieval_settings({"rerank": False})
+    rag.llm_manager = SimpleNamespace(api_model_name="gpt-3.5-turbo")
+    rag.geometry = {}
+
+    fused = [doc.page_content for doc, _ in rag.hybrid_search("part XY-3", k=4, query_vector=query.tolist())]
+    context_parts, _ = rag.retrieve("part XY-3", k=4, query_vector=query.tolist())
+
+    assert texts["spec"] in fused
+    assert texts["spec"] in context_parts
@@ -0,0 +1,49 @@
+import asyncio
+
+from sqlalchemy import event, select
+
+from app.db.database import Base, build_async_engine, build_async_sessionmaker
+from app.models import db_models
+
+
+def _statements(engine, seen, name):
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append((name, statement.split()[0].upper()))
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+
+
+def test_reads_and_writes_use_their_own_engines(tmp_path):
+    async def scenario():
+        url = f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"
+        reader = build_async_engine(url)
+        writer = build_async_engine(url, pool_size=1, max_overflow=0)
+        async with writer.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = build_async_sessionmaker(reader, writer)
+
+        seen = []
+        _statements(reader, seen, "reader")
+        _statements(writer, seen, "writer")
+
+        async with Session() as db:
+            assert await db.scalar(select(db_models.User).where(db_models.User.username == "ana")) is None
+            db.add(db_models.User(username="ana", hashed_password="x"))
+            await db.commit()
+        async with Session() as db:
+            user = await db.scalar(select(db_models.User).where(db_models.User.username == "ana"))
+            await db.delete(user)
+            await db.commit()
+        async with Session() as db:
+            remaining = (await db.scalars(select(db_models.User))).all()
+
+        await reader.dispose()
+        await writer.dispose()
+        return seen, remaining
+
+    seen, remaining = asyncio.run(scenario())
+
+    assert remaining == []
+    # Queries issued by the handler go to the reader; loads during a flush
+    # (the delete cascade) stay inside the write transaction
+    assert seen[0] == ("reader", "SELECT") and seen[-1] == ("reader", "SELECT")
+    assert {name for name, kind in seen if kind in ("INSERT", "DELETE")} == {"writer"}
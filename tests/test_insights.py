@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from langchain.docstore.document import Document
+
+from app.core import ai
+
+
+class FakeLLM:
+    def __init__(self, response):
+        self.response = response
+        self.prompts = []
+
+    def generate_response(self, prompt):
+        self.prompts.append(prompt)
+        return self.response
+
+
+PAGES = [Document(page_content="Quarterly revenue grew.", metadata={"source": "report.pdf", "page": 1})]
+
+
+@pytest.mark.parametrize("response", [f"{ai.LLM_ERROR_PREFIX}: upstream is down", "", "   "])
+def test_llm_failure_raises_instead_of_placeholder_insights(response):
+    insights = ai.ProactiveInsights(FakeLLM(response))
+
+    with pytest.raises(RuntimeError):
+        insights.analyze_document(PAGES)
+
+
+def test_structured_reply_becomes_insights():
+    reply = json.dumps({"summary": "Revenue grew.", "key_concepts": ["revenue"], "suggested_questions": ["How much?"]})
+    insights = ai.ProactiveInsights(FakeLLM(reply)).analyze_document(PAGES)
+
+    assert insights["summary"] == "Revenue grew."
+    assert insights["key_concepts"] == ["revenue"]
+    assert insights["document_stats"] == {"total_documents": 1, "total_pages": 1}
+
+
+def test_failed_insights_are_recorded_and_can_be_retried(tmp_path, monkeypatch):
+    collection = tmp_path / "collection"
+    collection.mkdir()
+    ai._write_collection_metadata(collection, insights={"status": "pending"})
+
+    class FailingRAG:
+        def __init__(self, llm_provider, llm_model):
+            self.generator = ai.ProactiveInsights(FakeLLM(f"{ai.LLM_ERROR_PREFIX}: 503"))
+
+        def generate_insights(self, vector_store_path, content_hashes):
+            self.generator.analyze_document(PAGES)
+
+    monkeypatch.setattr(ai, "EnhancedRAGSystem", FailingRAG)
+    ai.generate_collection_insights(collection, ["hash-a"])
+
+    stored = ai.get_insights(collection)
+    assert stored["status"] == "failed"
+    assert stored["failed_hashes"] == ["hash-a"]
+    assert "summary" not in stored
+
+    scheduled = []
+    monkeypatch.setattr(ai, "schedule_insights", lambda *args: scheduled.append(args))
+    assert ai.retry_insights(collection, "openai", "gpt-4o-mini")
+    assert scheduled == [(collection, ["hash-a"], "openai", "gpt-4o-mini")]
+    assert ai.get_insights(collection)["status"] == "pending"
+
+    # Only failed insights are retried
+    assert not ai.retry_insights(collection)
@@ -0,0 +1,112 @@
+import random
+
+import numpy as np
+import pytest
+from langchain.docstore.document import Document
+
+from app.core import ai, lexical_index
+from app.core.lexical_index import BM25Index, LEXICAL_INDEX_NAME
+from app.core.vector_index import empty_vector_store
+
+WORDS = ["invoice", "clause", "AB-1234", "revenue", "term", "notice", "party", "4.2.1", "fee", "audit"]
+
+
+def _corpus(count, seed=0, prefix="doc"):
+    rng = random.Random(seed)
+    return {f"{prefix}{i}": " ".join(rng.choices(WORDS, k=rng.randint(3, 30))) for i in range(count)}
+
+
+def _assert_same_ranking(index, docs, queries=("invoice clause", "AB-1234", "4.2.1 audit fee", "party notice term")):
+    rebuilt = BM25Index.build(list(docs), list(docs.values()))
+    for query in queries:
+        found = dict(index.search(query, len(docs)))
+        expected = dict(rebuilt.search(query, len(docs)))
+        assert found.keys() == expected.keys()
+        for doc_id, score in expected.items():
+            assert found[doc_id] == pytest.approx(score)
+
+
+@pytest.mark.parametrize("max_fraction", [10.0, 0.25])
+def test_incremental_updates_match_a_full_rebuild(monkeypatch, max_fraction):
+    # 10.0 keeps every update in the delta; 0.25 merges it into the base along the way
+    monkeypatch.setattr(lexical_index, "BM25_DELTA_MAX_FRACTION", max_fraction)
+    docs = _corpus(40)
+    index = BM25Index.build(list(docs), list(docs.values()))
+
+    added = _corpus(15, seed=1, prefix="new")
+    index.add(list(added), list(added.values()))
+    docs.update(added)
+    _assert_same_ranking(index, docs)
+
+    removed = ["doc3", "doc7", "new2", "new9"]
+    index.remove(removed)
+    for doc_id in removed:
+        del docs[doc_id]
+    _assert_same_ranking(index, docs)
+
+    # Stable chunk ids come back when a removed file is added again
+    index.add(["doc3"], ["invoice AB-1234"])
+    docs["doc3"] = "invoice AB-1234"
+    _assert_same_ranking(index, docs)
+    assert sorted(index.doc_ids) == sorted(docs)
+
+
+def test_update_writes_only_the_delta(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexical_index, "BM25_DELTA_MAX_FRACTION", 0.25)
+    docs = _corpus(40)
+    BM25Index.build(list(docs), list(docs.values())).save(tmp_path)
+    base_stat = (tmp_path / LEXICAL_INDEX_NAME).stat()
+
+    index = BM25Index.load(tmp_path)
+    index.add(["extra"], ["audit clause"])
+    index.remove(["doc1"])
+    index.save(tmp_path)
+    assert (tmp_path / LEXICAL_INDEX_NAME).stat().st_mtime_ns == base_stat.st_mtime_ns
+
+    docs["extra"] = "audit clause"
+    del docs["doc1"]
+    _assert_same_ranking(BM25Index.load(tmp_path), docs)
+
+    # Past the threshold the delta is merged and a new base written
+    added = _corpus(20, seed=2, prefix="more")
+    index.add(list(added), list(added.values()))
+    index.save(tmp_path)
+    docs.update(added)
+    assert (tmp_path / LEXICAL_INDEX_NAME).stat().st_mtime_ns != base_stat.st_mtime_ns
+    reloaded = BM25Index.load(tmp_path)
+    assert len(reloaded.delta) == 0 and not reloaded.deleted
+    _assert_same_ranking(reloaded, docs)
+
+
+def test_base_without_generation_still_loads(tmp_path):
+    docs = _corpus(10)
+    base = BM25Index.build(list(docs), list(docs.values())).base
+    with open(tmp_path / LEXICAL_INDEX_NAME, "wb") as f:
+        np.savez(f, **base.arrays())
+
+    index = BM25Index.load(tmp_path)
+    _assert_same_ranking(index, docs)
+    index.add(["extra"], ["fee"])
+    index.save(tmp_path)
+    docs["extra"] = "fee"
+    _assert_same_ranking(BM25Index.load(tmp_path), docs)
+
+
+def test_hybrid_search_returns_k_beyond_the_candidate_count(monkeypatch):
+    monkeypatch.setattr(ai, "HYBRID_CANDIDATES", 5)
+    docs = _corpus(30)
+    rng = np.random.default_rng(0)
+    store = empty_vector_store(None, 8)
+    store.add_embeddings(
+        [(text, rng.random(8, dtype=np.float32)) for text in docs.values()],
+        metadatas=[{"source": "a.pdf"} for _ in docs],
+        ids=list(docs)
+    )
+    rag = ai.EnhancedRAGSystem.__new__(ai.EnhancedRAGSystem)
+    rag.vector_store = store
+    rag.lexical_index = BM25Index.build(list(docs), list(docs.values()))
+
+    results = rag.hybrid_search("invoice clause", k=12, query_vector=rng.random(8).tolist())
+
+    assert len(results) == 12
+    assert all(isinstance(doc, Document) for doc, _ in results)
@@ -0,0 +1,91 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.llm_cache import LLMCallCache
+
+
+def test_concurrent_async_calls_share_one_upstream_call():
+    cache = LLMCallCache()
+    calls = 0
+
+    async def upstream():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        return await asyncio.gather(*(cache.acall("key", upstream) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["answer"] * 5
+    assert calls == 1
+    assert cache.stats()["upstream_calls"] == 1
+    assert cache.stats()["coalesced_calls"] == 4
+
+    # Completed responses are then served from the cache
+    assert asyncio.run(cache.acall("key", upstream)) == "answer"
+    assert calls == 1
+    assert cache.stats()["cached_calls"] == 1
+
+
+def test_async_failure_reaches_every_waiter_and_is_not_cached():
+    cache = LLMCallCache()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await asyncio.gather(*(cache.acall("key", upstream) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert cache.stats()["failed_calls"] == 1
+    assert cache.get("key") is None
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    cache = LLMCallCache()
+
+    async def upstream():
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        leader = asyncio.create_task(cache.acall("key", upstream))
+        waiter = asyncio.create_task(cache.acall("key", upstream))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert asyncio.run(main()) == "answer"
+
+
+def test_async_waiter_joins_a_blocking_call_in_flight():
+    cache = LLMCallCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def upstream():
+        started.set()
+        release.wait(5)
+        return "answer"
+
+    thread = threading.Thread(target=cache.call, args=("key", upstream))
+    thread.start()
+    started.wait(5)
+
+    async def main():
+        waiter = asyncio.create_task(cache.acall("key", lambda: pytest.fail("second upstream call")))
+        await asyncio.sleep(0.01)
+        release.set()
+        return await waiter
+
+    assert asyncio.run(main()) == "answer"
+    thread.join(5)
+    assert cache.stats()["upstream_calls"] == 1
+    assert cache.stats()["coalesced_calls"] == 1
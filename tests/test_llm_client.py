@@ -0,0 +1,198 @@
+import json
+import time
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core import llm_client as llm_client_module
+from app.core.llm_client import (
+    AsyncLLMClient,
+    LLMRateLimitError,
+    LLMRequestError,
+    LLMServerError,
+    LLMTimeoutError,
+    TokenBucket
+)
+
+COMPLETION = {
+    "id": "stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "stub answer"}, "finish_reason": "stop"}]
+}
+
+
+class StubServer:
+    """Local chat completions API: answers with `script` entries in order, then 200"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.script = []
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub.lock:
+                    stub.requests += 1
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    status, headers = stub.script.pop(0) if stub.script else (200, {})
+                try:
+                    time.sleep(stub.latency)
+                    body = COMPLETION if status == 200 else {"error": {"message": f"stub {status}"}}
+                    payload = json.dumps(body).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except OSError:
+                    pass  # The client gave up (timeout tests)
+                finally:
+                    with stub.lock:
+                        stub.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server = StubServer()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setattr(llm_client_module, "LLM_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(llm_client_module, "LLM_BACKOFF_MAX_SECONDS", 2)
+    yield server
+    server.server.shutdown()
+
+
+def test_concurrency_is_capped_per_model_and_globally(stub, monkeypatch):
+    monkeypatch.setattr(llm_client_module, "LLM_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(llm_client_module, "LLM_MAX_CONCURRENCY_PER_MODEL", 2)
+    stub.latency = 0.05
+    client = AsyncLLMClient()
+
+    async def fire(models):
+        return await asyncio.gather(*(client.generate(model, f"question {i}") for i, model in enumerate(models)))
+
+    assert asyncio.run(fire(["a"] * 8)) == ["stub answer"] * 8
+    assert stub.max_active == 2
+
+    stub.max_active = 0
+    asyncio.run(fire(["a", "b", "c"] * 4))
+    assert stub.max_active == 3
+    assert client.stats()["in_flight"] == 0
+
+
+def test_rate_limit_is_retried_after_retry_after(stub):
+    stub.script = [(429, {"Retry-After": "0.3"})]
+    client = AsyncLLMClient()
+
+    start = time.perf_counter()
+    assert asyncio.run(client.generate("a", "question")) == "stub answer"
+
+    assert time.perf_counter() - start >= 0.3
+    assert stub.requests == 2
+    assert client.stats()["retries"] == 1
+    assert client.stats()["rate_limited"] == 1
+
+
+def test_server_errors_are_retried(stub):
+    stub.script = [(503, {}), (500, {})]
+    client = AsyncLLMClient()
+
+    assert asyncio.run(client.generate("a", "question")) == "stub answer"
+    assert stub.requests == 3
+    assert client.stats()["retries"] == 2
+
+
+def test_exhausted_retries_raise_typed_errors(stub, monkeypatch):
+    monkeypatch.setattr(llm_client_module, "LLM_MAX_RETRIES", 2)
+    stub.script = [(429, {"Retry-After": "0"})] * 3 + [(502, {})] * 3
+    client = AsyncLLMClient()
+
+    with pytest.raises(LLMRateLimitError) as error:
+        asyncio.run(client.generate("a", "question"))
+    assert error.value.status_code == 429
+    assert error.value.retry_after == 0
+
+    with pytest.raises(LLMServerError) as error:
+        asyncio.run(client.generate("a", "question"))
+    assert error.value.status_code == 502
+
+    assert stub.requests == 6
+    assert client.stats()["failures"] == 2
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.script = [(400, {})]
+    client = AsyncLLMClient()
+
+    with pytest.raises(LLMRequestError):
+        asyncio.run(client.generate("a", "question"))
+    assert stub.requests == 1
+    assert client.stats()["retries"] == 0
+
+
+def test_timeout_maps_to_llm_timeout_error(stub, monkeypatch):
+    monkeypatch.setattr(llm_client_module, "LLM_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(llm_client_module, "LLM_MAX_RETRIES", 1)
+    stub.latency = 0.5
+    client = AsyncLLMClient()
+
+    start = time.perf_counter()
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(client.generate("a", "question"))
+
+    assert time.perf_counter() - start < 2
+    assert stub.requests == 2
+    assert client.stats()["retries"] == 1
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=2)
+
+    async def take(count):
+        start = time.perf_counter()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.perf_counter() - start
+
+    # Two saved-up tokens go at once; four more take 4 / 20 = 0.2s
+    assert asyncio.run(take(2)) < 0.05
+    assert 0.18 <= asyncio.run(take(4)) < 0.5
+
+
+def test_token_bucket_disabled_at_zero_rate():
+    bucket = TokenBucket(rate=0, capacity=1)
+
+    async def take(count):
+        for _ in range(count):
+            await bucket.acquire()
+
+    start = time.perf_counter()
+    asyncio.run(take(100))
+    assert time.perf_counter() - start < 0.05
@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.ai import DocumentProcessor
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_worker_module_imports_only_pymupdf():
+    # Extraction workers are spawned and import the module their entry point lives in
+    script = (
+        "import sys, app.core.pdf_pages; "
+        "print(','.join(m for m in ('langchain', 'langchain_core', 'torch', 'pandas', 'faiss', 'app.core.ai') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_parallel_parse_matches_serial(make_pdf):
+    first = make_pdf("first.pdf", "alpha one", "", "alpha three", "alpha four")
+    second = make_pdf("second.pdf", "beta one", "beta two", "beta three")
+    processor = DocumentProcessor()
+
+    serial = [processor.parse_pdf(path) for path in (first, second)]
+    parallel = processor.parse_pdfs_parallel([first, second], workers=2, pages_per_task=1)
+
+    assert len(parallel) == 2
+    for (docs, images, tables), (p_docs, p_images, p_tables) in zip(serial, parallel):
+        assert [(d.page_content, d.metadata) for d in docs] == [(d.page_content, d.metadata) for d in p_docs]
+        assert images == p_images
+        assert tables == p_tables
+    # The blank page yields no document
+    assert [d.metadata["page"] for d in parallel[0][0]] == [1, 3, 4]
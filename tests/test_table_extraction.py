@@ -0,0 +1,36 @@
+import os
+import shutil
+
+import pytest
+
+from app.core.table_extraction import extract_tables_pymupdf, extract_tables_tabula
+from benchmarks.table_fixtures import SIMPLE_TABLE, write_corpus
+
+requires_java = pytest.mark.skipif(
+    shutil.which("java") is None and not os.getenv("JAVA_HOME"),
+    reason="tabula needs a Java runtime"
+)
+
+
+def _rows(table):
+    return [[str(value) for value in record.values()] for record in table["data"]]
+
+
+def test_pymupdf_finds_fixture_tables(tmp_path):
+    found = {path.name: extract_tables_pymupdf(path) for path in write_corpus(tmp_path)}
+
+    assert [len(found[name]) for name in ("simple_table.pdf", "two_tables.pdf", "multi_page.pdf", "no_tables.pdf")] == [1, 2, 4, 0]
+    assert [t["page"] for t in found["multi_page.pdf"]] == [1, 2, 3, 4]
+
+
+@requires_java
+def test_backends_agree_on_simple_table(tmp_path):
+    path = next(p for p in write_corpus(tmp_path) if p.name == "simple_table.pdf")
+
+    pymupdf_tables = extract_tables_pymupdf(path)
+    tabula_tables = extract_tables_tabula(path)
+
+    assert len(pymupdf_tables) == len(tabula_tables) == 1
+    for table in (pymupdf_tables[0], tabula_tables[0]):
+        assert table["columns"] == SIMPLE_TABLE[0]
+        assert _rows(table) == SIMPLE_TABLE[1:]
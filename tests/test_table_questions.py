@@ -0,0 +1,68 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import ai
+from app.core.llm_client import LLMServerError
+from app.core.table_store import TableStore
+
+
+class AsyncOnlyLLM:
+    """LLM manager stub that fails the test if the sync, error-text path is used"""
+
+    api_model_name = "gpt-3.5-turbo"
+    llm_provider = "openai"
+    llm_model = "table-test"
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_response(self, prompt):
+        raise AssertionError("table question answered through the sync LLM path")
+
+    async def agenerate_response(self, prompt):
+        self.prompts.append(prompt)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _rag(tmp_path, llm):
+    store = TableStore(tmp_path)
+    store.add([{
+        "source": "report.pdf",
+        "table_index": 0,
+        "columns": ["Region", "Revenue"],
+        "data": [{"Region": "North", "Revenue": "1,200"}, {"Region": "South", "Revenue": "900"}]
+    }])
+
+    rag = ai.EnhancedRAGSystem.__new__(ai.EnhancedRAGSystem)
+    rag.vector_store = object()
+    rag.collection_id = str(tmp_path)
+    rag.embeddings = SimpleNamespace(embed_query=lambda text: [1.0, 0.0])
+    rag.table_store = store
+    rag.tables_data = store.catalog()
+    rag.llm_manager = llm
+    return rag
+
+
+def test_async_table_question_writes_sql_through_the_async_client(tmp_path):
+    llm = AsyncOnlyLLM(["```sql\nSELECT region, revenue FROM t_1 ORDER BY revenue DESC\n```", "North"])
+    rag = _rag(tmp_path, llm)
+
+    result = asyncio.run(rag.aget_answer_with_sources("Which region has the most revenue?"))
+
+    assert result["type"] == "table_query"
+    assert result["answer"] == "North"
+    # The locally executed query result reaches the answer prompt
+    assert "North,1200\nSouth,900" in llm.prompts[1]
+
+
+def test_async_table_question_raises_llm_errors(tmp_path):
+    rag = _rag(tmp_path, AsyncOnlyLLM([LLMServerError("upstream 503", status_code=503)]))
+
+    with pytest.raises(LLMServerError):
+        asyncio.run(rag.aget_answer_with_sources("Which region has the most revenue?"))
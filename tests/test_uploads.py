@@ -0,0 +1,104 @@
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.api import endpoints
+from app.core.artifacts import ArtifactStore, file_sha256
+
+
+def _upload(path, filename=None) -> UploadFile:
+    return UploadFile(io.BytesIO(path.read_bytes()), filename=filename or path.name)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ArtifactStore(tmp_path / "artifacts")
+    monkeypatch.setattr(endpoints, "artifact_store", store)
+    return store
+
+
+def test_different_files_with_the_same_name_are_rejected(tmp_path, make_pdf, store):
+    first = make_pdf("a.pdf", "first report")
+    second = make_pdf("b.pdf", "second report")
+    upload_dir = tmp_path / "upload"
+    upload_dir.mkdir()
+
+    with pytest.raises(HTTPException) as error:
+        endpoints._save_uploaded_pdfs([_upload(first, "report.pdf"), _upload(second, "report.pdf")], upload_dir)
+
+    assert error.value.status_code == 400
+    assert "report.pdf" in error.value.detail
+    # The first upload was not overwritten by the second
+    assert (upload_dir / "report.pdf").read_bytes() == first.read_bytes()
+
+
+def test_same_file_twice_is_kept_once(tmp_path, make_pdf, store):
+    pdf = make_pdf("report.pdf", "report")
+    upload_dir = tmp_path / "upload"
+    upload_dir.mkdir()
+
+    file_paths, file_hashes, filenames = endpoints._save_uploaded_pdfs([_upload(pdf), _upload(pdf)], upload_dir)
+
+    assert file_paths == [upload_dir / "report.pdf"]
+    assert len(file_hashes) == 1
+    assert filenames == ["report.pdf"]
+    assert (upload_dir / "report.pdf").read_bytes() == pdf.read_bytes()
+
+
+def test_distinct_names_are_all_written(tmp_path, make_pdf, store):
+    first = make_pdf("a.pdf", "first report")
+    second = make_pdf("b.pdf", "second report")
+    upload_dir = tmp_path / "upload"
+    upload_dir.mkdir()
+
+    file_paths, file_hashes, _ = endpoints._save_uploaded_pdfs([_upload(first), _upload(second)], upload_dir)
+
+    assert [p.read_bytes() for p in file_paths] == [first.read_bytes(), second.read_bytes()]
+    assert len(set(file_hashes)) == 2
+
+
+def test_upload_keeps_a_reused_artifact_until_its_job_ends(tmp_path, make_pdf, store):
+    pdf = make_pdf("report.pdf", "report")
+    content_hash = file_sha256(pdf)
+    store.writer(content_hash).commit()
+    store.acquire("other-collection", [content_hash])
+    upload_dir = tmp_path / "upload"
+    upload_dir.mkdir()
+
+    file_paths, file_hashes, _ = endpoints._save_uploaded_pdfs([_upload(pdf)], upload_dir)
+
+    # Known content is not copied
+    assert not file_paths[0].exists()
+
+    # The other collection goes away before the job replays the artifact
+    store.release("other-collection", [content_hash])
+    assert store.exists(content_hash)
+
+    endpoints._discard_upload(upload_dir, file_hashes)
+    assert not store.exists(content_hash)
+    assert not upload_dir.exists()
+
+
+def test_rejected_upload_drops_its_references(tmp_path, make_pdf, store):
+    pdf = make_pdf("report.pdf", "report")
+    content_hash = file_sha256(pdf)
+    store.writer(content_hash).commit()
+    store.acquire("collection", [content_hash])
+    upload_dir = tmp_path / "upload"
+    upload_dir.mkdir()
+
+    with pytest.raises(HTTPException):
+        endpoints._save_uploaded_pdfs([_upload(pdf), _upload(pdf, "notes.txt")], upload_dir)
+
+    assert store._read_refs(content_hash) == ["collection"]
+
+
+def test_release_without_a_reference_keeps_the_artifact(tmp_path, store):
+    store.writer("abc").commit()
+    store.acquire("collection", ["abc"])
+
+    store.release("someone-else", ["abc"])
+
+    assert store.exists("abc")
+    assert store._read_refs("abc") == ["collection"]
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.core import vector_index
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _store(tmp_path, index_type, num_vectors=400, dim=16):
+    rng = np.random.default_rng(0)
+    vectors = rng.random((num_vectors, dim), dtype=np.float32)
+    store = vector_index.empty_vector_store(None, dim)
+    store.add_embeddings([(f"chunk {i}", v) for i, v in enumerate(vectors)], ids=[str(i) for i in range(num_vectors)])
+    config = vector_index.finalize_vector_store(store, index_type)
+    vector_index.save_vector_store(store, tmp_path)
+    vector_index.write_index_config(tmp_path, config)
+    return vectors
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat"])
+def test_read_only_load_searches_like_a_copy_load(tmp_path, index_type):
+    vectors = _store(tmp_path, index_type)
+
+    copied = vector_index.load_vector_store(tmp_path, None)
+    mapped = vector_index.load_vector_store(tmp_path, None, read_only=True)
+
+    _, expected = copied.index.search(vectors[:5], 3)
+    _, found = mapped.index.search(vectors[:5], 3)
+    assert (found == expected).all()
+
+
+# Run in a fresh interpreter: memory freed by earlier tests would hide the growth
+_LOAD_THREE_TIMES = """
+import sys, numpy as np
+from pathlib import Path
+from app.core.vector_index import load_vector_store
+
+def private_rss_kib():
+    with open("/proc/self/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("RssAnon:"))
+
+# The first load also pays for imports the later ones reuse
+stores = [load_vector_store(Path(sys.argv[1]), None, read_only=True)]
+before = private_rss_kib()
+stores += [load_vector_store(Path(sys.argv[1]), None, read_only=True) for _ in range(3)]
+for store in stores:
+    store.index.search(np.zeros((5, store.index.d), dtype=np.float32), 3)
+print(private_rss_kib() - before)
+"""
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="reads RssAnon from /proc")
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf_flat"])
+def test_read_only_loads_share_the_index_instead_of_copying_it(tmp_path, index_type):
+    vectors = _store(tmp_path, index_type, num_vectors=4000, dim=2048)
+    index_kib = vectors.nbytes // 1024
+
+    result = subprocess.run(
+        [sys.executable, "-c", _LOAD_THREE_TIMES, str(tmp_path)],
+        cwd=ROOT, env={**os.environ, "FAISS_MMAP": "1"}, capture_output=True, text=True, check=True
+    )
+
+    # Three copies would add 3 * index_kib; mapped loads add only their docstores
+    assert int(result.stdout.strip().splitlines()[-1]) < index_kib
+
+
+@pytest.mark.parametrize("index_type", ["flat", "ivf_flat", "ivf_pq", "hnsw"])
+def test_removing_chunks_keeps_positions_and_ids_aligned(tmp_path, index_type):
+    vectors = _store(tmp_path, index_type, num_vectors=600)
+    store = vector_index.load_vector_store(tmp_path, None)
+    config = vector_index.read_index_config(tmp_path)
+
+    removed = [str(i) for i in range(0, 300, 2)]
+    vector_index.delete_from_vector_store(store, removed, config)
+    vector_index.save_vector_store(store, tmp_path)
+    store = vector_index.load_vector_store(tmp_path, None)
+
+    assert store.index.ntotal == len(store.index_to_docstore_id) == 450
+    assert sorted(store.index_to_docstore_id) == list(range(450))
+    # Every label a search returns maps to a stored chunk, and kept chunks find themselves
+    kept = [1, 3, 299, 300, 599]
+    for doc, _ in [hit for i in kept for hit in store.similarity_search_with_score_by_vector(vectors[i], k=10)]:
+        assert doc.page_content.startswith("chunk ")
+    assert [store.similarity_search_with_score_by_vector(vectors[i], k=1)[0][0].page_content for i in kept] == [f"chunk {i}" for i in kept]
+
+    # Later adds get labels of their own
+    extra = np.random.default_rng(1).random((5, vectors.shape[1]), dtype=np.float32)
+    store.add_embeddings([(f"extra {i}", v) for i, v in enumerate(extra)], ids=[f"extra {i}" for i in range(5)])
+    assert store.index.ntotal == len(store.index_to_docstore_id) == 455
+    assert store.similarity_search_with_score_by_vector(extra[3], k=1)[0][0].page_content == "extra 3"
+    assert store.similarity_search_with_score_by_vector(vectors[599], k=1)[0][0].page_content == "chunk 599"